@@ -0,0 +1,54 @@
+"""Compares repeated reads of exported schedules: parsing JSON versus querying the mmap-ed binary format.
+
+Run from the project root: `python -m benchmarks.binary_export [rows]`.
+"""
+import datetime as dt
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.cache import populate
+from mvc.binary_schedule import BinaryScheduleReader
+from mvc.model import Model
+
+LOOKUPS = 100
+
+
+def main(rows: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        model = Model(court_number='BENCH')
+        populate(model, rows=rows)
+        date_from = dt.date(2025, 6, 1) - dt.timedelta(days=rows // 24)
+        date_to = dt.date(2025, 6, 1) + dt.timedelta(days=rows // 24)
+        for file_format in ('json', 'bin'):
+            model.export_schedule_data(date_from=date_from, date_to=date_to, file_format=file_format, filename='export')
+            size = os.path.getsize(os.path.join(model.EXPORTS_DIRECTORY, f'export.{file_format}'))
+            print(f'{file_format:<5} export size {size / 1024:10.1f} KiB')
+
+        # Spread over the exported range, every day of which holds reservations:
+        days = [date_from + (date_to - date_from) * i // LOOKUPS for i in range(LOOKUPS)]
+
+        json_started = time.perf_counter()
+        with open(os.path.join(model.EXPORTS_DIRECTORY, 'export.json')) as json_file:
+            data = json.load(json_file)
+        json_loaded = time.perf_counter() - json_started
+        for day in days:
+            _ = data[day.strftime(Model.JSON_DATE_FORMAT)]
+        json_elapsed = time.perf_counter() - json_started
+
+        bin_started = time.perf_counter()
+        with BinaryScheduleReader(os.path.join(model.EXPORTS_DIRECTORY, 'export.bin')) as reader:
+            bin_opened = time.perf_counter() - bin_started
+            for day in days:
+                _ = reader.get_schedule_data(date_from=day, date_to=day)
+        bin_elapsed = time.perf_counter() - bin_started
+
+    print(f'json: load {json_loaded * 1000:8.2f} ms, total for {LOOKUPS} day lookups {json_elapsed * 1000:8.2f} ms')
+    print(f'bin:  open {bin_opened * 1000:8.2f} ms, total for {LOOKUPS} day lookups {bin_elapsed * 1000:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main(rows=int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,67 @@
+"""Compares per-query latency of Model lookups with and without the in-memory reservation cache.
+
+Run from the project root: `python -m benchmarks.cache [rows]`.
+"""
+import datetime as dt
+import os
+import sys
+import tempfile
+import time
+
+from mvc.model import Model
+from mvc.queries import Queries
+from utils.epoch import EpochMinutes
+
+REPEATS = 2000
+
+
+def populate(model: Model, rows: int) -> None:
+    """Inserts one 90 minute reservation every 2 hours, half of them in the past."""
+    start = EpochMinutes.from_datetime(dt.datetime(2025, 6, 1)) - rows * 60
+    users = [model.users.get_or_create(name=f'Player {i}') for i in range(50)]
+    model.cursor.executemany(Queries.INSERT_RESERVATION, ({
+        'court': model.court_number, 'user': users[i % 50], 'start': start + i * 120, 'end': start + i * 120 + 90
+    } for i in range(rows)))
+    model.quota.update(reservations=((users[i % 50], start + i * 120) for i in range(rows)), delta=1)
+    model.bitmap.add(reservations=((start + i * 120, start + i * 120 + 90) for i in range(rows)))
+    model.connection.commit()
+
+
+def measure(model: Model) -> dict:
+    datetime_ = dt.datetime(2025, 6, 1, 18, 45)
+    scenarios = {
+        'check_possible_reservations': lambda: model.check_possible_reservations(datetime_=datetime_),
+        'check_if_eligible': lambda: model.check_if_eligible(name='Player 7', datetime_=datetime_),
+        'get_free_slots (day)': lambda: model.get_free_slots(
+            datetime_from=datetime_.replace(hour=0, minute=0), datetime_to=datetime_.replace(hour=23, minute=59)
+        ),
+        'get_schedule_data (week)': lambda: model.get_schedule_data(
+            date_from=datetime_.date(), date_to=datetime_.date() + dt.timedelta(days=6)
+        ),
+    }
+    results = {}
+    for name, scenario in scenarios.items():
+        scenario()
+        started = time.perf_counter()
+        for _ in range(REPEATS):
+            scenario()
+        results[name] = (time.perf_counter() - started) / REPEATS * 1_000_000
+
+    return results
+
+
+def main(rows: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        populate(Model(court_number='BENCH'), rows=rows)
+
+        uncached = measure(Model(court_number='BENCH'))
+        cached = measure(Model(court_number='BENCH', use_cache=True))
+
+    print(f'{rows} reservations, mean latency per call:')
+    for name in uncached:
+        print(f'  {name:<28} sqlite {uncached[name]:9.1f} us   cache {cached[name]:9.1f} us')
+
+
+if __name__ == '__main__':
+    main(rows=int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
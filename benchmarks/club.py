@@ -0,0 +1,53 @@
+"""Compares "any court free at 18:00?" asked of per-court files one by one against one club database.
+
+Run from the project root: `python -m benchmarks.club [rows per court]`.
+"""
+import datetime as dt
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.cache import populate
+from mvc.club import Club
+from mvc.model import Model
+
+COURTS = 12
+REPEATS = 200
+
+
+def main(rows: int) -> None:
+    datetime_ = dt.datetime(2025, 6, 1, 18, 0)
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        club = Club()
+        models = [Model(court_number=court) for court in range(1, COURTS + 1)]
+        for court, model in enumerate(models, start=1):
+            populate(model, rows=rows)
+            populate(club.court(court_number=court), rows=rows)
+
+        started = time.perf_counter()
+        for _ in range(REPEATS):
+            free_court = next(
+                (model.court_number for model in models if model.check_possible_reservations(datetime_)), None
+            )
+        per_file = (time.perf_counter() - started) / REPEATS
+
+        started = time.perf_counter()
+        for _ in range(REPEATS):
+            club_free_court = club.find_any_free_court(datetime_=datetime_, duration=30)
+        shared = (time.perf_counter() - started) / REPEATS
+
+        started = time.perf_counter()
+        club.get_schedule_data(date_from=datetime_.date(), date_to=datetime_.date() + dt.timedelta(days=6))
+        schedule = time.perf_counter() - started
+        club.pool.close()
+
+    print(f'{COURTS} courts, {rows} reservations each, first free court: {free_court} / {club_free_court}')
+    print(f'  per-court files, {COURTS} connections {per_file * 1_000_000:9.1f} us')
+    print(f'  club database, single query     {shared * 1_000_000:9.1f} us')
+    print(f'  club week schedule, all courts  {schedule * 1000:9.1f} ms')
+
+
+if __name__ == '__main__':
+    main(rows=int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
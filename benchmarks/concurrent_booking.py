@@ -0,0 +1,93 @@
+"""Several front-desk processes booking the same week of one court at once.
+
+Compares the check-then-act flow (check_possible_reservations, then create_reservation) with the atomic
+book_reservation, reporting throughput and the overlapping reservations each of them left in the database.
+Run from the project root: `python -m benchmarks.concurrent_booking [processes] [attempts per process]`.
+"""
+import collections
+import datetime as dt
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+from mvc.model import Model
+from mvc.quota import Quota
+
+WEEK_START = dt.datetime(2025, 6, 2)
+SLOTS = 7 * 24 * 2
+PLAYERS = 300
+
+
+def book(arguments: tuple) -> collections.Counter:
+    """Makes attempts random bookings of 30 to 90 minutes within the week, returns counts of outcomes."""
+    desk, attempts, atomic = arguments
+    generator = random.Random(desk)
+    model = Model(court_number='BENCH')
+    outcomes = collections.Counter()
+    for _ in range(attempts):
+        res_start = WEEK_START + dt.timedelta(minutes=30 * generator.randrange(SLOTS))
+        res_end = res_start + dt.timedelta(minutes=generator.choice((30, 60, 90)))
+        name = f'Player {generator.randrange(PLAYERS)}'
+        if atomic:
+            error, message = model.book_reservation(name=name, res_start=res_start, res_end=res_end)
+            outcomes['booked' if error == Model.OK else message] += 1
+        elif not model.check_if_eligible(name=name, datetime_=res_start):
+            outcomes['over quota'] += 1
+        elif (res_end - res_start).seconds // 60 not in model.check_possible_reservations(datetime_=res_start):
+            outcomes['taken'] += 1
+        else:
+            model.create_reservation(name=name, res_start=res_start, res_end=res_end)
+            outcomes['booked'] += 1
+    model.connection.close()
+    return outcomes
+
+
+def violations(model: Model) -> tuple:
+    """Returns count of overlapping reservation pairs and of (name, week) pairs above the weekly limit."""
+    rows = model.cursor.execute(
+        'SELECT full_name, datetime_from, datetime_to FROM reservation JOIN user ON user.id = reservation.user_id '
+        'WHERE court = ? ORDER BY datetime_from',
+        (model.court_number,)
+    ).fetchall()
+    overlaps = sum(1 for previous, current in zip(rows, rows[1:]) if current[1] < previous[2])
+    weekly = collections.Counter((name, Quota.period_start('week', start)) for name, start, _ in rows)
+    over_limit = sum(1 for count in weekly.values() if count > Model.QUOTA_LIMITS['week'])
+    return overlaps, over_limit
+
+
+def run(processes: int, attempts: int, atomic: bool) -> None:
+    model = Model(court_number='BENCH')
+    model.cursor.execute('DELETE FROM reservation')
+    model.cursor.execute('DELETE FROM reservation_quota')
+    model.connection.commit()
+
+    started = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        outcomes = sum(pool.map(book, [(desk, attempts, atomic) for desk in range(processes)]), collections.Counter())
+    elapsed = time.perf_counter() - started
+
+    overlaps, over_limit = violations(model)
+    model.connection.close()
+    label = 'book_reservation' if atomic else 'check, then create'
+    print(f'  {label:20} {processes * attempts / elapsed:8.0f} attempts/s  '
+          f'{outcomes["booked"] / elapsed:7.0f} bookings/s  overlaps {overlaps:4}  over limit {over_limit:4}')
+    for outcome, count in sorted(outcomes.items()):
+        print(f'  {"":20} {count:6}  {outcome}')
+
+
+def main(processes: int, attempts: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        print(f'{processes} processes, {attempts} attempts each, {SLOTS} half-hour slots from {WEEK_START:%d.%m.%Y}')
+        run(processes=processes, attempts=attempts, atomic=False)
+        run(processes=processes, attempts=attempts, atomic=True)
+
+
+if __name__ == '__main__':
+    main(
+        processes=int(sys.argv[1]) if len(sys.argv) > 1 else 8,
+        attempts=int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    )
@@ -0,0 +1,113 @@
+"""Synthetic, reproducible reservation datasets for benchmarks.
+
+Courts are booked day after day within opening hours: at every free slot a reservation of 30, 60 or 90 minutes
+starts with probability of the requested occupancy. Players are drawn at random, skipping the ones who already
+reached the weekly limit, so generated data passes the same rules as bookings made through Model.
+Run from the project root to keep a dataset: `python -m benchmarks.dataset FILE [reservations] [courts]`.
+"""
+import datetime as dt
+import random
+import sys
+import time
+
+from mvc.availability import Availability
+from mvc.model import Model
+from mvc.queries import Queries
+from utils.epoch import EpochMinutes
+
+FIRST_DAY = dt.date(2024, 1, 1)
+OPENING_HOURS = (7 * 60, 22 * 60)
+LENGTHS = (30, 60, 90)
+LENGTH_WEIGHTS = (2, 5, 3)
+BATCH_SIZE = 50_000
+
+
+def generate(
+        database: str,
+        reservations: int,
+        courts: int = 1,
+        players: int = 2000,
+        occupancy: float = 0.6,
+        seed: int = 0
+) -> dict:
+    """Fills the database with reservations spread evenly over courts 1..courts.
+    Returns (first, last) epoch minutes of the generated reservations by court."""
+    weekly_slots = 7 * (OPENING_HOURS[1] - OPENING_HOURS[0]) // Availability.SLOT_MINUTES
+    if players * Model.QUOTA_LIMITS['week'] < weekly_slots:
+        raise ValueError(f'At least {-(-weekly_slots // Model.QUOTA_LIMITS["week"])} players are needed!')
+
+    generator = random.Random(seed)
+    ranges = {}
+    for court in range(1, courts + 1):
+        model = Model(court_number=court, database=database)
+        count = reservations // courts + (court <= reservations % courts)
+        ranges[court] = _generate_court(
+            model=model, reservations=count, players=players, occupancy=occupancy, generator=generator
+        )
+        model.connection.close()
+
+    return ranges
+
+
+def _generate_court(
+        model: Model, reservations: int, players: int, occupancy: float, generator: random.Random
+) -> tuple:
+    opening, closing = OPENING_HOURS
+    limit = Model.QUOTA_LIMITS['week']
+    day = EpochMinutes.from_date(FIRST_DAY)
+    week, weekly_counts = None, {}
+    batch = []
+    generated = 0
+    first = last = None
+
+    model.cursor.execute('BEGIN')
+    while generated < reservations:
+        minute = day + opening
+        while minute < day + closing and generated < reservations:
+            if generator.random() >= occupancy:
+                minute += Availability.SLOT_MINUTES
+                continue
+
+            length = min(generator.choices(LENGTHS, LENGTH_WEIGHTS)[0], day + closing - minute)
+            if EpochMinutes.week_start(minute) != week:
+                week, weekly_counts = EpochMinutes.week_start(minute), {}
+            name = f'Player {generator.randrange(players)}'
+            while weekly_counts.get(name, 0) >= limit:
+                name = f'Player {generator.randrange(players)}'
+            weekly_counts[name] = weekly_counts.get(name, 0) + 1
+
+            batch.append({'court': model.court_number, 'name': name, 'start': minute, 'end': minute + length})
+            first = minute if first is None else first
+            generated += 1
+            minute += length
+            last = minute
+            if len(batch) == BATCH_SIZE:
+                _insert(model=model, batch=batch)
+                batch = []
+        day += EpochMinutes.MINUTES_PER_DAY
+
+    _insert(model=model, batch=batch)
+    model.connection.commit()
+    return first, last
+
+
+def _insert(model: Model, batch: list) -> None:
+    """Inserts batch with its users, quota counters, change log entries and day bitmaps, as Model._insert_batch."""
+    for row in batch:
+        row['user'] = model.users.get_or_create(name=row['name'])
+    last_id = model.cursor.execute(Queries.LAST_RESERVATION_ID).fetchone()[0]
+    model.cursor.executemany(Queries.INSERT_RESERVATION, batch)
+    model.quota.update(reservations=((row['user'], row['start']) for row in batch), delta=1)
+    model.change_log.record_inserted_after(reservation_id=last_id)
+    model.bitmap.add(reservations=((row['start'], row['end']) for row in batch))
+
+
+if __name__ == '__main__':
+    started = time.perf_counter()
+    arguments = sys.argv[1:]
+    generate(
+        database=arguments[0],
+        reservations=int(arguments[1]) if len(arguments) > 1 else 100_000,
+        courts=int(arguments[2]) if len(arguments) > 2 else 1
+    )
+    print(f'Generated {arguments[0]} in {time.perf_counter() - started:.1f} s')
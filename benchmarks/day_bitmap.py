@@ -0,0 +1,83 @@
+"""Compares finding free time by walking reservation rows with finding it in day bitmaps.
+
+A fully booked month is searched for the first free slot after it, and a month of free/busy data
+is measured as the schedule json and as bitmaps. Run from the project root: `python -m benchmarks.day_bitmap`.
+"""
+import datetime as dt
+import json
+import os
+import tempfile
+import time
+
+from mvc.availability import Availability
+from mvc.model import Model
+from mvc.queries import Queries
+from utils.epoch import EpochMinutes
+
+REPEATS = 200
+MONTH_START = dt.datetime(2025, 6, 1)
+
+
+def populate(model: Model) -> None:
+    """Books every 30 minutes of June back to back, leaving July free."""
+    start = EpochMinutes.from_datetime(MONTH_START)
+    reservations = [(start + i * 30, start + i * 30 + 30) for i in range(30 * 48)]
+    users = [model.users.get_or_create(name=f'Player {i}') for i in range(500)]
+    model.cursor.executemany(Queries.INSERT_RESERVATION, (
+        {'court': model.court_number, 'user': users[i % 500], 'start': res_start, 'end': res_end}
+        for i, (res_start, res_end) in enumerate(reservations)
+    ))
+    model.bitmap.add(reservations=reservations)
+    model.connection.commit()
+
+
+def row_scan(model: Model, datetime_: dt.datetime) -> dt.datetime:
+    """First free slot found by walking reservations overlapping the horizon, as before day bitmaps."""
+    window_start = EpochMinutes.from_datetime(datetime_)
+    window_end = EpochMinutes.from_datetime(datetime_ + Model.RECOMMENDATION_HORIZON * 2)
+    for gap_start, _ in Availability.free_slots(
+            reservations=model.connection.execute(Queries.RESERVATIONS_OVERLAPPING, {
+                'court': model.court_number, 'window_start': window_start, 'window_end': window_end
+            }),
+            window_start=window_start,
+            window_end=window_end,
+            min_length=Availability.SLOT_MINUTES
+    ):
+        return EpochMinutes.to_datetime(gap_start)
+
+
+def timed(function) -> tuple:
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        result = function()
+    return result, (time.perf_counter() - started) / REPEATS
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        model = Model(court_number='BENCH')
+        populate(model)
+
+        found_scan, scan = timed(lambda: row_scan(model, MONTH_START))
+        found_bitmap, bitmap = timed(lambda: model.recommend_other_date(
+            datetime_=MONTH_START, horizon=Model.RECOMMENDATION_HORIZON * 2
+        ))
+        date_to = MONTH_START.date() + dt.timedelta(days=29)
+        schedule = model.get_schedule_data(date_from=MONTH_START.date(), date_to=date_to)
+        schedule_size = len(json.dumps({
+            str(date_): [(name, str(start), str(end)) for name, start, end in reservations]
+            for date_, reservations in schedule.items()
+        }))
+        busy_slots = model.get_busy_slots(date_from=MONTH_START.date(), date_to=date_to)
+        bitmap_size = sum((mask.bit_length() + 7) // 8 for mask in busy_slots.values())
+        model.connection.close()
+
+    print(f'first free slot after a fully booked month: {found_scan} / {found_bitmap}')
+    print(f'  reservation rows walk   {scan * 1000:8.3f} ms')
+    print(f'  day bitmaps             {bitmap * 1000:8.3f} ms')
+    print(f'month of free/busy data: schedule json {schedule_size} bytes, bitmaps {bitmap_size} bytes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Measures peak memory of schedule exports over growing date ranges, which should stay flat.
+
+Run from the project root: `python -m benchmarks.export_memory [rows]`.
+"""
+import datetime as dt
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.cache import populate
+from mvc.model import Model
+
+
+def main(rows: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        populate(Model(court_number='BENCH'), rows=rows)
+        date_to = dt.date(2025, 6, 1) + dt.timedelta(days=rows // 24)
+
+        for use_cache in (False, True):
+            model = Model(court_number='BENCH', use_cache=use_cache)
+            # The REPL loads its cache on the first lookup, only the export itself is measured:
+            model.check_possible_reservations(datetime_=dt.datetime(2025, 6, 1, 12, 0))
+            print(f'{rows} reservations{", cached" if use_cache else ""}:')
+            for days in (30, 365, rows // 12):
+                for file_format in ('csv', 'json'):
+                    tracemalloc.start()
+                    started = time.perf_counter()
+                    model.export_schedule_data(
+                        date_from=date_to - dt.timedelta(days=days),
+                        date_to=date_to,
+                        file_format=file_format,
+                        filename='export'
+                    )
+                    elapsed = time.perf_counter() - started
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    print(f'  {days:>6} days {file_format:<4} {elapsed * 1000:9.1f} ms  peak {peak / 1024:9.1f} KiB')
+            model.connection.close()
+
+if __name__ == '__main__':
+    main(rows=int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
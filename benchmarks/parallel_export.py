@@ -0,0 +1,74 @@
+"""Month-end export of every court: one court after another through Model.export_schedule_data, against
+ParallelExport with growing worker counts, on a generated club database (see benchmarks.dataset).
+
+Speedup is relative to the sequential export, and is bounded by the CPUs available, which are printed.
+Run from the project root: `python -m benchmarks.parallel_export [--courts 8] [--format json]`.
+"""
+import argparse
+import datetime as dt
+import os
+import tempfile
+import time
+
+from benchmarks import dataset
+from mvc.model import Model
+from mvc.parallel_export import ParallelExport
+from utils.epoch import EpochMinutes
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Parallel export of every court.')
+    parser.add_argument('--courts', type=int, default=8)
+    parser.add_argument('--reservations', type=int, default=40_000, help='reservations of every court')
+    parser.add_argument('--format', choices=ParallelExport.FILE_FORMATS, default='csv')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count(), help='largest worker count timed')
+    return parser.parse_args()
+
+
+def worker_counts(max_workers: int) -> list:
+    """Powers of two up to max_workers, and max_workers itself."""
+    counts = [1]
+    while counts[-1] * 2 < max_workers:
+        counts.append(counts[-1] * 2)
+    return counts + [max_workers] if max_workers > 1 else counts
+
+
+def sequential(courts: list, database: str, date_from: dt.date, date_to: dt.date, file_format: str) -> None:
+    for court in courts:
+        model = Model(court_number=court, database=database)
+        model.export_schedule_data(
+            date_from=date_from, date_to=date_to, file_format=file_format, filename=f'sequential_{court}'
+        )
+        model.connection.close()
+
+
+def main(arguments: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, 'tennis_club.db')
+        ranges = dataset.generate(
+            database=database, reservations=arguments.reservations * arguments.courts, courts=arguments.courts
+        )
+        date_from = dataset.FIRST_DAY
+        date_to = EpochMinutes.to_datetime(max(last for _, last in ranges.values())).date()
+        courts = list(ranges)
+        Model.EXPORTS_DIRECTORY = ParallelExport.EXPORTS_DIRECTORY = os.path.join(directory, 'exported_schedules')
+        print(
+            f'{len(courts)} courts, {arguments.reservations} reservations each, {date_from} - {date_to}, '
+            f'{arguments.format}, {os.cpu_count()} CPUs available'
+        )
+
+        started = time.perf_counter()
+        sequential(courts=courts, database=database, date_from=date_from, date_to=date_to, file_format=arguments.format)
+        baseline = time.perf_counter() - started
+        print(f'{"sequential":>12} {baseline:8.2f} s')
+
+        for workers in worker_counts(max_workers=arguments.max_workers):
+            exporter = ParallelExport(courts=courts, database=database, workers=workers)
+            started = time.perf_counter()
+            exporter.export(date_from=date_from, date_to=date_to, file_format=arguments.format, filename='report')
+            elapsed = time.perf_counter() - started
+            print(f'{workers:>4} workers {elapsed:8.2f} s {baseline / elapsed:6.2f}x')
+
+
+if __name__ == '__main__':
+    main(arguments=parse_arguments())
@@ -0,0 +1,100 @@
+"""Shows query plans of Model lookups before and after the schema migration.
+
+Run from the project root: `python -m benchmarks.query_plans [rows]`.
+"""
+import datetime as dt
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from mvc.model import Model
+from mvc.queries import Queries
+from utils.epoch import EpochMinutes
+
+LEGACY_QUERIES = {
+    'check_possible_reservations': (
+        "SELECT * FROM reservation WHERE datetime_from <= '2025-06-01 18:00' AND datetime_to > '2025-06-01 18:00'", {}
+    ),
+    'check_if_eligible': (
+        "SELECT * FROM reservation WHERE full_name='Player 7' "
+        "AND datetime_from >= '2025-05-26' AND datetime_from <= '2025-06-01'", {}
+    ),
+    'recommend_other_date': (
+        "SELECT * FROM reservation WHERE datetime_to > '2025-06-01 18:00' ORDER BY datetime_from", {}
+    ),
+    'get_schedule_data': (
+        "SELECT * FROM reservation "
+        "WHERE datetime_to > '2025-06-01' AND datetime_from < '2025-06-08' ORDER BY datetime_from", {}
+    ),
+}
+
+MINUTE = EpochMinutes.from_datetime(dt.datetime(2025, 6, 1, 18, 0))
+MIGRATED_QUERIES = {
+    'check_possible_reservations': (Queries.NEXT_RESERVATION, {'court': 'BENCH', 'minute': MINUTE}),
+    'check_if_eligible': (
+        Queries.SELECT_QUOTA_COUNT,
+        # Id of 'Player 7' is known once the database is migrated:
+        {'court': 'BENCH', 'period': 'week', 'period_start': MINUTE - 7200, 'user': None}
+    ),
+    'recommend_other_date': (
+        Queries.RESERVATIONS_OVERLAPPING, {'court': 'BENCH', 'window_start': MINUTE, 'window_end': MINUTE + 43200}
+    ),
+    'get_schedule_data': (
+        Queries.RESERVATIONS_STARTING_BETWEEN, {'court': 'BENCH', 'range_start': MINUTE, 'range_end': MINUTE + 10080}
+    ),
+    # Last 100 changes of the log filled by the migration:
+    'export_schedule_changes': (Queries.CHANGES_BETWEEN, {'court': 'BENCH', 'after': 99_900, 'until': 100_000}),
+}
+
+
+def create_legacy_db(path: str, rows: int) -> None:
+    """Creates database with the pre-migration schema and one 90 minute reservation every 2 hours."""
+    connection = sqlite3.connect(path)
+    connection.execute('CREATE TABLE reservation(full_name varchar, datetime_from time, datetime_to time)')
+    start = dt.datetime(2025, 6, 1) - dt.timedelta(hours=2 * rows // 2)
+    connection.executemany('INSERT INTO reservation VALUES (?, ?, ?)', (
+        (
+            f'Player {i % 50}',
+            (start + dt.timedelta(hours=2 * i)).strftime('%Y-%m-%d %H:%M'),
+            (start + dt.timedelta(hours=2 * i, minutes=90)).strftime('%Y-%m-%d %H:%M'),
+        ) for i in range(rows)
+    ))
+    connection.commit()
+    connection.close()
+
+
+def report(cursor: sqlite3.Cursor, queries: dict) -> None:
+    for method, (query, parameters) in queries.items():
+        plan = ' | '.join(row[-1] for row in cursor.execute(f'EXPLAIN QUERY PLAN {query}', parameters))
+        started = time.perf_counter()
+        for _ in range(20):
+            cursor.execute(query, parameters).fetchall()
+        elapsed = (time.perf_counter() - started) / 20 * 1000
+        print(f'  {method:<28} {elapsed:8.3f} ms  {plan}')
+
+
+def main(rows: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        create_legacy_db('tennis_court_BENCH.db', rows=rows)
+
+        connection = sqlite3.connect('tennis_court_BENCH.db')
+        print(f'Legacy schema ({rows} rows):')
+        report(connection.cursor(), LEGACY_QUERIES)
+        connection.close()
+
+        started = time.perf_counter()
+        model = Model(court_number='BENCH')
+        # The database is opened and migrated on first use:
+        model.connection
+        MIGRATED_QUERIES['check_if_eligible'][1]['user'] = model.users.find(name='Player 7')
+        print(f'\nMigration took {(time.perf_counter() - started) * 1000:.1f} ms.\n')
+        print('Migrated schema:')
+        report(model.cursor, MIGRATED_QUERIES)
+        model.connection.close()
+
+
+if __name__ == '__main__':
+    main(rows=int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
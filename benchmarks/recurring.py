@@ -0,0 +1,48 @@
+"""Compares booking a season of weekly league games one by one with booking them as one recurring reservation.
+
+Run from the project root: `python -m benchmarks.recurring [weeks]`.
+"""
+import datetime as dt
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.cache import populate
+from mvc.model import Model
+
+FIRST_GAME = dt.datetime(2030, 1, 1, 18, 0)
+LENGTH = dt.timedelta(minutes=90)
+
+
+def main(weeks: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        one_by_one = Model(court_number='SINGLE')
+        recurring = Model(court_number='RECURRING')
+        for model in (one_by_one, recurring):
+            populate(model, rows=20_000)
+
+        started = time.perf_counter()
+        booked = 0
+        for week in range(weeks):
+            res_start = FIRST_GAME + dt.timedelta(weeks=week)
+            error, _ = one_by_one.book_reservation(name='League', res_start=res_start, res_end=res_start + LENGTH)
+            booked += error == Model.OK
+        single = time.perf_counter() - started
+
+        started = time.perf_counter()
+        _, message, _ = recurring.create_recurring_reservation(
+            name='League', res_start=FIRST_GAME, length=90, rule=f'FREQ=WEEKLY;COUNT={weeks}'
+        )
+        batch = time.perf_counter() - started
+        one_by_one.connection.close()
+        recurring.connection.close()
+
+    print(f'{weeks} weekly games on a court with 20000 reservations')
+    print(f'  book_reservation per game       {single * 1000:8.1f} ms  booked {booked}')
+    print(f'  create_recurring_reservation    {batch * 1000:8.1f} ms  {message}')
+
+
+if __name__ == '__main__':
+    main(weeks=int(sys.argv[1]) if len(sys.argv) > 1 else 52)
@@ -0,0 +1,43 @@
+"""Measures materializing a long schedule range as the dict of lists and as numpy arrays.
+
+Run from the project root: `python -m benchmarks.schedule_materialization [rows]`. numpy is optional.
+"""
+import datetime as dt
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.cache import populate
+from mvc.model import Model
+
+REPEATS = 5
+
+
+def timed(function) -> float:
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        function()
+    return (time.perf_counter() - started) / REPEATS
+
+
+def main(rows: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        model = Model(court_number='BENCH')
+        populate(model, rows=rows)
+        # Every reservation, populate spreads them around 1 June 2025:
+        date_from, date_to = dt.date(2020, 1, 1), dt.date(2030, 12, 31)
+
+        print(f'{rows} reservations over {(date_to - date_from).days + 1} days')
+        elapsed = timed(lambda: model.get_schedule_data(date_from=date_from, date_to=date_to))
+        print(f'  get_schedule_data      {elapsed * 1000:8.1f} ms  {rows / elapsed:10.0f} rows/s')
+        if importlib.util.find_spec('numpy') is not None:
+            elapsed = timed(lambda: model.get_schedule_arrays(date_from=date_from, date_to=date_to))
+            print(f'  get_schedule_arrays    {elapsed * 1000:8.1f} ms  {rows / elapsed:10.0f} rows/s')
+        model.connection.close()
+
+
+if __name__ == '__main__':
+    main(rows=int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
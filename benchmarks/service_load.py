@@ -0,0 +1,122 @@
+"""Load test of the HTTP/JSON service over localhost: latency percentiles and requests per second.
+
+Service runs in its own process on a shared club database. Clients keep their connections alive and send
+a kiosk-like mix: mostly availability checks, some weekly schedules and bookings spread over four courts.
+Run from the project root: `python -m benchmarks.service_load [clients] [requests per client]`.
+"""
+import asyncio
+import collections
+import datetime as dt
+import json
+import multiprocessing
+import os
+import random
+import socket
+import statistics
+import sys
+import tempfile
+import time
+
+from mvc.service import Service
+
+COURTS = 4
+FIRST_DAY = dt.date.today() + dt.timedelta(days=2)
+
+
+def run_service(port: int) -> None:
+    service = Service(database='tennis_club.db', port=port)
+    try:
+        asyncio.run(service.serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+def random_request(generator: random.Random) -> tuple:
+    """Returns (kind, method, path, body) of the next request."""
+    court = generator.randint(1, COURTS)
+    start = dt.datetime.combine(FIRST_DAY + dt.timedelta(days=generator.randrange(28)), dt.time(8, 0))
+    start += dt.timedelta(minutes=30 * generator.randrange(28))
+    kind = generator.choices(('availability', 'schedule', 'booking'), weights=(80, 10, 10))[0]
+    match kind:
+        case 'availability':
+            query = start.strftime(Service.DATETIME_FORMAT).replace(' ', '%20')
+            return kind, 'GET', f'/courts/{court}/availability?datetime={query}', b''
+        case 'schedule':
+            date_from = start.strftime(Service.DATE_FORMAT)
+            date_to = (start + dt.timedelta(days=6)).strftime(Service.DATE_FORMAT)
+            return kind, 'GET', f'/courts/{court}/schedule?from={date_from}&to={date_to}', b''
+        case 'booking':
+            body = json.dumps({
+                'name': f'Player {generator.randrange(500)}',
+                'start': start.strftime(Service.DATETIME_FORMAT),
+                'end': (start + dt.timedelta(minutes=generator.choice((30, 60, 90)))).strftime(Service.DATETIME_FORMAT)
+            }).encode()
+            return kind, 'POST', f'/courts/{court}/reservations', body
+
+
+async def client(port: int, requests: int, seed: int, latencies: dict, statuses: collections.Counter) -> None:
+    generator = random.Random(seed)
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    for _ in range(requests):
+        kind, method, path, body = random_request(generator)
+        started = time.perf_counter()
+        request = f'{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n'
+        writer.write(request.encode() + body)
+        status = int((await reader.readline()).split()[1])
+        length = 0
+        while (line := await reader.readline()) != b'\r\n':
+            if line.lower().startswith(b'content-length:'):
+                length = int(line.split(b':')[1])
+        await reader.readexactly(length)
+        latencies[kind].append(time.perf_counter() - started)
+        statuses[status] += 1
+    writer.close()
+    await writer.wait_closed()
+
+
+async def load(port: int, clients: int, requests: int) -> None:
+    for _ in range(100):
+        try:
+            _, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.close()
+            break
+        except ConnectionError:
+            await asyncio.sleep(0.05)
+
+    latencies = collections.defaultdict(list)
+    statuses = collections.Counter()
+    started = time.perf_counter()
+    await asyncio.gather(*(client(port, requests, seed, latencies, statuses) for seed in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    print(f'{clients} clients, {requests} requests each, {COURTS} courts: '
+          f'{clients * requests / elapsed:.0f} requests/s, statuses {dict(sorted(statuses.items()))}')
+    for kind, values in [('all', sum(latencies.values(), []))] + sorted(latencies.items()):
+        percentiles = statistics.quantiles(values, n=100)
+        print(f'  {kind:13} {len(values):7} requests   p50 {percentiles[49] * 1000:7.2f} ms'
+              f'   p99 {percentiles[98] * 1000:7.2f} ms')
+
+
+def main(clients: int, requests: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+
+        service = multiprocessing.Process(target=run_service, args=(port,))
+        service.start()
+        try:
+            asyncio.run(load(port=port, clients=clients, requests=requests))
+        finally:
+            service.terminate()
+            service.join()
+
+
+if __name__ == '__main__':
+    main(
+        clients=int(sys.argv[1]) if len(sys.argv) > 1 else 32,
+        requests=int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    )
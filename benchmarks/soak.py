@@ -0,0 +1,104 @@
+"""Soak test of the REPL: runs scripted operations through Controller in one session, as a front desk terminal
+left running all day would, and checks that memory and stack depth stay flat.
+
+Every cycle makes a reservation, prints the schedule of its day and cancels it, answering 'continue' after each
+operation, with a new name and date every time. Traced memory and stack depth are sampled at CHECKPOINTS points
+of the run, the run exits with status 1 when memory grew by more than MAX_GROWTH bytes after warming up,
+or the stack got deeper.
+Run from the project root: `python -m benchmarks.soak [operations]`.
+"""
+import builtins
+import contextlib
+import datetime as dt
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from mvc.controller import Controller
+from mvc.model import Model
+from mvc.view import View
+
+OPERATIONS = 100_000
+CHECKPOINTS = 10
+MAX_GROWTH = 1024 * 1024
+FIRST_RESERVATION = dt.datetime(2030, 1, 1, 0, 0)
+
+
+class SoakView(View):
+    """Terminal is not cleared, a shell would be started for every screen."""
+
+    @staticmethod
+    def clear_screen() -> None:
+        pass
+
+
+def script(operations: int):
+    """Yields answers to REPL prompts, three operations per cycle."""
+    for cycle in range(-(-operations // 3)):
+        res_start = FIRST_RESERVATION + dt.timedelta(hours=2 * cycle)
+        datetime_ = res_start.strftime(Controller.DATETIME_FORMAT)
+        date_ = res_start.strftime(Controller.DATE_FORMAT)
+        name = f'Player {cycle}'
+        yield from ('1', datetime_, name, '1', '1')
+        yield from ('4', date_, date_, '1', '1', '1')
+        yield from ('3', name, datetime_, '1')
+    # Exit is the last option of the Main Menu:
+    yield from ('6', '1')
+
+
+def stack_depth() -> int:
+    depth, frame = 0, sys._getframe()
+    while frame is not None:
+        depth, frame = depth + 1, frame.f_back
+    return depth
+
+
+def main(operations: int) -> int:
+    answers = script(operations=operations)
+    # Five prompts are answered per operation:
+    checkpoint_every = max(operations * 5 // CHECKPOINTS, 1)
+    samples = []
+    prompts = 0
+
+    def scripted_input(prompt: str = '') -> str:
+        nonlocal prompts
+        prompts += 1
+        if prompts % checkpoint_every == 0:
+            # Garbage waiting for the cyclic collector is not a leak:
+            gc.collect()
+            samples.append((prompts, tracemalloc.get_traced_memory()[0], stack_depth()))
+        return next(answers)
+
+    with tempfile.TemporaryDirectory() as directory:
+        model = Model(court_number='SOAK', use_cache=True, database=os.path.join(directory, 'soak.db'))
+        controller = Controller(model=model, view=SoakView())
+        original_input = builtins.input
+        builtins.input = scripted_input
+        tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                controller.start()
+        finally:
+            elapsed = time.perf_counter() - started
+            tracemalloc.stop()
+            builtins.input = original_input
+            model.connection.close()
+
+    print(f'{operations} operations ({prompts} prompts) in {elapsed:.1f} s, {operations / elapsed:.0f} operations/s')
+    print(f'{"prompts":>10} {"traced KiB":>12} {"stack depth":>12}')
+    for prompt, memory, depth in samples:
+        print(f'{prompt:10} {memory / 1024:12.1f} {depth:12}')
+
+    # The first sample includes statement caches and other one-off allocations:
+    growth = samples[-1][1] - samples[1][1] if len(samples) > 2 else 0
+    deeper = len({depth for _, _, depth in samples}) > 1
+    print(f'Memory growth after warm up: {growth / 1024:.1f} KiB, stack depth {"grew" if deeper else "constant"}.')
+    return 1 if growth > MAX_GROWTH or deeper else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(operations=int(sys.argv[1]) if len(sys.argv) > 1 else OPERATIONS))
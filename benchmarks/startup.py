@@ -0,0 +1,74 @@
+"""Measures cold start of the REPL: interpreter start, imports of main.py and creating its Model and Controller.
+
+Each run is a new interpreter started with `-X importtime`, after a first run writing bytecode caches,
+as an installed kiosk has them. Median of the runs is compared with BUDGET_MS,
+the run exits with status 1 when startup exceeds it. The slowest imports are listed, to show what to defer.
+Run from the project root: `python -m benchmarks.startup [runs]`.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RUNS = 20
+# Budget of main.py startup, on top of the bare interpreter start:
+BUDGET_MS = 60
+SLOWEST = 10
+# Modules main.py imports only when they are needed:
+DEFERRED = ('numpy', 'asyncio', 'dateutil.rrule', 'mvc.service', 'mvc.instrumentation')
+STARTUP = (
+    'import main\n'
+    'controller = main.Controller(model=main.Model(court_number="STARTUP"), view=main.View())\n'
+)
+
+
+def run(code: str, directory: str) -> tuple:
+    """Returns wall time in ms and {module: cumulative import time in us} of one interpreter run."""
+    environment = {**os.environ, 'PYTHONPATH': os.getcwd()}
+    environment.pop('PYTHONDONTWRITEBYTECODE', None)
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=directory,
+        env=environment,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    elapsed = (time.perf_counter() - started) * 1000
+
+    imports = {}
+    for line in process.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line and 'cumulative' not in line:
+            _, cumulative, module = line.split('|')
+            imports[module.strip()] = int(cumulative)
+    return elapsed, imports
+
+
+def main(runs: int) -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        run(code=STARTUP, directory=directory)
+        interpreter = statistics.median(run(code='pass', directory=directory)[0] for _ in range(runs))
+        results = [run(code=STARTUP, directory=directory) for _ in range(runs)]
+
+    startup = statistics.median(elapsed for elapsed, _ in results) - interpreter
+    main_import = statistics.median(imports['main'] for _, imports in results) / 1000
+    print(f'Interpreter start: {interpreter:.1f} ms')
+    print(f'main.py startup:   {startup:.1f} ms (imports {main_import:.1f} ms), budget {BUDGET_MS} ms')
+
+    _, imports = results[-1]
+    print('\nSlowest imports of main.py (cumulative ms):')
+    for module, cumulative in sorted(imports.items(), key=lambda item: item[1], reverse=True)[:SLOWEST]:
+        print(f'  {module:40} {cumulative / 1000:8.1f}')
+
+    deferred = [module for module in DEFERRED if module in imports]
+    for module in deferred:
+        print(f'{module} is imported on startup!')
+
+    return 1 if startup > BUDGET_MS or deferred else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(runs=int(sys.argv[1]) if len(sys.argv) > 1 else RUNS))
@@ -0,0 +1,69 @@
+"""Compares repeated availability and quota probes built with f-strings against bound, cached statements.
+
+Run from the project root: `python -m benchmarks.statement_cache [rows]`.
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from benchmarks.cache import populate
+from mvc.model import Model
+from mvc.queries import Queries
+from utils.epoch import EpochMinutes
+
+PROBES = 20_000
+
+
+def formatted_probes(connection: sqlite3.Connection, minutes: list) -> None:
+    """Every probe has different text, so each one is compiled again. populate adds Player 0-49 as users 1-50."""
+    for minute in minutes:
+        connection.execute(
+            f"SELECT datetime_from, datetime_to FROM reservation "
+            f"WHERE court = 'BENCH' AND datetime_to > {minute} ORDER BY datetime_to LIMIT 1"
+        ).fetchone()
+        connection.execute(
+            f"SELECT reservation_count FROM reservation_quota WHERE court = 'BENCH' AND period = 'week' "
+            f"AND period_start = {EpochMinutes.week_start(minute)} AND user_id = {minute % 50 + 1}"
+        ).fetchone()
+
+
+def bound_probes(connection: sqlite3.Connection, minutes: list) -> None:
+    for minute in minutes:
+        connection.execute(Queries.NEXT_RESERVATION, {'court': 'BENCH', 'minute': minute}).fetchone()
+        connection.execute(
+            Queries.SELECT_QUOTA_COUNT,
+            {
+                'court': 'BENCH',
+                'period': 'week',
+                'period_start': EpochMinutes.week_start(minute),
+                'user': minute % 50 + 1
+            }
+        ).fetchone()
+
+
+def main(rows: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        model = Model(court_number='BENCH')
+        populate(model, rows=rows)
+        first, last = model.cursor.execute('SELECT MIN(datetime_from), MAX(datetime_to) FROM reservation').fetchone()
+        minutes = [first + (last - first) * i // PROBES for i in range(PROBES)]
+
+        print(f'{PROBES} check_possible_reservations + check_if_eligible probes, {rows} reservations:')
+        for label, probes, cached_statements in (
+                ('f-strings', formatted_probes, 0),
+                ('bound, no statement cache', bound_probes, 0),
+                ('bound, statement cache', bound_probes, Queries.CACHED_STATEMENTS),
+        ):
+            connection = sqlite3.connect('tennis_court_BENCH.db', cached_statements=cached_statements)
+            started = time.perf_counter()
+            probes(connection, minutes)
+            elapsed = time.perf_counter() - started
+            connection.close()
+            print(f'  {label:<28} {elapsed * 1000:9.1f} ms  {elapsed / PROBES * 1_000_000:7.2f} us/probe pair')
+
+
+if __name__ == '__main__':
+    main(rows=int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
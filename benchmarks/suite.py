@@ -0,0 +1,187 @@
+"""Benchmark suite of Model hot paths on a generated dataset, see benchmarks.dataset.
+
+Every scenario is timed call by call, median and 95th percentile are written as json and compared with
+a stored baseline, a scenario slower than the baseline by more than the threshold is reported as a regression
+and makes the run exit with status 1. Run from the project root, e.g.
+`python -m benchmarks.suite --reservations 1000000 --courts 4 --output results.json`,
+add `--save-baseline` to store the results as the new baseline.
+"""
+import argparse
+import datetime as dt
+import itertools
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks import dataset
+from mvc.model import Model
+from utils.epoch import EpochMinutes
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Benchmark suite of Model hot paths.')
+    parser.add_argument('--reservations', type=int, default=100_000, help='reservations in the generated dataset')
+    parser.add_argument('--courts', type=int, default=1, help='courts the reservations are spread over')
+    parser.add_argument('--players', type=int, default=2000, help='distinct player names')
+    parser.add_argument('--occupancy', type=float, default=0.6, help='chance of each free slot being booked')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeats', type=int, default=1000, help='calls of each lookup scenario')
+    parser.add_argument('--cache', action='store_true', help='answer lookups with the in-memory cache')
+    parser.add_argument('--database', help='keep the dataset in this file, reusing it if it already exists')
+    parser.add_argument('--output', help='write results to this json file')
+    parser.add_argument('--baseline', default=BASELINE, help='json results to compare with')
+    parser.add_argument('--save-baseline', action='store_true', help='store results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=1.25, help='slowdown reported as a regression')
+    return parser.parse_args()
+
+
+def scenarios(model: Model, first: int, last: int, repeats: int, seed: int, directory: str) -> dict:
+    """Returns {name: (call, repeats)}, calls cycle through datetimes drawn from the dataset range."""
+    generator = random.Random(seed)
+    slots = (last - first) // 30
+    datetimes = itertools.cycle([EpochMinutes.to_datetime(first + 30 * generator.randrange(slots)) for _ in range(997)])
+    names = itertools.cycle([f'Player {generator.randrange(2000)}' for _ in range(997)])
+    # New reservations go after the dataset, two hours apart:
+    free_starts = (EpochMinutes.to_datetime(last + EpochMinutes.MINUTES_PER_DAY + 120 * i) for i in itertools.count())
+    model.EXPORTS_DIRECTORY = directory
+
+    def create_reservation():
+        res_start = next(free_starts)
+        model.create_reservation(name='Benchmark', res_start=res_start, res_end=res_start + dt.timedelta(minutes=90))
+
+    def schedule_week():
+        date_from = next(datetimes).date()
+        model.get_schedule_data(date_from=date_from, date_to=date_from + dt.timedelta(days=6))
+
+    def export(file_format: str):
+        date_from = next(datetimes).date()
+        model.export_schedule_data(
+            date_from=date_from, date_to=date_from + dt.timedelta(days=29), file_format=file_format, filename='month'
+        )
+
+    return {
+        'check_possible_reservations': (lambda: model.check_possible_reservations(datetime_=next(datetimes)), repeats),
+        'check_if_eligible': (lambda: model.check_if_eligible(name=next(names), datetime_=next(datetimes)), repeats),
+        'recommend_other_date': (lambda: model.recommend_other_date(datetime_=next(datetimes)), repeats),
+        'get_schedule_data (week)': (schedule_week, repeats // 10),
+        'export csv (month)': (lambda: export('csv'), repeats // 100),
+        'export json (month)': (lambda: export('json'), repeats // 100),
+        'export bin (month)': (lambda: export('bin'), repeats // 100),
+        'create_reservation': (create_reservation, repeats // 10),
+    }
+
+
+def measure(call, repeats: int) -> dict:
+    timings = []
+    for _ in range(max(repeats, 5)):
+        started = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - started) * 1_000_000)
+
+    return {
+        'repeats': len(timings),
+        'median_us': round(statistics.median(timings), 2),
+        'p95_us': round(statistics.quantiles(timings, n=20)[18], 2),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Prints every scenario next to its baseline, returns names of the regressed ones."""
+    regressions = []
+    if baseline['dataset'] != results['dataset']:
+        print(f'Baseline was measured on another dataset: {baseline["dataset"]}')
+
+    print(f'{"scenario":30} {"median us":>12} {"baseline":>12} {"ratio":>7}')
+    for name, result in results['scenarios'].items():
+        expected = baseline['scenarios'].get(name)
+        if expected is None:
+            print(f'{name:30} {result["median_us"]:12.1f} {"-":>12}')
+            continue
+
+        ratio = result['median_us'] / expected['median_us']
+        flag = ''
+        if ratio > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f'{name:30} {result["median_us"]:12.1f} {expected["median_us"]:12.1f} {ratio:7.2f}{flag}')
+
+    return regressions
+
+
+def main(arguments: argparse.Namespace) -> int:
+    settings = {
+        'reservations': arguments.reservations,
+        'courts': arguments.courts,
+        'players': arguments.players,
+        'occupancy': arguments.occupancy,
+        'seed': arguments.seed,
+        'cache': arguments.cache,
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        database = arguments.database or os.path.join(directory, 'benchmark.db')
+        started = time.perf_counter()
+        if os.path.exists(database):
+            print(f'Reusing {database}')
+        else:
+            dataset.generate(
+                database=database,
+                reservations=arguments.reservations,
+                courts=arguments.courts,
+                players=arguments.players,
+                occupancy=arguments.occupancy,
+                seed=arguments.seed
+            )
+            print(f'Generated {arguments.reservations} reservations in {time.perf_counter() - started:.1f} s')
+
+        model = Model(court_number=1, use_cache=arguments.cache, database=database)
+        first, last = model.cursor.execute(
+            'SELECT MIN(datetime_from), MAX(datetime_to) FROM reservation WHERE court = 1'
+        ).fetchone()
+        results = {
+            'dataset': settings,
+            'environment': {
+                'python': platform.python_version(),
+                'sqlite': sqlite3.sqlite_version,
+                'platform': platform.platform(),
+            },
+            'scenarios': {
+                name: measure(call=call, repeats=repeats)
+                for name, (call, repeats) in scenarios(
+                    model=model,
+                    first=first,
+                    last=last,
+                    repeats=arguments.repeats,
+                    seed=arguments.seed,
+                    directory=directory
+                ).items()
+            },
+        }
+        model.connection.close()
+
+    if arguments.output:
+        with open(arguments.output, 'w') as results_file:
+            json.dump(results, results_file, indent=2)
+    if arguments.save_baseline:
+        with open(arguments.baseline, 'w') as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+        print(f'Saved baseline {arguments.baseline}')
+
+    if not os.path.exists(arguments.baseline):
+        print(json.dumps(results['scenarios'], indent=2))
+        return 0
+
+    with open(arguments.baseline) as baseline_file:
+        regressions = compare(results=results, baseline=json.load(baseline_file), threshold=arguments.threshold)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(arguments=parse_arguments()))
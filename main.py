@@ -1,10 +1,218 @@
+import argparse
+import datetime as dt
+import os.path
+
 from mvc.controller import Controller
 from mvc.model import Model
 from mvc.view import View
 
 
-if __name__ == '__main__':
-    model = Model()
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Tennis Court Reservation Manager.')
+    parser.add_argument('--court', default=1, help='court number, selects tennis_court_<court>.db file')
+    parser.add_argument(
+        '--database', metavar='FILE',
+        help='shared club database holding all courts, e.g. tennis_club.db, instead of per-court file'
+    )
+    parser.add_argument(
+        '--import', dest='import_file', metavar='FILE',
+        help='import reservations from exported csv or json file instead of starting the REPL'
+    )
+    parser.add_argument(
+        '--serve', metavar='PORT', type=int,
+        help='serve every court over local HTTP/JSON API on provided port instead of starting the REPL'
+    )
+    parser.add_argument(
+        '--batch', metavar='FILE',
+        help='run operations from json lines file, or - for standard input, writing results as json lines'
+    )
+    parser.add_argument(
+        '--export-changes', metavar='FILE',
+        help='export reservations created or deleted since the previous export to FILE, instead of starting the REPL'
+    )
+    parser.add_argument(
+        '--export-schedule', nargs=3, metavar=('FILE', 'FROM', 'TO'),
+        help='export schedules of every court from FROM to TO (dd.mm.yyyy) to FILE in parallel, instead of the REPL'
+    )
+    parser.add_argument(
+        '--per-court', action='store_true', help='with --export-schedule, export each court to FILE_<court> file'
+    )
+    parser.add_argument(
+        '--workers', type=int, help='worker processes of --export-schedule, one per CPU by default'
+    )
+    parser.add_argument(
+        '--export-format', choices=('csv', 'json'), default='csv',
+        help='file format of --export-changes and --export-schedule'
+    )
+    parser.add_argument(
+        '--compact', action='store_true',
+        help='archive old reservations of every court and compact the database files instead of starting the REPL'
+    )
+    parser.add_argument(
+        '--archive-after', metavar='DAYS', type=int,
+        help=f'archive reservations older than provided days, {Model.ARCHIVE_AFTER.days} by default'
+    )
+    parser.add_argument(
+        '--stats', metavar='FILE',
+        help='record latencies of operations and SQL statistics, shown in the REPL menu and saved to json file on exit'
+    )
+    return parser.parse_args()
+
+
+def serve(arguments: argparse.Namespace) -> None:
+    # asyncio and the service are imported only when serving, the REPL starts faster without them:
+    import asyncio
+    from mvc.service import Service
+
+    service = Service(database=arguments.database, port=arguments.serve)
+    try:
+        asyncio.run(service.serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+def batch(arguments: argparse.Namespace) -> None:
+    """Runs operations of a json lines file, results go to standard output and the summary to standard error."""
+    import sys
+    from mvc.batch import BatchRunner
+
+    runner = BatchRunner(court_number=arguments.court, database=arguments.database, output=sys.stdout)
+    if arguments.batch == '-':
+        summary = runner.run(lines=sys.stdin)
+    else:
+        with open(arguments.batch) as operations_file:
+            summary = runner.run(lines=operations_file)
+    print(
+        f"Ran {summary['operations']} operations ({summary['errors']} errors) in {summary['seconds']:.2f} s,"
+        f" {summary['operations_per_second']:.0f} operations/s.",
+        file=sys.stderr
+    )
+
+
+def export_changes(arguments: argparse.Namespace) -> None:
+    """Writes changes since the previous export to the same file, for nightly synchronization."""
+    model = Model(court_number=arguments.court, database=arguments.database)
+    error, message = model.export_schedule_changes(
+        file_format=arguments.export_format, filename=arguments.export_changes
+    )
+    View().print_operation_status(error=error, message=message)
+    model.connection.close()
+
+
+def court_files() -> list:
+    """Returns sorted courts of every tennis_court_<court>.db file in the working directory."""
+    import glob
+
+    return sorted(
+        court for court in (
+            os.path.basename(path)[len('tennis_court_'):-len('.db')] for path in glob.glob('tennis_court_*.db')
+        ) if court.isalnum()
+    )
+
+
+def export_schedule(arguments: argparse.Namespace) -> None:
+    """Exports every court of the club database, or every tennis_court_<court>.db file in the working directory."""
+    from mvc.club import Club
+    from mvc.parallel_export import ParallelExport
+    from utils.validator import Validator
+
     view = View()
-    controller = Controller(model=model, view=view)
-    controller.start()
+    filename, date_from, date_to = arguments.export_schedule
+    try:
+        date_from = dt.datetime.strptime(date_from, '%d.%m.%Y').date()
+        date_to = dt.datetime.strptime(date_to, '%d.%m.%Y').date()
+    except ValueError:
+        date_from = date_to = None
+    if date_from is None or not Validator.validate_date_range(date_from=date_from, date_to=date_to):
+        view.print_error(error_message='Incorrect date range!')
+        return None
+    if not Validator.validate_filename(filename=filename):
+        view.print_error(error_message='Restricted characters in filename!')
+        return None
+
+    if arguments.database:
+        club = Club(database=arguments.database)
+        courts = club.courts()
+        club.pool.close()
+    else:
+        courts = court_files()
+    exporter = ParallelExport(courts=courts, database=arguments.database, workers=arguments.workers)
+    error, message = exporter.export(
+        date_from=date_from, date_to=date_to, file_format=arguments.export_format, filename=filename,
+        per_court=arguments.per_court
+    )
+    view.print_operation_status(error=error, message=message)
+
+
+def archive_before(arguments: argparse.Namespace):
+    """Returns the date reservations starting before are archived, None for Model.ARCHIVE_AFTER default."""
+    if arguments.archive_after is None:
+        return None
+    return dt.date.today() - dt.timedelta(days=arguments.archive_after)
+
+
+def compact(arguments: argparse.Namespace) -> None:
+    """Archives old reservations of every court of the club database, or of every tennis_court_<court>.db file
+    in the working directory, then compacts the database files."""
+    from mvc.club import Club
+
+    view = View()
+    if arguments.database:
+        club = Club(database=arguments.database)
+        courts = club.courts()
+        club.pool.close()
+    else:
+        courts = court_files()
+    if not courts:
+        view.print_error(error_message='No court databases found!')
+        return None
+
+    before = archive_before(arguments=arguments)
+    for court in courts:
+        model = Model(court_number=court, database=arguments.database)
+        error, message = model.archive_reservations(before=before)
+        view.print_operation_status(error=error, message=f'Court {court}: {message}')
+        # Courts of a club share its database, which is compacted once after the last of them:
+        if not arguments.database or court == courts[-1]:
+            error, message = model.compact()
+            view.print_operation_status(error=error, message=message)
+        model.connection.close()
+
+
+if __name__ == '__main__':
+    arguments = parse_arguments()
+    if arguments.serve is not None:
+        serve(arguments=arguments)
+    elif arguments.batch:
+        batch(arguments=arguments)
+    elif arguments.export_schedule:
+        export_schedule(arguments=arguments)
+    elif arguments.export_changes:
+        export_changes(arguments=arguments)
+    elif arguments.compact:
+        compact(arguments=arguments)
+    else:
+        instrumentation = None
+        if arguments.stats:
+            from mvc.instrumentation import Instrumentation
+            instrumentation = Instrumentation(filename=arguments.stats)
+        model = Model(
+            court_number=arguments.court,
+            use_cache=True,
+            database=arguments.database,
+            instrumentation=instrumentation
+        )
+        view = View()
+        controller = Controller(model=model, view=view)
+        try:
+            if arguments.import_file:
+                controller.import_from_file(filename=arguments.import_file)
+            else:
+                controller.start()
+        finally:
+            # Reservations older than the archive cutoff are moved out of the live table when the session ends:
+            model.archive_reservations(before=archive_before(arguments=arguments))
+            if instrumentation is not None:
+                instrumentation.dump()
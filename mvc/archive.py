@@ -0,0 +1,93 @@
+import os.path
+import sqlite3
+from typing import Optional
+
+from mvc.queries import Queries
+
+
+class Archive:
+    """Reservations older than a cutoff, moved out of the live reservation table into <database>_archive.db,
+    which is attached to the connection as 'archive' once it exists. Cutoff of each court is saved in the
+    archive file together with the moved rows. Reservations starting before the cutoff are read from the
+    archive and the later ones from the live table, so every reservation is read once, even if moving was
+    interrupted after the copy. All times are epoch minutes."""
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS archive.reservation(
+            court INTEGER NOT NULL,
+            full_name TEXT NOT NULL,
+            datetime_from INTEGER NOT NULL,
+            datetime_to INTEGER NOT NULL,
+            recurrence_id INTEGER,
+            PRIMARY KEY (court, datetime_from)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS archive.archive_cutoff(
+            court INTEGER NOT NULL,
+            archived_before INTEGER NOT NULL,
+            PRIMARY KEY (court)
+        ) WITHOUT ROWID;
+    '''
+
+    def __init__(self, connection: sqlite3.Connection, database: str, court_number=1, read_only=False):
+        self.connection = connection
+        self.filename = self.archive_filename(database=database)
+        self.court_number = court_number
+        # Attached databases are writable even through a read-only connection, so they are opened read-only too:
+        self.read_only = read_only
+        self.attached = False
+
+    @staticmethod
+    def archive_filename(database: str) -> str:
+        return os.path.splitext(database)[0] + '_archive.db'
+
+    @staticmethod
+    def read_only_uri(filename: str) -> str:
+        """Returns URI opening provided database file read-only, connections need uri=True to accept it."""
+        # Only export workers open files read-only, pathlib is not imported on startup for them:
+        import pathlib
+
+        return pathlib.Path(os.path.abspath(filename)).as_uri() + '?mode=ro'
+
+    def attach(self, create=False) -> bool:
+        """Attaches the archive file if it exists, or creates it. Returns whether the archive is attached.
+        sqlite can not attach a database inside a transaction, callers attach before they begin one."""
+        if self.attached:
+            return True
+        if self.connection.in_transaction or not (create or os.path.exists(self.filename)):
+            return False
+
+        if self.read_only:
+            self.connection.execute('ATTACH DATABASE ? AS archive', (self.read_only_uri(filename=self.filename),))
+        else:
+            self.connection.execute('ATTACH DATABASE ? AS archive', (self.filename,))
+            self.connection.execute('PRAGMA archive.journal_mode = WAL')
+            self.connection.executescript(self.SCHEMA)
+        self.attached = True
+        return True
+
+    def detach(self) -> None:
+        if self.attached:
+            self.connection.execute('DETACH DATABASE archive')
+            self.attached = False
+
+    def cutoff(self) -> Optional[int]:
+        """Returns the minute reservations starting before were archived, or None if nothing was."""
+        if not self.attach():
+            return None
+
+        cutoff = self.connection.execute(Queries.SELECT_ARCHIVE_CUTOFF, {'court': self.court_number}).fetchone()
+        return cutoff[0] if cutoff else None
+
+    def move(self, before: int) -> int:
+        """Moves reservations starting before provided minute to the attached archive, in the current
+        transaction. Rows already copied by an interrupted move are skipped. Returns count of moved rows."""
+        parameters = {'court': self.court_number, 'before': before}
+        self.connection.execute(Queries.ARCHIVE_RESERVATIONS, parameters)
+        self.connection.execute(Queries.UPSERT_ARCHIVE_CUTOFF, parameters)
+        return self.connection.execute(Queries.DELETE_ARCHIVED_RESERVATIONS, parameters).rowcount
+
+    def reservations_starting_between(self, range_start: int, range_end: int) -> sqlite3.Cursor:
+        """Returns cursor of archived (name, start, end) starting in [range_start, range_end), ordered by start."""
+        return self.connection.execute(
+            Queries.ARCHIVED_RESERVATIONS_STARTING_BETWEEN,
+            {'court': self.court_number, 'range_start': range_start, 'range_end': range_end}
+        )
@@ -0,0 +1,80 @@
+from typing import Iterable, Iterator, Optional
+
+
+class Availability:
+    """Interval arithmetic behind availability lookups. All times are epoch minutes.
+    Reservations on a court never overlap, so ordering them by start or by end is the same."""
+    SLOT_MINUTES = 30
+    MAX_RESERVATION_MINUTES = 90
+
+    @classmethod
+    def reservation_lengths(cls, start: int, next_reservation: Optional[tuple]) -> list:
+        """Returns possible reservation lengths at start, given the first reservation ending after it."""
+        if next_reservation is None:
+            free_minutes = cls.MAX_RESERVATION_MINUTES
+        else:
+            free_minutes = next_reservation[0] - start
+
+        return [
+            length for length in range(cls.SLOT_MINUTES, cls.MAX_RESERVATION_MINUTES + 1, cls.SLOT_MINUTES)
+            if length <= free_minutes
+        ]
+
+    @staticmethod
+    def free_slots(reservations: Iterable, window_start: int, window_end: int, min_length: int = 1) -> Iterator:
+        """Yields (start, end) gaps of at least min_length inside the window,
+        walking reservations ordered by start in a single pass."""
+        cursor = window_start
+        for res_start, res_end in reservations:
+            if res_start >= window_end:
+                break
+            if res_start - cursor >= min_length:
+                yield cursor, res_start
+            cursor = max(cursor, res_end)
+
+        if window_end - cursor >= min_length:
+            yield cursor, window_end
+
+    @staticmethod
+    def within_opening_hours(gaps: Iterable, opening_hours: tuple, min_length: int = 1) -> Iterator:
+        """Clips (start, end) gaps to daily opening hours, given as (opening, closing) minutes after midnight.
+        Yields only parts at least min_length long."""
+        opening, closing = opening_hours
+        minutes_per_day = 1440
+        for gap_start, gap_end in gaps:
+            day_start = gap_start - gap_start % minutes_per_day
+            while day_start < gap_end:
+                start = max(gap_start, day_start + opening)
+                end = min(gap_end, day_start + closing)
+                if end - start >= min_length:
+                    yield start, end
+                day_start += minutes_per_day
+
+    @classmethod
+    def closest_starts(cls, gaps: Iterable, requested: int, length: int, count: int) -> list:
+        """Returns up to count reservation starts fitting into the gaps, closest to requested minute first.
+        Gaps are walked in order once, and the walk stops as soon as count starts after requested are found."""
+        before, after = [], []
+        for gap_start, gap_end in gaps:
+            latest_start = gap_end - length
+            if latest_start < gap_start:
+                continue
+
+            # Starts before requested minute, latest first. Later gaps are always closer:
+            gap_before = []
+            start = latest_start if latest_start < requested else requested - cls.SLOT_MINUTES
+            while start >= gap_start and len(gap_before) < count:
+                gap_before.append(start)
+                start -= cls.SLOT_MINUTES
+            before = (gap_before + before)[:count]
+
+            # Starts from requested minute on, earliest first:
+
+            start = max(gap_start, requested)
+            while start <= latest_start and len(after) < count:
+                after.append(start)
+                start += cls.SLOT_MINUTES
+            if len(after) == count:
+                break
+
+        return sorted(before + after, key=lambda start_: (abs(start_ - requested), start_))[:count]
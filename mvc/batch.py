@@ -0,0 +1,167 @@
+import datetime as dt
+import json
+import sqlite3
+import sys
+import time
+from typing import Iterable, TextIO
+
+from mvc.availability import Availability
+from mvc.model import Model
+from utils.validator import Validator
+
+
+class BatchRunner:
+    """Replays operations read as JSON lines through Model, writing one JSON result line per operation,
+    so traffic can be replayed for capacity tests and bulk jobs run without the REPL.
+
+    Operations, court defaults to the one provided and datetimes follow dd.mm.yyyy HH:MM pattern:
+        {"op": "create", "name": ..., "start": <datetime>, "end": <datetime>}
+        {"op": "delete", "name": ..., "start": <datetime>}
+        {"op": "availability", "datetime": <datetime>}
+        {"op": "schedule", "from": <dd.mm.yyyy>, "to": <dd.mm.yyyy>}
+        {"op": "export", "from": ..., "to": ..., "format": "csv", "filename": ...}
+    Any other keys, e.g. "id", are copied to the result. Consecutive writes to one court are run in a single
+    transaction of up to GROUP_SIZE operations. Unlike the REPL, past dates are accepted, so recorded
+    traffic can be replayed as it was."""
+    DATE_FORMAT = '%d.%m.%Y'
+    DATETIME_FORMAT = '%d.%m.%Y %H:%M'
+    VALIDATOR = Validator()
+    WRITES = ('create', 'delete')
+    # Keys of operations which are not copied to results:
+    ARGUMENTS = ('name', 'start', 'end', 'datetime', 'from', 'to', 'format', 'filename')
+    GROUP_SIZE = 500
+
+    def __init__(self, court_number=1, database: str = None, output: TextIO = sys.stdout):
+        self.court_number = court_number
+        self.database = database
+        self.output = output
+        self.models = {}
+        self._operations = {
+            'create': self._create,
+            'delete': self._delete,
+            'availability': self._availability,
+            'schedule': self._schedule,
+            'export': self._export,
+        }
+
+    def run(self, lines: Iterable[str]) -> dict:
+        """Runs operation of every non-empty line, returns summary of the run."""
+        started = time.perf_counter()
+        summary = {'operations': 0, 'errors': 0}
+        group = []
+        for position, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                operation = json.loads(line)
+                court = str(operation.get('court', self.court_number))
+                kind = operation['op']
+                # Court numbers name database files, so only plain ones are accepted:
+                if not court.isalnum() or kind not in self._operations:
+                    raise ValueError('unknown court or operation')
+            except (ValueError, KeyError, AttributeError) as error:
+                result = {'line': position, 'status': 'error', 'error': f'Invalid line: {error}'}
+                self._write_results(summary, [result])
+                continue
+
+            if group and (kind not in self.WRITES or court != group[0][1] or len(group) == self.GROUP_SIZE):
+                self._write_results(summary, self._run_group(group))
+                group = []
+            if kind in self.WRITES:
+                group.append((position, court, operation))
+            else:
+                self._write_results(summary, [self._run(position, court, operation)])
+        if group:
+            self._write_results(summary, self._run_group(group))
+
+        for model in self.models.values():
+            model.connection.close()
+        summary['seconds'] = time.perf_counter() - started
+        summary['operations_per_second'] = summary['operations'] / summary['seconds'] if summary['seconds'] else 0
+        return summary
+
+    def _run_group(self, group: list) -> list:
+        """Runs writes to one court in one transaction. If the transaction fails, none of them is saved."""
+        _, court, _ = group[0]
+        try:
+            with self._model(court).transaction():
+                return [self._run(position, court, operation) for position, _, operation in group]
+        except sqlite3.OperationalError as error:
+            return [
+                {'line': position, 'op': operation['op'], 'status': 'error', 'error': f'Database unavailable: {error}'}
+                for position, _, operation in group
+            ]
+
+    def _run(self, position: int, court: str, operation: dict) -> dict:
+        result = {key: value for key, value in operation.items() if key not in self.ARGUMENTS}
+        result.update(line=position, court=court)
+        try:
+            error, payload = self._operations[operation['op']](self._model(court), operation)
+        except (KeyError, TypeError, ValueError, AttributeError) as error:
+            return {**result, 'status': 'error', 'error': f'Invalid operation: {error}'}
+
+        if error:
+            return {**result, 'status': 'error', 'error': payload}
+        return {**result, 'status': 'ok', **payload}
+
+    def _write_results(self, summary: dict, results: list) -> None:
+        for result in results:
+            summary['operations'] += 1
+            summary['errors'] += result['status'] == 'error'
+            self.output.write(json.dumps(result) + '\n')
+
+    def _model(self, court: str) -> Model:
+        if court not in self.models:
+            self.models[court] = Model(court_number=court, database=self.database)
+        return self.models[court]
+
+    # Operations, each returns (error, payload), payload is the message of an error:
+    def _create(self, model: Model, operation: dict) -> tuple:
+        name = operation['name'].strip()
+        res_start = dt.datetime.strptime(operation['start'], self.DATETIME_FORMAT)
+        res_end = dt.datetime.strptime(operation['end'], self.DATETIME_FORMAT)
+        length = int((res_end - res_start).total_seconds()) // 60
+        if not name or length <= 0:
+            return Model.ERROR, 'Name is empty or reservation ends before it starts!'
+        if length % Availability.SLOT_MINUTES or length > Availability.MAX_RESERVATION_MINUTES:
+            return Model.ERROR, 'Reservation can last 30, 60 or 90 minutes!'
+
+        error, message = model.book_reservation(name=name, res_start=res_start, res_end=res_end)
+        return error, message if error else {'message': message}
+
+    def _delete(self, model: Model, operation: dict) -> tuple:
+        res_start = dt.datetime.strptime(operation['start'], self.DATETIME_FORMAT)
+        error, message = model.delete_reservation(name=operation['name'], datetime_=res_start)
+        return error, message if error else {'message': message}
+
+    def _availability(self, model: Model, operation: dict) -> tuple:
+        datetime_ = dt.datetime.strptime(operation['datetime'], self.DATETIME_FORMAT)
+        return Model.OK, {'lengths': model.check_possible_reservations(datetime_=datetime_)}
+
+    def _schedule(self, model: Model, operation: dict) -> tuple:
+        date_from = dt.datetime.strptime(operation['from'], self.DATE_FORMAT).date()
+        date_to = dt.datetime.strptime(operation['to'], self.DATE_FORMAT).date()
+        if not self.VALIDATOR.validate_date_range(date_from=date_from, date_to=date_to):
+            return Model.ERROR, 'Incorrect date range!'
+
+        return Model.OK, {'schedule': {
+            date_.strftime(self.DATE_FORMAT): [
+                {'name': name, 'start': start.strftime(self.DATETIME_FORMAT), 'end': end.strftime(self.DATETIME_FORMAT)}
+                for name, start, end in reservations
+            ]
+            for date_, reservations in model.iter_schedule_data(date_from=date_from, date_to=date_to)
+        }}
+
+    def _export(self, model: Model, operation: dict) -> tuple:
+        date_from = dt.datetime.strptime(operation['from'], self.DATE_FORMAT).date()
+        date_to = dt.datetime.strptime(operation['to'], self.DATE_FORMAT).date()
+        file_format, filename = operation['format'], operation['filename']
+        if not self.VALIDATOR.validate_date_range(date_from=date_from, date_to=date_to):
+            return Model.ERROR, 'Incorrect date range!'
+        if file_format not in ('csv', 'json', 'bin') or not self.VALIDATOR.validate_filename(filename=filename):
+            return Model.ERROR, 'Unknown file format or restricted characters in filename!'
+
+        _, message = model.export_schedule_data(
+            date_from=date_from, date_to=date_to, file_format=file_format, filename=filename
+        )
+        return Model.OK, {'message': message}
@@ -0,0 +1,150 @@
+import array
+import bisect
+import datetime as dt
+import mmap
+import struct
+
+from utils.epoch import EpochMinutes
+
+
+class BinarySchedule:
+    """Compact columnar schedule file, little-endian:
+
+    header    magic, version, first and last exported day (days since the epoch), record and name counts
+    starts    int32 start minute of every reservation, ascending
+    lengths   uint16 reservation length in minutes
+    name_ids  uint32 index into the name table
+    names     uint16 length-prefixed UTF-8 names, each stored once
+
+    Sections are padded to 4 bytes, so the reader can use the columns in place.
+    """
+    MAGIC = b'TCSB'
+    VERSION = 1
+    HEADER = struct.Struct('<4sHxxiiII')
+    NAME_LENGTH = struct.Struct('<H')
+
+    @staticmethod
+    def padded(size: int) -> int:
+        return size + -size % 4
+
+
+class BinaryScheduleWriter(BinarySchedule):
+    """Writes schedule days yielded by Model.iter_schedule_data to the binary format."""
+
+    def write(self, days, filename: str) -> None:
+        starts, lengths, name_ids = array.array('i'), array.array('H'), array.array('I')
+        names = {}
+        first_day = last_day = None
+
+        for date_, reservations in days:
+            if first_day is None:
+                first_day = date_
+            last_day = date_
+            for name, start, end in reservations:
+                starts.append(EpochMinutes.from_datetime(start))
+                lengths.append(EpochMinutes.from_datetime(end) - starts[-1])
+                name_ids.append(names.setdefault(name, len(names)))
+
+        epoch_day = EpochMinutes.EPOCH.toordinal()
+        header = self.HEADER.pack(
+            self.MAGIC,
+            self.VERSION,
+            first_day.toordinal() - epoch_day if first_day else 0,
+            last_day.toordinal() - epoch_day if last_day else -1,
+            len(starts),
+            len(names)
+        )
+        with open(f'{filename}.bin', 'wb') as bin_file:
+            bin_file.write(header)
+            for column in (starts, lengths, name_ids):
+                column = self._little_endian(column)
+                bin_file.write(column.tobytes())
+                bin_file.write(bytes(self.padded(len(column) * column.itemsize) - len(column) * column.itemsize))
+            for name in names:
+                encoded_name = name.encode('utf-8')
+                bin_file.write(self.NAME_LENGTH.pack(len(encoded_name)))
+                bin_file.write(encoded_name)
+
+    @staticmethod
+    def _little_endian(column: array.array) -> array.array:
+        if struct.pack('=H', 1) != struct.pack('<H', 1):
+            column = array.array(column.typecode, column)
+            column.byteswap()
+        return column
+
+
+class BinaryScheduleReader(BinarySchedule):
+    """Reads the binary schedule format through mmap. Only the name table is decoded up front,
+    reservations are found by binary search over the start column, in place (little-endian hosts)."""
+
+    def __init__(self, filename: str):
+        with open(filename, 'rb') as bin_file:
+            self._mmap = mmap.mmap(bin_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < self.HEADER.size or self._mmap[:len(self.MAGIC)] != self.MAGIC:
+            self._mmap.close()
+            raise ValueError(f'{filename} is not a binary schedule!')
+
+        magic, version, first_day, last_day, record_count, name_count = self.HEADER.unpack_from(self._mmap)
+        if version != self.VERSION:
+            self._mmap.close()
+            raise ValueError(f'{filename} is not a version {self.VERSION} binary schedule!')
+
+        self.date_from = EpochMinutes.EPOCH.date() + dt.timedelta(days=first_day)
+        self.date_to = EpochMinutes.EPOCH.date() + dt.timedelta(days=last_day)
+
+        view = memoryview(self._mmap)
+        offset = self.HEADER.size
+        self._starts = view[offset:offset + record_count * 4].cast('i')
+        offset += self.padded(record_count * 4)
+        self._lengths = view[offset:offset + record_count * 2].cast('H')
+        offset += self.padded(record_count * 2)
+        self._name_ids = view[offset:offset + record_count * 4].cast('I')
+        offset += self.padded(record_count * 4)
+
+        self.names = []
+        for _ in range(name_count):
+            (length,) = self.NAME_LENGTH.unpack_from(self._mmap, offset)
+            offset += self.NAME_LENGTH.size
+            self.names.append(bytes(self._mmap[offset:offset + length]).decode('utf-8'))
+            offset += length
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for column in (self._starts, self._lengths, self._name_ids):
+            column.release()
+        self._mmap.close()
+
+    def reservations_between(self, datetime_from: dt.datetime, datetime_to: dt.datetime) -> list:
+        """Returns (name, start, end) of reservations starting in [datetime_from, datetime_to)."""
+        i = bisect.bisect_left(self._starts, EpochMinutes.from_datetime(datetime_from))
+        j = bisect.bisect_left(self._starts, EpochMinutes.from_datetime(datetime_to), lo=i)
+        reservations = []
+        for k in range(i, j):
+            start = self._starts[k]
+            reservations.append((
+                self.names[self._name_ids[k]],
+                EpochMinutes.to_datetime(start),
+                EpochMinutes.to_datetime(start + self._lengths[k])
+            ))
+
+        return reservations
+
+    def get_schedule_data(self, date_from: dt.date, date_to: dt.date) -> dict:
+        """Returns schedule in the same shape as Model.get_schedule_data, limited to the exported days."""
+        schedule = {}
+        date_ = max(date_from, self.date_from)
+        while date_ <= min(date_to, self.date_to):
+            day_start = dt.datetime.combine(date_, dt.time())
+            schedule[date_] = self.reservations_between(day_start, day_start + dt.timedelta(days=1))
+            date_ += dt.timedelta(days=1)
+
+        return schedule
@@ -0,0 +1,115 @@
+import bisect
+import sqlite3
+from typing import Optional
+
+from mvc.queries import Queries
+
+
+class ReservationCache:
+    """Sorted in-memory index of court reservations, answering Model lookups with bisect instead of SQL.
+    Loaded lazily on first lookup and reloaded whenever another connection committed to the database,
+    which is detected with PRAGMA data_version. Writes made through Model are applied directly.
+    All times are epoch minutes."""
+    CHUNK_SIZE = 1000
+
+    def __init__(self, connection: sqlite3.Connection, court_number=1):
+        self.connection = connection
+        self.court_number = court_number
+        self._data_version = None
+        self._starts = []
+        self._ends = []
+        self._names = []
+        self._starts_by_name = {}
+
+    def next_reservation(self, minute: int) -> Optional[tuple]:
+        """Returns (start, end) of the first reservation ending after provided minute."""
+        self._refresh()
+        i = bisect.bisect_right(self._ends, minute)
+        if i == len(self._ends):
+            return None
+
+        return self._starts[i], self._ends[i]
+
+    def reservations_overlapping(self, window_start: int, window_end: int) -> list:
+        """Returns (start, end) of reservations overlapping provided window, ordered by start."""
+        self._refresh()
+        i = bisect.bisect_right(self._ends, window_start)
+        j = bisect.bisect_left(self._starts, window_end)
+        return list(zip(self._starts[i:j], self._ends[i:j]))
+
+    def reservations_starting_between(self, range_start: int, range_end: int):
+        """Yields (name, start, end) of reservations starting in [range_start, range_end), ordered by start.
+        Reservations are copied CHUNK_SIZE at a time, so exporting a long range does not copy all of them.
+        Every chunk is looked up after the last start yielded, reservations added or removed in between
+        do not shift it."""
+        self._refresh()
+        while True:
+            i = bisect.bisect_left(self._starts, range_start)
+            j = min(i + self.CHUNK_SIZE, bisect.bisect_left(self._starts, range_end, lo=i))
+            if i >= j:
+                return None
+
+            range_start = self._starts[j - 1] + 1
+            yield from zip(self._names[i:j], self._starts[i:j], self._ends[i:j])
+
+    def count_reservations(self, name: str, range_start: int, range_end: int) -> int:
+        """Returns count of reservations made by provided name, starting in [range_start, range_end)."""
+        self._refresh()
+        starts = self._starts_by_name.get(name, [])
+        return bisect.bisect_left(starts, range_end) - bisect.bisect_left(starts, range_start)
+
+    def add(self, name: str, start: int, end: int) -> None:
+        """Applies reservation inserted through Model."""
+        if self._data_version is None:
+            return None
+
+        i = bisect.bisect_right(self._starts, start)
+        self._starts.insert(i, start)
+        self._ends.insert(i, end)
+        self._names.insert(i, name)
+        bisect.insort(self._starts_by_name.setdefault(name, []), start)
+
+    def remove(self, name: str, start: int) -> None:
+        """Applies reservation deletion made through Model."""
+        if self._data_version is None:
+            return None
+
+        i = bisect.bisect_left(self._starts, start)
+        while i < len(self._starts) and self._starts[i] == start:
+            if self._names[i] == name:
+                break
+            i += 1
+        else:
+            # Out of sync with the database, reload on next lookup:
+            self.invalidate()
+            return None
+
+        del self._starts[i], self._ends[i], self._names[i]
+        starts = self._starts_by_name[name]
+        del starts[bisect.bisect_left(starts, start)]
+        # Names without reservations are dropped, so a long session does not keep every name it has seen:
+        if not starts:
+            del self._starts_by_name[name]
+
+    def invalidate(self) -> None:
+        """Reloads reservations on next lookup, used after bulk changes."""
+        self._data_version = None
+
+    def _refresh(self) -> None:
+        """Loads reservations on first use, or when database was changed by another connection."""
+        data_version = self.connection.execute('PRAGMA data_version').fetchone()[0]
+        if data_version == self._data_version:
+            return None
+
+        rows = self.connection.execute(Queries.ALL_RESERVATIONS, {'court': self.court_number}).fetchall()
+        self._starts = [row[1] for row in rows]
+        self._ends = [row[2] for row in rows]
+        self._names = []
+        self._starts_by_name = {}
+        # Rows hold a new string for every reservation, reservations of one name share the first one:
+        names = {}
+        for name, start, _ in rows:
+            name = names.setdefault(name, name)
+            self._names.append(name)
+            self._starts_by_name.setdefault(name, []).append(start)
+        self._data_version = data_version
@@ -0,0 +1,50 @@
+import sqlite3
+
+from mvc.queries import Queries
+
+
+class ChangeLog:
+    """Created and deleted reservations of a court, numbered in commit order, kept in reservation_change table.
+    Changes are logged in the same transaction as reservations, so the log never disagrees with them.
+    Export targets remember the number of the last change they received in export_watermark table,
+    and later receive only the changes made since. All times are epoch minutes."""
+    INSERT, DELETE = 'insert', 'delete'
+
+    def __init__(self, connection: sqlite3.Connection, court_number=1):
+        self.connection = connection
+        self.court_number = court_number
+
+    def record(self, kind: str, reservations) -> None:
+        """Logs (name, start, end) reservations as created or deleted, in the current transaction."""
+        self.connection.executemany(Queries.INSERT_CHANGE, (
+            {'court': self.court_number, 'kind': kind, 'name': name, 'start': start, 'end': end}
+            for name, start, end in reservations
+        ))
+
+    def record_inserted_after(self, reservation_id: int) -> None:
+        """Logs reservations with ids above provided one as created, in the current transaction. Used for batches,
+        which are read back in a single statement instead of binding every row again."""
+        self.connection.execute(Queries.INSERT_CHANGES_AFTER, {'court': self.court_number, 'after': reservation_id})
+
+    def last_change(self) -> int:
+        """Returns number of the last logged change, 0 if there is none."""
+        return self.connection.execute(Queries.LAST_CHANGE, {'court': self.court_number}).fetchone()[0]
+
+    def changes_between(self, after: int, until: int) -> sqlite3.Cursor:
+        """Returns cursor of (kind, name, start, end) changes numbered in (after, until], ordered by start.
+        Only the last change of each reservation is returned, so a reservation deleted after it was
+        created comes once, as deleted."""
+        return self.connection.execute(
+            Queries.CHANGES_BETWEEN, {'court': self.court_number, 'after': after, 'until': until}
+        )
+
+    def watermark(self, target: str) -> int:
+        """Returns number of the last change exported to provided target, 0 if it has not been exported to yet."""
+        row = self.connection.execute(
+            Queries.SELECT_WATERMARK, {'court': self.court_number, 'target': target}
+        ).fetchone()
+        return row[0] if row else 0
+
+    def save_watermark(self, target: str, seq: int) -> None:
+        self.connection.execute(Queries.UPSERT_WATERMARK, {'court': self.court_number, 'target': target, 'seq': seq})
+        self.connection.commit()
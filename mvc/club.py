@@ -0,0 +1,121 @@
+import datetime as dt
+import os.path
+
+from mvc.archive import Archive
+from mvc.availability import Availability
+from mvc.model import Model
+from mvc.pool import ConnectionPool
+from mvc.queries import Queries
+from mvc.schema import Schema
+from utils.epoch import EpochMinutes
+
+
+class Club:
+    """Every court of a club kept in one database. Each court is worked with through its own Model,
+    questions about all courts are answered here with a single query on a pooled connection."""
+    DATABASE = 'tennis_club.db'
+
+    OK, ERROR = Model.OK, Model.ERROR
+
+    def __init__(self, database: str = DATABASE, pool_size: int = 4):
+        self.database = database
+        self.pool = ConnectionPool(database=database, size=pool_size)
+        with self.pool.connection() as connection:
+            Schema(connection=connection).migrate()
+
+    def add_court(self, court_number) -> None:
+        with self.pool.connection() as connection:
+            connection.execute(Queries.INSERT_COURT, {'court': court_number})
+            connection.commit()
+
+    def courts(self) -> list:
+        with self.pool.connection() as connection:
+            return [court for court, in connection.execute(Queries.SELECT_COURTS)]
+
+    def court(self, court_number, use_cache: bool = False) -> Model:
+        """Returns Model of provided court, adding the court to the club if needed."""
+        self.add_court(court_number=court_number)
+        return Model(court_number=court_number, use_cache=use_cache, database=self.database)
+
+    def find_any_free_court(self, datetime_: dt.datetime, duration: int = Availability.SLOT_MINUTES):
+        """Returns number of the first court free for duration minutes from provided datetime, or None."""
+        start = EpochMinutes.from_datetime(datetime_)
+        with self.pool.connection() as connection:
+            court = connection.execute(Queries.FIRST_FREE_COURT, {'start': start, 'end': start + duration}).fetchone()
+
+        return court[0] if court else None
+
+    def get_schedule_data(self, date_from: dt.date, date_to: dt.date) -> dict:
+        """Gets schedule data of every court, as {court: schedule in Model.get_schedule_data shape}."""
+        days = [date_from + dt.timedelta(days=i) for i in range((date_to - date_from).days + 1)]
+        with self.pool.connection() as connection:
+            schedule = {court: {date_: [] for date_ in days} for court, in connection.execute(Queries.SELECT_COURTS)}
+            archive = Archive(connection=connection, database=self.database)
+            query = Queries.CLUB_RESERVATIONS_STARTING_BETWEEN
+            if archive.attach():
+                query = Queries.CLUB_ARCHIVED_RESERVATIONS_STARTING_BETWEEN
+            try:
+                rows = connection.execute(query, {
+                    'range_start': EpochMinutes.from_date(date_from),
+                    'range_end': EpochMinutes.from_date(date_to + dt.timedelta(days=1))
+                })
+                for court, name, res_start, res_end in rows:
+                    res_start = EpochMinutes.to_datetime(res_start)
+                    schedule[court][res_start.date()].append((name, res_start, EpochMinutes.to_datetime(res_end)))
+            finally:
+                archive.detach()
+
+        return schedule
+
+    def import_court_file(self, court_number, filename: str = None) -> tuple:
+        """Copies reservations of a court kept in its own tennis_court_<court_number>.db file into the club,
+        together with the ones archived into its <file>_archive.db file."""
+        filename = filename or f'tennis_court_{court_number}.db'
+        if not os.path.exists(filename):
+            return self.ERROR, f'{filename} does not exist!'
+
+        # Opening the file through Model upgrades it to the current schema first:
+        Model(court_number=court_number, database=filename).connection.close()
+        court_archive = Archive.archive_filename(database=filename)
+        has_archive = os.path.exists(court_archive)
+
+        with self.pool.connection() as connection:
+            if connection.execute(Queries.NEXT_RESERVATION, {'court': court_number, 'minute': -1}).fetchone():
+                return self.ERROR, f'Court {court_number} already has reservations!'
+
+            # sqlite can not attach databases inside a transaction:
+            archive = Archive(connection=connection, database=self.database)
+            connection.execute('ATTACH DATABASE ? AS court_file', (filename,))
+            if has_archive:
+                archive.attach(create=True)
+                connection.execute('ATTACH DATABASE ? AS court_archive', (court_archive,))
+            try:
+                connection.execute('BEGIN')
+                connection.execute(Queries.INSERT_COURT, {'court': court_number})
+                offset = connection.execute(Queries.SELECT_RECURRENCE_ID_OFFSET).fetchone()[0]
+                connection.execute(Queries.COPY_COURT_FILE_USERS)
+                connection.execute(Queries.COPY_COURT_FILE_RECURRENCES, {'court': court_number, 'offset': offset})
+                imported = connection.execute(
+                    Queries.COPY_COURT_FILE_RESERVATIONS, {'court': court_number, 'offset': offset}
+                ).rowcount
+                connection.execute(Queries.COPY_COURT_FILE_QUOTA, {'court': court_number})
+                connection.execute(Queries.COPY_COURT_FILE_DAY_SLOTS, {'court': court_number})
+                connection.execute(Queries.COPY_COURT_FILE_CHANGES, {'court': court_number})
+                archived = 0
+                if has_archive:
+                    archived = connection.execute(
+                        Queries.COPY_COURT_FILE_ARCHIVE, {'court': court_number, 'offset': offset}
+                    ).rowcount
+                    connection.execute(Queries.COPY_COURT_FILE_ARCHIVE_CUTOFF, {'court': court_number})
+                connection.commit()
+            finally:
+                if connection.in_transaction:
+                    connection.rollback()
+                connection.execute('DETACH DATABASE court_file')
+                if has_archive:
+                    connection.execute('DETACH DATABASE court_archive')
+                archive.detach()
+
+        if archived:
+            return self.OK, f'Imported {imported} reservations of court {court_number}, and {archived} archived ones.'
+        return self.OK, f'Imported {imported} reservations of court {court_number}.'
@@ -1,3 +1,4 @@
+import itertools
 import sys
 import datetime as dt
 
@@ -18,7 +19,22 @@ class Controller:
         self.initial_launch = True
 
     def start(self) -> None:
-        """Method responsible for preparing the Main Menu."""
+        """Runs the Main Menu until User exits. Flows return to this loop instead of calling the menu again,
+        so the stack stays flat however long the session lasts."""
+        running = True
+        while running:
+            running = self._main_menu()
+        self.view.clear_screen()
+
+    def import_from_file(self, filename: str) -> None:
+        """Non-interactive import of reservations from exported csv or json file."""
+        self.view.print_header(header=f'Importing {filename}.')
+        error, message, rejected = self.model.import_schedule_data(filename=filename)
+        self.view.print_rejected_rows(rejected=rejected)
+        self.view.print_operation_status(error=error, message=message)
+
+    def _main_menu(self) -> bool:
+        """Prints the Main Menu and runs the chosen flow. Returns False when User wants to exit."""
         self.view.clear_screen()
 
         if self.initial_launch:
@@ -27,79 +43,120 @@ class Controller:
         else:
             self.view.print_header(header='Main Menu.')
 
-        main_menu_choices = (
-            'Make a reservation',
-            'Cancel a reservation',
-            'Print schedule.',
-            'Save schedule to a file.',
-            'Exit.'
-        )
+        main_menu = [
+            ('Make a reservation', self._create_reservation),
+            ('Make a recurring reservation', self._create_recurring_reservation),
+            ('Cancel a reservation', self._delete_reservation),
+            ('Print schedule.', self._print_schedule),
+            ('Save schedule to a file.', self._export_to_file),
+        ]
+        if self.model.instrumentation is not None:
+            main_menu.append(('Show statistics.', self._show_statistics))
+        main_menu_choices = tuple(choice for choice, _ in main_menu) + ('Exit.',)
         choice = self._prompt_choice(
             question='Please choose one of the available options.',
             choices=main_menu_choices
         )
         self.view.print_header(header=main_menu_choices[choice])
-        match choice:
-            case 0:
-                self._create_reservation()
-            case 1:
-                self._delete_reservation()
-            case 2:
-                self._print_schedule()
-            case 3:
-                self._export_to_file()
-            case 4:
-                self._exit_program()
-
-        self._continue_work()
+        if choice == len(main_menu):
+            return not self._exit_program()
+
+        main_menu[choice][1]()
+        return self._continue_work()
 
     # Main Menu flows:
     def _create_reservation(self) -> None:
-        """Create reservation flow."""
-        self.view.print_question(question='When would you like to make reservation? (dd.mm.yyyy HH:MM)')
-        reservation_start = self._prompt_datetime()
+        """Create reservation flow. If User declines the proposed dates, asks for another time."""
+        while True:
+            self.view.print_question(question='When would you like to make reservation? (dd.mm.yyyy HH:MM)')
+            reservation_start = self._prompt_datetime()
 
-        if not self.VALIDATOR.validate_is_in_future(datetime_=reservation_start):
-            self.view.print_error('Can not create reservation in past!')
-            return None
+            if not self.VALIDATOR.validate_is_in_future(datetime_=reservation_start):
+                self.view.print_error('Can not create reservation in past!')
+                return None
 
-        if not self.VALIDATOR.validate_one_hour_limit(datetime_=reservation_start):
-            self.view.print_error('Can not make a reservation less than 1h before!')
-            return None
+            if not self.VALIDATOR.validate_one_hour_limit(datetime_=reservation_start):
+                self.view.print_error('Can not make a reservation less than 1h before!')
+                return None
 
-        self.view.print_question(question='What is your name?')
-        name = self._prompt_name()
+            self.view.print_question(question='What is your name?')
+            name = self._prompt_name()
 
-        eligible = self.model.check_if_eligible(name=name, datetime_=reservation_start)
-        if not eligible:
-            self.view.print_error('You already have more than 2 reservations this week!')
-            return None
+            eligible = self.model.check_if_eligible(name=name, datetime_=reservation_start)
+            if not eligible:
+                self.view.print_error('You have already reached the reservation limit for this period!')
+                return None
+
+            reservations_available = self.model.check_possible_reservations(datetime_=reservation_start)
+            if reservations_available:
+                break
 
-        reservations_available = self.model.check_possible_reservations(datetime_=reservation_start)
-        if not reservations_available:
-            reservation_start = self.model.recommend_other_date(datetime_=reservation_start)
-            alternative_choices = (
-                'Yes',
-                'No'
+            alternatives = self.model.recommend_other_dates(
+                datetime_=reservation_start,
+                not_before=dt.datetime.now() + dt.timedelta(hours=1)
             )
+            if not alternatives:
+                self.view.print_error('There are no available dates close to the one you choose!')
+                return None
+
+            alternative_choices = tuple(date_.strftime(self.DATETIME_FORMAT) for date_ in alternatives) + ('No',)
             alternative_choice = self._prompt_choice(
-                question=f'The time you choose is unavailable,'
-                         f' would you like to make reservation on: '
-                         f'{reservation_start.strftime(self.DATETIME_FORMAT)} instead?',
+                question='The time you choose is unavailable,'
+                         ' would you like to make reservation on one of these dates instead?',
                 choices=alternative_choices
             )
-            match alternative_choice:
-                case 0:
-                    reservations_available = self.model.check_possible_reservations(datetime_=reservation_start)
-                case 1:
-                    self._create_reservation()
-                    return None
+            if alternative_choice < len(alternatives):
+                reservation_start = alternatives[alternative_choice]
+                reservations_available = self.model.check_possible_reservations(datetime_=reservation_start)
+                break
 
         duration_choices = tuple(f'{time_} minutes.' for time_ in reservations_available)
         choice = self._prompt_choice('For how long would you like to make the reservation?', choices=duration_choices)
         reservation_end = reservation_start + dt.timedelta(seconds=60 * reservations_available[choice])
 
-        error, message = self.model.create_reservation(name=name, res_start=reservation_start, res_end=reservation_end)
+        # Another desk may have booked the time while User was choosing, so the booking checks it again:
+        error, message = self.model.book_reservation(name=name, res_start=reservation_start, res_end=reservation_end)
+        self.view.print_operation_status(error=error, message=message)
+
+    def _create_recurring_reservation(self) -> None:
+        """Create recurring reservation flow."""
+        self.view.print_question(question='When is the first reservation? (dd.mm.yyyy HH:MM)')
+        reservation_start = self._prompt_datetime()
+
+        if not self.VALIDATOR.validate_one_hour_limit(datetime_=reservation_start):
+            self.view.print_error('Can not make a reservation less than 1h before!')
+            return None
+
+        self.view.print_question(question='What is your name?')
+        name = self._prompt_name()
+
+        frequency_choices = (
+            'Every week',
+            'Every two weeks',
+            'Every day'
+        )
+        frequencies = ('FREQ=WEEKLY', 'FREQ=WEEKLY;INTERVAL=2', 'FREQ=DAILY')
+        frequency = frequencies[self._prompt_choice(question='How often?', choices=frequency_choices)]
+
+        self.view.print_question(question='Until when? (dd.mm.yyyy)')
+        date_until = self._prompt_date()
+        if not self.VALIDATOR.validate_date_range(date_from=reservation_start.date(), date_to=date_until):
+            self.view.print_error(error_message='Incorrect date range!')
+            return None
+
+        length_choices = (30, 60, 90)
+        choice = self._prompt_choice(
+            'For how long would you like to make the reservations?',
+            choices=tuple(f'{length} minutes.' for length in length_choices)
+        )
+
+        error, message, rejected = self.model.create_recurring_reservation(
+            name=name,
+            res_start=reservation_start,
+            length=length_choices[choice],
+            rule=f'{frequency};UNTIL={date_until.strftime("%Y%m%d")}T235959'
+        )
+        self.view.print_rejected_occurrences(rejected=rejected)
         self.view.print_operation_status(error=error, message=message)
 
     def _delete_reservation(self) -> None:
@@ -131,8 +188,38 @@ class Controller:
             self.view.print_error(error_message='Incorrect date range!')
             return None
 
-        schedule_data = self.model.get_schedule_data(date_from=date_from, date_to=date_to)
-        self.view.print_schedule(schedule_data=schedule_data)
+        page_choices = ('Day', 'Week')
+        page_days = (1, 7)[self._prompt_choice(question='How many days per page?', choices=page_choices)]
+        skip_empty = self._prompt_choice(question='Skip days without reservations?', choices=('Yes', 'No')) == 0
+
+        pages = self.model.iter_schedule_pages(
+            date_from=date_from, date_to=date_to, page_days=page_days, skip_empty=skip_empty
+        )
+        # Pages already read are kept for going back, the next one is read after printing to know if it exists:
+        shown = list(itertools.islice(pages, 1))
+        if not shown:
+            self.view.print_error(error_message='No reservations in this date range.')
+            return None
+
+        page = 0
+        while True:
+            self.view.print_schedule(schedule_data=dict(shown[page]))
+            if page + 1 == len(shown):
+                shown.extend(itertools.islice(pages, 1))
+
+            navigation = {}
+            if page + 1 < len(shown):
+                navigation['Next page'] = page + 1
+            if page > 0:
+                navigation['Previous page'] = page - 1
+            if not navigation:
+                return None
+
+            choices = tuple(navigation) + ('Back',)
+            choice = self._prompt_choice(question=f'Page {page + 1}.', choices=choices)
+            if choice == len(navigation):
+                return None
+            page = navigation[choices[choice]]
 
     def _export_to_file(self) -> None:
         """Export to file flow."""
@@ -147,7 +234,8 @@ class Controller:
 
         format_choices = (
             'csv',
-            'json'
+            'json',
+            'bin'
         )
         choice = self._prompt_choice(
             question='Please pick desired file format:',
@@ -169,33 +257,32 @@ class Controller:
         )
         self.view.print_operation_status(error=error, message=message)
 
-    def _exit_program(self) -> None:
-        """Exit program flow."""
+    def _show_statistics(self) -> None:
+        """Show statistics flow."""
+        instrumentation = self.model.instrumentation
+        snapshot = instrumentation.snapshot()
+        self.view.print_statistics(snapshot=snapshot)
+        if instrumentation.filename:
+            instrumentation.dump(snapshot=snapshot)
+            self.view.print_success(success_message=f'Statistics saved to {instrumentation.filename}.')
+
+    def _exit_program(self) -> bool:
+        """Exit program flow. Returns True when User confirmed."""
         confirmation_choices = (
             'Yes',
             'No'
         )
         choice = self._prompt_choice(question='Are you sure?', choices=confirmation_choices)
-        match choice:
-            case 0:
-                self.view.clear_screen()
-                sys.exit()
-            case 1:
-                self.start()
-
-    def _continue_work(self) -> None:
+        return choice == 0
+
+    def _continue_work(self) -> bool:
         """Continue work, determines if program should be running after operation."""
         confirmation_choices = (
             'Yes, continue.',
             'No, exit program.'
         )
         choice = self._prompt_choice(question='Do you want to do anything else?', choices=confirmation_choices)
-        match choice:
-            case 0:
-                self.start()
-            case 1:
-                self.view.clear_screen()
-                sys.exit()
+        return choice == 0
 
     # Prompts:
     def _prompt_choice(self, question: str, choices: tuple) -> int:
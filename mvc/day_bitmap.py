@@ -0,0 +1,105 @@
+import sqlite3
+from typing import Iterator
+
+from mvc.availability import Availability
+from mvc.queries import Queries
+from utils.epoch import EpochMinutes
+
+
+class DayBitmap:
+    """Busy 30 minute slots of each court day, kept as a 48 bit integer in reservation_day table.
+    Bit n of a day is set when any reservation overlaps n-th slot of that day. Bitmaps are updated
+    in the same transaction as reservations, so free time of a month is read as a few dozen rows
+    and found with bit operations. Bitmaps of consecutive days are joined into one integer, so free
+    runs can cross midnight. All times are epoch minutes."""
+    SLOT_MINUTES = Availability.SLOT_MINUTES
+    SLOTS_PER_DAY = EpochMinutes.MINUTES_PER_DAY // SLOT_MINUTES
+
+    def __init__(self, connection: sqlite3.Connection, court_number=1):
+        self.connection = connection
+        self.court_number = court_number
+
+    @classmethod
+    def day_masks(cls, start: int, end: int) -> Iterator[tuple]:
+        """Yields (day, mask) of slots overlapped by reservation from start to end, for every day it spans."""
+        first_slot, last_slot = start // cls.SLOT_MINUTES, (end - 1) // cls.SLOT_MINUTES
+        for day in range(first_slot // cls.SLOTS_PER_DAY, last_slot // cls.SLOTS_PER_DAY + 1):
+            day_slot = day * cls.SLOTS_PER_DAY
+            low = max(first_slot, day_slot) - day_slot
+            high = min(last_slot, day_slot + cls.SLOTS_PER_DAY - 1) - day_slot
+            yield day, ((1 << (high - low + 1)) - 1) << low
+
+    @staticmethod
+    def longest_run(bits: int) -> int:
+        """Returns length of the longest run of set bits, each pass shortens every run by one."""
+        length = 0
+        while bits:
+            bits &= bits >> 1
+            length += 1
+
+        return length
+
+    def add(self, reservations) -> None:
+        """Marks slots of every (start, end) reservation busy, in the current transaction."""
+        masks = {}
+        for start, end in reservations:
+            first_slot, last_slot = start // self.SLOT_MINUTES, (end - 1) // self.SLOT_MINUTES
+            day = first_slot // self.SLOTS_PER_DAY
+            if day == last_slot // self.SLOTS_PER_DAY:
+                # Most reservations end on the day they start, their mask is built without day_masks:
+                mask = ((1 << (last_slot - first_slot + 1)) - 1) << (first_slot - day * self.SLOTS_PER_DAY)
+                masks[day] = masks.get(day, 0) | mask
+                continue
+
+            for day, mask in self.day_masks(start=start, end=end):
+                masks[day] = masks.get(day, 0) | mask
+
+        self.connection.executemany(Queries.UPSERT_DAY_SLOTS, (
+            {'court': self.court_number, 'day': day, 'slots': mask} for day, mask in masks.items()
+        ))
+
+    def rebuild(self, start: int, end: int) -> None:
+        """Recomputes bitmaps of days from start to end out of their reservations, in the current transaction.
+        Used after a delete, since a slot may still be overlapped by another reservation."""
+        for day in range(start // EpochMinutes.MINUTES_PER_DAY, (end - 1) // EpochMinutes.MINUTES_PER_DAY + 1):
+            day_start = day * EpochMinutes.MINUTES_PER_DAY
+            mask = 0
+            for res_start, res_end in self.connection.execute(Queries.RESERVATIONS_OVERLAPPING, {
+                'court': self.court_number,
+                'window_start': day_start,
+                'window_end': day_start + EpochMinutes.MINUTES_PER_DAY
+            }):
+                for res_day, res_mask in self.day_masks(start=res_start, end=res_end):
+                    if res_day == day:
+                        mask |= res_mask
+            self.connection.execute(Queries.REPLACE_DAY_SLOTS, {'court': self.court_number, 'day': day, 'slots': mask})
+
+    def masks_between(self, day_from: int, day_to: int) -> dict:
+        """Returns {day: mask} of days from day_from to day_to since the epoch, including both, days without
+        reservations are left out."""
+        return dict(self.connection.execute(
+            Queries.DAY_SLOTS_BETWEEN, {'court': self.court_number, 'day_from': day_from, 'day_to': day_to}
+        ))
+
+    def free_gaps(self, window_start: int, window_end: int, length: int) -> Iterator[tuple]:
+        """Yields (start, end) of free runs of whole slots within the window, at least length minutes long."""
+        first_slot = -(-window_start // self.SLOT_MINUTES)
+        end_slot = window_end // self.SLOT_MINUTES
+        if end_slot <= first_slot:
+            return None
+
+        first_day = first_slot // self.SLOTS_PER_DAY
+        busy = 0
+        for day, mask in self.masks_between(day_from=first_day, day_to=(end_slot - 1) // self.SLOTS_PER_DAY).items():
+            busy |= mask << (day - first_day) * self.SLOTS_PER_DAY
+
+        # Slots are counted from the first day's midnight, free bits are kept for slots of the window only:
+        offset = first_day * self.SLOTS_PER_DAY
+        free = ~busy & ((1 << (end_slot - offset)) - 1) & ~((1 << (first_slot - offset)) - 1)
+        min_slots = -(-length // self.SLOT_MINUTES)
+        while free:
+            low = (free & -free).bit_length() - 1
+            run = (((free >> low) + 1) & ~(free >> low)).bit_length() - 1
+            if run >= min_slots:
+                yield (offset + low) * self.SLOT_MINUTES, (offset + low + run) * self.SLOT_MINUTES
+            free &= ~(((1 << run) - 1) << low)
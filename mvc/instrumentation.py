@@ -0,0 +1,171 @@
+import functools
+import json
+import re
+import sqlite3
+import time
+
+
+class Instrumentation:
+    """Opt-in profiling of a Model: latency histogram of every public method and statistics of every SQL statement.
+    Nothing is wrapped or traced until attach is called, so a Model without instrumentation runs untouched.
+    Statements are traced with sqlite3 trace callback and grouped with literals replaced by '?'. Work done by
+    a statement is counted in virtual machine steps with sqlite3 progress handler, as sqlite does not report
+    rows scanned. Query plans are sampled with EXPLAIN QUERY PLAN when a snapshot is taken, so the sampling
+    never runs inside a traced call; a plan with SCAN of a table without an index is flagged as a full scan."""
+    # Progress handler is called every STEP_INTERVAL virtual machine instructions:
+    STEP_INTERVAL = 1000
+    # Query plan of a statement is sampled again every SAMPLE_EVERY executions:
+    SAMPLE_EVERY = 100
+    EXPLAINED = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'WITH')
+    LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+    def __init__(self, filename: str = None):
+        """Snapshots are dumped to provided json file, if any."""
+        self.filename = filename
+        self.connection = None
+        self.methods = {}
+        self.statements = {}
+        self._current = None
+
+    def attach(self, model) -> None:
+        """Wraps public methods of provided model and starts tracing its connection."""
+        self.connection = model.connection
+        for name in dir(type(model)):
+            if not name.startswith('_') and callable(getattr(type(model), name)):
+                setattr(model, name, self._timed(name=name, method=getattr(model, name)))
+
+        self.connection.set_trace_callback(self._trace)
+        self.connection.set_progress_handler(self._step, self.STEP_INTERVAL)
+
+    def snapshot(self) -> dict:
+        """Returns collected statistics, sampling query plans of statements which are due."""
+        self._explain_samples()
+        return {
+            'methods': {name: histogram.summary() for name, histogram in sorted(self.methods.items())},
+            'statements': sorted(
+                (statement.summary() for statement in self.statements.values()),
+                key=lambda summary: summary['steps'],
+                reverse=True
+            ),
+            'full_scans': sorted(sql for sql, statement in self.statements.items() if statement.full_scan),
+        }
+
+    def dump(self, snapshot: dict = None) -> None:
+        """Writes provided, or a new snapshot to the json file."""
+        with open(self.filename, 'w') as stats_file:
+            json.dump(snapshot or self.snapshot(), stats_file, indent=2)
+
+    def _timed(self, name: str, method):
+        histogram = self.methods.setdefault(name, LatencyHistogram())
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            started = time.perf_counter_ns()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                histogram.add(microseconds=(time.perf_counter_ns() - started) // 1000)
+
+        return timed
+
+    def _trace(self, sql: str) -> None:
+        key = self.LITERALS.sub('?', ' '.join(sql.split()))
+        statement = self.statements.get(key)
+        if statement is None:
+            statement = self.statements[key] = StatementStats(sql=key)
+        statement.executions += 1
+        if statement.executions % self.SAMPLE_EVERY == 1 and key.startswith(self.EXPLAINED):
+            statement.sample = sql
+        self._current = statement
+
+    def _step(self) -> int:
+        if self._current is not None:
+            self._current.steps += self.STEP_INTERVAL
+        return 0
+
+    def _explain_samples(self) -> None:
+        # EXPLAIN itself must not be traced, nor counted as work of the last statement:
+        self.connection.set_trace_callback(None)
+        self._current = None
+        try:
+            for statement in self.statements.values():
+                if statement.sample is None:
+                    continue
+                try:
+                    statement.plan = [
+                        row[-1] for row in self.connection.execute('EXPLAIN QUERY PLAN ' + statement.sample)
+                    ]
+                except sqlite3.Error as error:
+                    statement.plan = [f'Can not explain: {error}']
+                statement.sample = None
+        finally:
+            self.connection.set_trace_callback(self._trace)
+
+    @staticmethod
+    def is_full_scan(detail: str) -> bool:
+        """Tells if a query plan line reads a whole table, e.g. 'SCAN reservation' but not 'SCAN r USING INDEX',
+        nor 'SCAN (subquery-1)' reading rows of a subquery or co-routine, which has a plan line of its own."""
+        return (
+            detail.startswith('SCAN ') and ' USING ' not in detail
+            and not detail.startswith(('SCAN CONSTANT ROW', 'SCAN ('))
+        )
+
+
+class LatencyHistogram:
+    """Call latencies in power of two microsecond buckets, bucket n counts calls shorter than 2 ** n us."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, microseconds: int) -> None:
+        bucket = microseconds.bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += microseconds
+        self.max = max(self.max, microseconds)
+
+    def percentile(self, fraction: float) -> int:
+        """Returns upper bound of the bucket holding provided fraction of calls, in microseconds."""
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= fraction * self.count:
+                return 2 ** bucket
+        return 0
+
+    def summary(self) -> dict:
+        return {
+            'calls': self.count,
+            'mean_us': round(self.total / self.count, 1) if self.count else 0,
+            'p50_us': self.percentile(0.5),
+            'p99_us': self.percentile(0.99),
+            'max_us': self.max,
+            'histogram': {f'<{2 ** bucket}us': count for bucket, count in sorted(self.buckets.items())},
+        }
+
+
+class StatementStats:
+    """Executions, virtual machine steps and last sampled query plan of one SQL statement."""
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.executions = 0
+        self.steps = 0
+        self.sample = None
+        self.plan = None
+
+    @property
+    def full_scan(self) -> bool:
+        return any(Instrumentation.is_full_scan(detail) for detail in self.plan or ())
+
+    def summary(self) -> dict:
+        return {
+            'sql': self.sql,
+            'executions': self.executions,
+            'steps': self.steps,
+            'plan': self.plan,
+            'full_scan': self.full_scan,
+        }
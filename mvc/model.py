@@ -1,139 +1,649 @@
+import bisect
+import contextlib
 import csv
 import datetime as dt
+import functools
+import itertools
 import json
 import os.path
 import sqlite3
-
-from dateutil import rrule
+import time
+
+from mvc.archive import Archive
+from mvc.availability import Availability
+from mvc.binary_schedule import BinaryScheduleWriter
+from mvc.cache import ReservationCache
+from mvc.change_log import ChangeLog
+from mvc.day_bitmap import DayBitmap
+from mvc.queries import Queries
+from mvc.quota import Quota
+from mvc.schedule_arrays import ScheduleArrays
+from mvc.schedule_reader import ScheduleReader
+from mvc.schema import Schema
+from mvc.users import Users
+from utils.epoch import EpochMinutes
 
 
 class Model:
-    DB_DATE_FORMAT = '%Y-%m-%d'
-    DB_DATETIME_FORMAT = '%Y-%m-%d %H:%M'
     CSV_DATETIME_FORMAT = '%d.%m.%Y %H:%M'
     JSON_DATE_FORMAT = '%d.%m.%Y'
     JSON_HOUR_FORMAT = '%H:%M'
 
+    # Maximum count of reservations per name in each period, see Quota.PERIODS:
+    QUOTA_LIMITS = {'week': 3}
+    RECOMMENDATION_HORIZON = dt.timedelta(days=30)
+    EXPORTS_DIRECTORY = 'exported_schedules'
+    EXPORT_BATCH_SIZE = 1000
+    EXPORT_BUFFER_SIZE = 1024 * 1024
+    # Seconds to wait for the write lock held by another instance, and attempts before giving up:
+    BUSY_TIMEOUT = 5.0
+    BOOKING_ATTEMPTS = 3
+    RECURRENCE_LIMIT = 366
+    # Page cache of imports in KiB, index pages of a large batch are kept in memory until it is committed:
+    IMPORT_CACHE_SIZE = 64 * 1024
+    # Reservations older than this are moved to the archive, see Archive:
+    ARCHIVE_AFTER = dt.timedelta(days=365)
+
     OK, ERROR = range(2)
 
-    def __init__(self, court_number=1):
-        self.connection = sqlite3.connect(f'tennis_court_{court_number}.db')
-        self.cursor = self.connection.cursor()
-        self._prepare_db()
+    def __init__(
+            self, court_number=1, use_cache=False, database: str = None, instrumentation=None, read_only=False
+    ):
+        """Works with court's own tennis_court_<court_number>.db file, or its part of a shared multi-court database.
+        Provided mvc.instrumentation.Instrumentation records latencies of methods and statistics of SQL statements.
+        The database is opened on first use. Read-only Models, used by export workers, expect an existing
+        database of the current schema version."""
+        self.court_number = court_number
+        self.database = database or f'tennis_court_{court_number}.db'
+        self.use_cache = use_cache
+        self.read_only = read_only
+        self._grouped = False
+        self.instrumentation = instrumentation
+        if instrumentation is not None:
+            instrumentation.attach(model=self)
+
+    # Opened on first use, so the REPL shows its menu without waiting for the database:
+    @functools.cached_property
+    def connection(self) -> sqlite3.Connection:
+        if self.read_only:
+            return sqlite3.connect(
+                Archive.read_only_uri(filename=self.database), uri=True, cached_statements=Queries.CACHED_STATEMENTS
+            )
+
+        connection = sqlite3.connect(
+            self.database,
+            timeout=self.BUSY_TIMEOUT,
+            cached_statements=Queries.CACHED_STATEMENTS
+        )
+        Schema(connection=connection, court_number=self.court_number).migrate()
+        if not connection.execute(Queries.SELECT_COURT, {'court': self.court_number}).fetchone():
+            connection.execute(Queries.INSERT_COURT, {'court': self.court_number})
+            connection.commit()
+        return connection
+
+    @functools.cached_property
+    def cursor(self) -> sqlite3.Cursor:
+        return self.connection.cursor()
+
+    @functools.cached_property
+    def users(self) -> Users:
+        return Users(connection=self.connection)
+
+    @functools.cached_property
+    def quota(self) -> Quota:
+        return Quota(connection=self.connection, court_number=self.court_number)
+
+    @functools.cached_property
+    def bitmap(self) -> DayBitmap:
+        return DayBitmap(connection=self.connection, court_number=self.court_number)
+
+    @functools.cached_property
+    def change_log(self) -> ChangeLog:
+        return ChangeLog(connection=self.connection, court_number=self.court_number)
+
+    @functools.cached_property
+    def archive(self) -> Archive:
+        archive = Archive(
+            connection=self.connection, database=self.database, court_number=self.court_number, read_only=self.read_only
+        )
+        archive.attach()
+        return archive
+
+    @functools.cached_property
+    def cache(self):
+        if not self.use_cache:
+            return None
+        return ReservationCache(connection=self.connection, court_number=self.court_number)
 
     def create_reservation(self, name: str, res_start: dt.datetime, res_end: dt.datetime) -> tuple:
         """Creates reservation in the database."""
-        res_start = res_start.strftime(self.DB_DATETIME_FORMAT)
-        res_end = res_end.strftime(self.DB_DATETIME_FORMAT)
-        self.cursor.execute(f"INSERT INTO reservation VALUES ('{name}', '{res_start}', '{res_end}')")
-        self.connection.commit()
+        res_start = EpochMinutes.from_datetime(res_start)
+        res_end = EpochMinutes.from_datetime(res_end)
+        if self._is_archived(minute=res_start):
+            return self.ERROR, 'Date is archived.'
+        self._insert_reservation(name=name, res_start=res_start, res_end=res_end)
         return self.OK, 'Successfully created reservation!'
 
-    def delete_reservation(self, name: str, datetime_: dt.datetime) -> tuple:
-        """Deletes reservation from the database if it exists."""
-        datetime_ = datetime_.strftime(self.DB_DATETIME_FORMAT)
-        time_to_delete = self.cursor.execute(
-            f"SELECT * FROM reservation WHERE full_name='{name}' AND datetime_from='{datetime_}'"
-        ).fetchone()
-        if time_to_delete:
-            self.cursor.execute(f"DELETE FROM reservation WHERE full_name='{name}' AND datetime_from='{datetime_}'")
-            self.connection.commit()
-            return self.OK, 'Your reservation has been canceled successfully.'
+    def book_reservation(self, name: str, res_start: dt.datetime, res_end: dt.datetime) -> tuple:
+        """Creates reservation if the time is still free and name is below the quota limits.
+        Checks and insert run in one write transaction, so other instances working on
+        the same database can not book the same time in between."""
+        res_start = EpochMinutes.from_datetime(res_start)
+        res_end = EpochMinutes.from_datetime(res_end)
+
+        # The archive cutoff is read by _book, and sqlite can not attach the archive inside a transaction:
+        self.archive.attach()
+        return self._write(lambda: self._book(name=name, res_start=res_start, res_end=res_end))
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Groups create_reservation, book_reservation and delete_reservation calls made inside the block into
+        one write transaction, committed when the block ends and rolled back if it raises. Bulk jobs commit
+        once per group instead of once per reservation."""
+        self.archive.attach()
+        self.cursor.execute('BEGIN IMMEDIATE')
+        self._grouped = True
+        try:
+            yield self
+        except BaseException:
+            self._rollback()
+            if self.cache is not None:
+                self.cache.invalidate()
+            raise
         else:
-            return self.ERROR, 'Reservation does not exist!'
+            self.connection.commit()
+        finally:
+            self._grouped = False
+
+    def delete_reservation(self, name: str, datetime_: dt.datetime) -> tuple:
+        """Deletes reservation from the database if it exists. The lookup and delete run in one write transaction,
+        so a reservation canceled by two instances at once is deleted and counted once."""
+        datetime_ = EpochMinutes.from_datetime(datetime_)
+        return self._write(lambda: self._delete(name=name, datetime_=datetime_))
 
     def get_schedule_data(self, date_from: dt.date, date_to: dt.date) -> dict:
         """Gets schedule data from database."""
-        # Creates dict for each day in provided range:
-        dates_dict = {date_.date(): [] for date_ in rrule.rrule(
-            freq=rrule.DAILY, dtstart=date_from, until=date_to
-        )}
-
-        schedule = self.cursor.execute(
-            f"SELECT * FROM reservation "
-            f"WHERE datetime_to > '{date_from}' AND datetime_from < '{date_to}'"
-            f"ORDER BY datetime_from"
-        ).fetchall()
-
-        # Populates dates_dict with reservations:
-        for name, res_start, res_end in schedule:
-            date_ = dt.datetime.strptime(res_start, self.DB_DATETIME_FORMAT).date()
-            dates_dict[date_].append(
-                (
+        return dict(self.iter_schedule_data(date_from=date_from, date_to=date_to))
+
+    def iter_schedule_data(self, date_from: dt.date, date_to: dt.date):
+        """Yields (date, reservations) for each day in provided range, reading reservations in batches."""
+        # Reservations are bucketed by their start, so the whole last day is included:
+        range_start = EpochMinutes.from_date(date_from)
+        days = (date_to - date_from).days + 1
+        schedule = self._reservations_starting_between(
+            range_start=range_start, range_end=range_start + days * EpochMinutes.MINUTES_PER_DAY
+        )
+        reservation = next(schedule, None)
+        offsets = EpochMinutes.OFFSETS
+
+        for day in range(days):
+            date_ = date_from + dt.timedelta(days=day)
+            midnight = dt.datetime(date_.year, date_.month, date_.day)
+            day_start = range_start + day * EpochMinutes.MINUTES_PER_DAY
+            day_end = day_start + EpochMinutes.MINUTES_PER_DAY
+            reservations = []
+            while reservation is not None and reservation[1] < day_end:
+                name, res_start, res_end = reservation
+                end_offset = res_end - day_start
+                reservations.append((
                     name,
-                    dt.datetime.strptime(res_start, self.DB_DATETIME_FORMAT),
-                    dt.datetime.strptime(res_end, self.DB_DATETIME_FORMAT)
-                )
-            )
-
-        return dates_dict
+                    midnight + offsets[res_start - day_start],
+                    midnight + offsets[end_offset] if end_offset < len(offsets) else EpochMinutes.to_datetime(res_end)
+                ))
+                reservation = next(schedule, None)
+            yield date_, reservations
+
+    def iter_schedule_pages(self, date_from: dt.date, date_to: dt.date, page_days: int = 7, skip_empty=False):
+        """Yields pages of up to page_days (date, reservations) pairs, optionally leaving out days without
+        reservations. Reservations are read only as far as the pages consumed, so any range starts at once."""
+        days = self.iter_schedule_data(date_from=date_from, date_to=date_to)
+        if skip_empty:
+            days = ((date_, reservations) for date_, reservations in days if reservations)
+
+        while page := list(itertools.islice(days, page_days)):
+            yield page
+
+    def get_schedule_arrays(self, date_from: dt.date, date_to: dt.date) -> ScheduleArrays:
+        """Gets schedule data as numpy arrays, for analytics callers. Requires numpy."""
+        range_start = EpochMinutes.from_date(date_from)
+        range_end = EpochMinutes.from_date(date_to + dt.timedelta(days=1))
+        return ScheduleArrays.from_rows(
+            date_from=date_from,
+            date_to=date_to,
+            rows=self._reservations_starting_between(range_start=range_start, range_end=range_end)
+        )
 
     def export_schedule_data(self, date_from: dt.date, date_to: dt.date, file_format: str, filename: str) -> tuple:
-        """Exports schedule data from database."""
-        dates_dict = self.get_schedule_data(date_from=date_from, date_to=date_to)
-        exports_directory = 'exported_schedules'
-        filename = os.path.join(exports_directory, filename)
+        """Exports schedule data from database, one day at a time."""
+        days = self.iter_schedule_data(date_from=date_from, date_to=date_to)
+        os.makedirs(self.EXPORTS_DIRECTORY, exist_ok=True)
+        filename = os.path.join(self.EXPORTS_DIRECTORY, filename)
         abs_path = os.path.abspath(filename)
 
         match file_format:
             case 'csv':
-                self._export_schedule_to_csv(data=dates_dict, filename=filename)
+                self._export_schedule_to_csv(days=days, filename=filename)
                 return self.OK, f'Successfully created: {abs_path}.csv.'
             case 'json':
-                self._export_schedule_to_json(data=dates_dict, filename=filename)
+                self._export_schedule_to_json(days=days, filename=filename)
                 return self.OK, f'Successfully created: {abs_path}.json.'
+            case 'bin':
+                BinaryScheduleWriter().write(days=days, filename=filename)
+                return self.OK, f'Successfully created: {abs_path}.bin.'
+
+    def export_schedule_changes(self, file_format: str, filename: str, target: str = None) -> tuple:
+        """Exports reservations created or deleted since the last export to provided target, the file by default.
+        Files have the export_schedule_data csv or json shape, with reservations grouped by their start date,
+        and a deleted column or key marking deleted ones. The target moves on once the file is written,
+        so a failed export is repeated in full by the next one."""
+        target = target or f'{filename}.{file_format}'
+        after = self.change_log.watermark(target=target)
+        until = self.change_log.last_change()
+        changes = (
+            (kind, name, EpochMinutes.to_datetime(start), EpochMinutes.to_datetime(end))
+            for kind, name, start, end in self.change_log.changes_between(after=after, until=until)
+        )
+        os.makedirs(self.EXPORTS_DIRECTORY, exist_ok=True)
+        filename = os.path.join(self.EXPORTS_DIRECTORY, filename)
+
+        match file_format:
+            case 'csv':
+                count = self._export_changes_to_csv(changes=changes, filename=filename)
+            case 'json':
+                count = self._export_changes_to_json(changes=changes, filename=filename)
+            case _:
+                return self.ERROR, f'Changes can not be exported to {file_format} files!'
+
+        self.change_log.save_watermark(target=target, seq=until)
+        return self.OK, f'Exported {count} changes to: {os.path.abspath(filename)}.{file_format}.'
+
+    def import_schedule_data(self, filename: str) -> tuple:
+        """Imports reservations from csv or json file in the export format."""
+        try:
+            reservations = ScheduleReader().read(filename=filename)
+            return self.import_reservations(reservations=reservations)
+        except (OSError, ValueError) as error:
+            return self.ERROR, f'Could not read {filename}: {error}', []
+
+    def import_reservations(self, reservations) -> tuple:
+        """Imports (name, start, end) reservations in a single transaction. Each reservation is checked
+        against the quota limits and for collisions, with both existing and already accepted ones.
+        Returns status, message, and (position, reason) of every rejected reservation."""
+        cache_size = self.cursor.execute('PRAGMA cache_size').fetchone()[0]
+        self.cursor.execute(f'PRAGMA cache_size = {-self.IMPORT_CACHE_SIZE}')
+        try:
+            with self.transaction():
+                accepted, rejected = self._insert_batch(reservations=reservations)
+        finally:
+            self.cursor.execute(f'PRAGMA cache_size = {cache_size}')
+        if self.cache is not None:
+            self.cache.invalidate()
+
+        message = f'Imported {len(accepted)} of {len(accepted) + len(rejected)} reservations.'
+        if rejected and not accepted:
+            return self.ERROR, message, rejected
+
+        return self.OK, message, rejected
+
+    def create_recurring_reservation(self, name: str, res_start: dt.datetime, length: int, rule: str) -> tuple:
+        """Books every occurrence of an iCalendar recurrence rule, e.g. 'FREQ=WEEKLY;UNTIL=20250630', starting
+        at res_start for length minutes. The rule is stored once, occurrences are checked together like an import
+        and the accepted ones are saved in a single transaction.
+        Returns status, message, and (start, reason) of every rejected occurrence."""
+        # dateutil is imported on first use, as most sessions never book recurring reservations:
+        from dateutil import rrule
+
+        try:
+            recurrence = rrule.rrulestr(rule, dtstart=res_start)
+        except (ValueError, TypeError) as error:
+            return self.ERROR, f'Invalid recurrence rule: {error}', []
+
+        starts = list(itertools.islice(recurrence, self.RECURRENCE_LIMIT + 1))
+        if len(starts) > self.RECURRENCE_LIMIT:
+            return self.ERROR, f'Recurring reservation is limited to {self.RECURRENCE_LIMIT} occurrences!', []
+
+        duration = dt.timedelta(minutes=length)
+        self.archive.attach()
+        self.cursor.execute('BEGIN IMMEDIATE')
+        try:
+            self.cursor.execute(Queries.INSERT_RECURRENCE, {
+                'court': self.court_number, 'name': name, 'rule': str(recurrence), 'length': length
+            })
+            accepted, rejected = self._insert_batch(
+                reservations=((name, start, start + duration) for start in starts),
+                recurrence_id=self.cursor.lastrowid
+            )
+        except BaseException:
+            self._rollback()
+            raise
+        rejected = [(starts[position - 1], reason) for position, reason in rejected]
+        if not accepted:
+            self._rollback()
+            return self.ERROR, 'None of the occurrences can be booked!', rejected
+
+        self.connection.commit()
+        if self.cache is not None:
+            self.cache.invalidate()
+        return self.OK, f'Booked {len(accepted)} of {len(starts)} occurrences.', rejected
+
+    def archive_reservations(self, before: dt.date = None) -> tuple:
+        """Moves reservations starting before provided date, by default older than ARCHIVE_AFTER, to the archive.
+        They are still printed and exported, but can not be booked or canceled anymore."""
+        today = dt.date.today()
+        before = before or today - self.ARCHIVE_AFTER
+        if before > today:
+            return self.ERROR, 'Only past reservations can be archived!'
+
+        cutoff = EpochMinutes.from_date(before)
+        if not self.cursor.execute(
+                Queries.HAS_RESERVATIONS_BEFORE, {'court': self.court_number, 'before': cutoff}
+        ).fetchone():
+            return self.OK, 'Nothing to archive.'
+
+        self.archive.attach(create=True)
+        with self.transaction():
+            moved = self.archive.move(before=cutoff)
+        if self.cache is not None:
+            self.cache.invalidate()
+        return self.OK, f'Archived {moved} reservations.'
+
+    def compact(self) -> tuple:
+        """Rebuilds the database and its archive files, returning pages freed by archiving to the file system."""
+        self.cursor.execute('VACUUM')
+        if self.archive.attach():
+            self.cursor.execute('VACUUM archive')
+        return self.OK, f'Compacted {self.database}.'
 
     def check_possible_reservations(self, datetime_: dt.datetime) -> list:
         """Checks and returns possible reservation lengths."""
-        reservation_length_choices = []
-        colliding_reservation = self.cursor.execute(
-            f"SELECT * FROM reservation "
-            f"WHERE datetime_from <= '{datetime_}' AND datetime_to > '{datetime_}'"
+        minute = EpochMinutes.from_datetime(datetime_)
+        # The first reservation ending after requested time either collides with it, or limits its length:
+        next_reservation = self._next_reservation(minute=minute)
+
+        return Availability.reservation_lengths(start=minute, next_reservation=next_reservation)
+
+    def get_busy_slots(self, date_from: dt.date, date_to: dt.date) -> dict:
+        """Returns {date: bitmap} of busy 30 minute slots for each day in provided range, bit n stands for
+        n-th slot of the day. A month of free/busy data fits in a few hundred bytes."""
+        day_from = EpochMinutes.from_date(date_from) // EpochMinutes.MINUTES_PER_DAY
+        day_to = EpochMinutes.from_date(date_to) // EpochMinutes.MINUTES_PER_DAY
+        masks = self.bitmap.masks_between(day_from=day_from, day_to=day_to)
+        return {
+            date_from + dt.timedelta(days=day - day_from): masks.get(day, 0) for day in range(day_from, day_to + 1)
+        }
+
+    def get_free_slots(self, datetime_from: dt.datetime, datetime_to: dt.datetime, min_length: int = 30) -> list:
+        """Returns (start, end) pairs of free time between provided datetimes, at least min_length minutes long."""
+        window_start = EpochMinutes.from_datetime(datetime_from)
+        window_end = EpochMinutes.from_datetime(datetime_to)
+        reservations = self._reservations_overlapping(window_start=window_start, window_end=window_end)
+
+        return [
+            (EpochMinutes.to_datetime(start), EpochMinutes.to_datetime(end))
+            for start, end in Availability.free_slots(
+                reservations=reservations, window_start=window_start, window_end=window_end, min_length=min_length
+            )
+        ]
+
+    def _export_schedule_to_csv(self, days, filename: str) -> None:
+        with open(f'{filename}.csv', 'w', buffering=self.EXPORT_BUFFER_SIZE) as csv_file:
+            writer = csv.writer(csv_file, delimiter=',')
+            writer.writerow(['name', 'start', 'end'])
+            for _, reservations in days:
+                writer.writerows([
+                    name,
+                    start.strftime(self.CSV_DATETIME_FORMAT),
+                    end.strftime(self.CSV_DATETIME_FORMAT)
+                ] for name, start, end in reservations)
+
+    def _export_schedule_to_json(self, days, filename: str) -> None:
+        """Writes one day at a time, producing the same output as json.dump of the whole {date: reservations} dict."""
+        with open(f'{filename}.json', 'w', buffering=self.EXPORT_BUFFER_SIZE) as json_file:
+            json_file.write('{')
+            separator = ''
+            for date_, reservations in days:
+                json_file.write(separator)
+                json_file.write(json.dumps(date_.strftime(self.JSON_DATE_FORMAT)))
+                json_file.write(': ')
+                json_file.write(json.dumps(self._serialize_reservations(reservations=reservations)))
+                separator = ', '
+            json_file.write('}')
+
+    def _export_changes_to_csv(self, changes, filename: str) -> int:
+        """Writes (kind, name, start, end) changes, returns their count."""
+        count = 0
+        with open(f'{filename}.csv', 'w', buffering=self.EXPORT_BUFFER_SIZE) as csv_file:
+            writer = csv.writer(csv_file, delimiter=',')
+            writer.writerow(['name', 'start', 'end', 'deleted'])
+            for kind, name, start, end in changes:
+                writer.writerow([
+                    name,
+                    start.strftime(self.CSV_DATETIME_FORMAT),
+                    end.strftime(self.CSV_DATETIME_FORMAT),
+                    int(kind == ChangeLog.DELETE)
+                ])
+                count += 1
+        return count
+
+    def _export_changes_to_json(self, changes, filename: str) -> int:
+        """Writes (kind, name, start, end) changes ordered by start one day at a time, returns their count."""
+        count = 0
+        with open(f'{filename}.json', 'w', buffering=self.EXPORT_BUFFER_SIZE) as json_file:
+            json_file.write('{')
+            separator = ''
+            for date_, day_changes in itertools.groupby(changes, key=lambda change: change[2].date()):
+                serialized = []
+                for kind, name, start, end in day_changes:
+                    reservation, = self._serialize_reservations(reservations=[(name, start, end)])
+                    if kind == ChangeLog.DELETE:
+                        reservation['deleted'] = True
+                    serialized.append(reservation)
+                json_file.write(separator)
+                json_file.write(json.dumps(date_.strftime(self.JSON_DATE_FORMAT)))
+                json_file.write(': ')
+                json_file.write(json.dumps(serialized))
+                separator = ', '
+                count += len(serialized)
+            json_file.write('}')
+        return count
+
+    def _insert_batch(self, reservations, recurrence_id: int = None) -> tuple:
+        """Inserts (name, start, end) reservations which pass _validate_batch, with their quota counters,
+        day bitmaps and change log entries, in the current transaction. Returns accepted rows and sorted
+        (position, reason) of every rejected reservation."""
+        rejected = []
+        batch = []
+        for position, (name, res_start, res_end) in enumerate(reservations, start=1):
+            if res_start is None or res_end is None:
+                rejected.append((position, 'Invalid date.'))
+            elif not isinstance(name, str):
+                rejected.append((position, 'Invalid name.'))
+            elif not name.strip():
+                rejected.append((position, 'Empty name.'))
+            elif res_end <= res_start:
+                rejected.append((position, 'Reservation ends before it starts.'))
+            else:
+                res_start, res_end = EpochMinutes.from_datetime(res_start), EpochMinutes.from_datetime(res_end)
+                batch.append((res_start, res_end, name, position))
+
+        accepted = self._validate_batch(batch=sorted(batch), rejected=rejected)
+        # Every name is resolved once, in order of its first reservation:
+        users = {name: self.users.get_or_create(name=name) for name in dict.fromkeys(row['name'] for row in accepted)}
+        for row in accepted:
+            row['user'] = users[row['name']]
+        # Ids are given in insert order while the write lock is held, so the batch is every row above the last id:
+        last_id = self.cursor.execute(Queries.LAST_RESERVATION_ID).fetchone()[0]
+        if recurrence_id is None:
+            self.cursor.executemany(Queries.INSERT_RESERVATION, accepted)
+        else:
+            self.cursor.executemany(
+                Queries.INSERT_RECURRING_RESERVATION, ({**row, 'recurrence': recurrence_id} for row in accepted)
+            )
+        self.quota.add_inserted_after(reservation_id=last_id)
+        self.change_log.record_inserted_after(reservation_id=last_id)
+        self.bitmap.add(reservations=((row['start'], row['end']) for row in accepted))
+
+        rejected.sort()
+        return accepted, rejected
+
+    def _validate_batch(self, batch: list, rejected: list) -> list:
+        """Returns rows of sorted (start, end, name, position) batch that can be inserted,
+        appending the others to rejected. Existing reservations in the batch range are read once."""
+        if not batch:
+            return []
+
+        # Reservations starting before the archive cutoff would be hidden by it:
+        cutoff = self.archive.cutoff()
+        if cutoff is not None:
+            rejected.extend((position, 'Date is archived.') for start, _, _, position in batch if start < cutoff)
+            batch = [row for row in batch if row[0] >= cutoff]
+            if not batch:
+                return []
+
+        range_start = batch[0][0]
+        range_end = max(res_end for _, res_end, _, _ in batch)
+        existing_starts, existing_ends = [], []
+        for _, res_start, res_end in self._reservations_starting_between(range_start=range_start, range_end=range_end):
+            existing_starts.append(res_start)
+            existing_ends.append(res_end)
+        # Reservation which started before the range may still overlap it:
+        previous = self._next_reservation(minute=range_start)
+        if previous is not None and previous[0] < range_start:
+            existing_starts.insert(0, previous[0])
+            existing_ends.insert(0, previous[1])
+
+        counts = {
+            period: self.quota.counts_between(period=period, range_start=range_start, range_end=batch[-1][0])
+            for period in self.QUOTA_LIMITS
+        }
+
+        limits = [(period, limit, counts[period]) for period, limit in self.QUOTA_LIMITS.items()]
+        # Reservations of one day share their period starts, so they are computed once per day:
+        day_period_starts = {}
+        accepted = []
+        accepted_end = None
+        for res_start, res_end, name, position in batch:
+            i = bisect.bisect_right(existing_ends, res_start)
+            if i < len(existing_starts) and existing_starts[i] < res_end:
+                rejected.append((position, 'Collides with existing reservation.'))
+                continue
+            if accepted_end is not None and accepted_end > res_start:
+                rejected.append((position, 'Collides with imported reservation.'))
+                continue
+
+            day = res_start // EpochMinutes.MINUTES_PER_DAY
+            period_starts = day_period_starts.get(day)
+            if period_starts is None:
+                period_starts = day_period_starts[day] = [
+                    Quota.period_start(period, res_start) for period in self.QUOTA_LIMITS
+                ]
+            keys = [(name, period_start) for period_start in period_starts]
+            exceeded = [
+                period for (period, limit, period_counts), key in zip(limits, keys)
+                if period_counts.get(key, 0) >= limit
+            ]
+            if exceeded:
+                rejected.append((position, f'{exceeded[0].capitalize()}ly reservation limit exceeded.'))
+            else:
+                accepted.append({'court': self.court_number, 'name': name, 'start': res_start, 'end': res_end})
+                accepted_end = res_end
+                for (_, _, period_counts), key in zip(limits, keys):
+                    period_counts[key] = period_counts.get(key, 0) + 1
+
+        return accepted
+
+    def _write(self, operation) -> tuple:
+        """Runs operation returning (status, message) in a write transaction, or in the current one when writes
+        are grouped by transaction(). It is rolled back when the status is an error, and retried while other
+        writers keep the database locked."""
+        if self._grouped:
+            return operation()
+
+        for attempt in range(self.BOOKING_ATTEMPTS):
+            try:
+                # Takes the write lock up front, waiting up to BUSY_TIMEOUT for other writers:
+                self.cursor.execute('BEGIN IMMEDIATE')
+                error, message = operation()
+                if error:
+                    self._rollback()
+                return error, message
+            except sqlite3.OperationalError as error:
+                if self.connection.in_transaction:
+                    self._rollback()
+                if 'locked' not in str(error) and 'busy' not in str(error):
+                    raise
+                time.sleep(0.05 * (attempt + 1))
+
+        return self.ERROR, 'Database is busy, please try again.'
+
+    def _delete(self, name: str, datetime_: int) -> tuple:
+        """Deletes reservation with its quota counters, change log entry and day bitmaps, in the current
+        transaction. Nothing is written when it does not exist."""
+        user = self.users.find(name=name)
+        time_to_delete = user is not None and self.cursor.execute(
+            Queries.SELECT_RESERVATION_ID, {'court': self.court_number, 'user': user, 'start': datetime_}
         ).fetchone()
+        if not time_to_delete:
+            return self.ERROR, 'Reservation does not exist!'
 
-        if colliding_reservation:
-            return reservation_length_choices
+        reservation_id, res_end = time_to_delete
+        self.cursor.execute(Queries.DELETE_RESERVATION, {'id': reservation_id})
+        self.quota.update(reservations=[(user, datetime_)], delta=-1)
+        self.change_log.record(kind=ChangeLog.DELETE, reservations=[(name, datetime_, res_end)])
+        self.bitmap.rebuild(start=datetime_, end=res_end)
+        self._commit()
+        if self.cache is not None:
+            self.cache.remove(name=name, start=datetime_)
+        return self.OK, 'Your reservation has been canceled successfully.'
+
+    def _book(self, name: str, res_start: int, res_end: int) -> tuple:
+        """Inserts reservation if the time is free and name is below the quota limits, in the current transaction.
+        Nothing is written when a check fails."""
+        if self._is_archived(minute=res_start):
+            return self.ERROR, 'Date is archived.'
+
+        next_reservation = self.cursor.execute(
+            Queries.NEXT_RESERVATION, {'court': self.court_number, 'minute': res_start}
+        ).fetchone()
+        if next_reservation is not None and next_reservation[0] < res_end:
+            return self.ERROR, 'Selected time is no longer available!'
 
-        for interval_multipliers in range(1, 4):
-            datetime_ += dt.timedelta(seconds=1800)
-            colliding_reservation = self.cursor.execute(
-                f"SELECT * FROM reservation "
-                f"WHERE datetime_from < '{datetime_.strftime(self.DB_DATETIME_FORMAT)}' "
-                f"AND datetime_to > '{datetime_.strftime(self.DB_DATETIME_FORMAT)}'"
-            ).fetchone()
-            if colliding_reservation:
-                break
+        user = self.users.find(name=name)
+        for period, limit in self.QUOTA_LIMITS.items():
+            if user is not None and self.quota.count(user=user, period=period, minute=res_start) >= limit:
+                return self.ERROR, 'You have already reached the reservation limit for this period!'
 
-            reservation_length_choices.append(interval_multipliers * 30)
+        self._insert_reservation(name=name, res_start=res_start, res_end=res_end)
+        return self.OK, 'Successfully created reservation!'
 
-        return reservation_length_choices
+    def _is_archived(self, minute: int) -> bool:
+        """Returns whether reservation starting at provided minute would be hidden by the archive cutoff,
+        as schedules before it are read only from the archive."""
+        cutoff = self.archive.cutoff()
+        return cutoff is not None and minute < cutoff
 
-    def _export_schedule_to_csv(self, data: dict, filename: str) -> None:
-        with open(f'{filename}.csv', 'w') as csv_file:
-            writer = csv.writer(csv_file, delimiter=',')
-            writer.writerow(['name', 'start', 'end'])
-            for reservations in data.values():
-                for name, start, end in reservations:
-                    writer.writerow([
-                        name,
-                        start.strftime(self.CSV_DATETIME_FORMAT),
-                        end.strftime(self.CSV_DATETIME_FORMAT)
-                    ])
-
-    def _export_schedule_to_json(self, data: dict, filename: str) -> None:
-        serialized_data = {}
-        for date_, reservations in data.items():
-            serialized_data[date_.strftime(self.JSON_DATE_FORMAT)] = \
-                self._serialize_reservations(reservations=reservations)
-
-        with open(f'{filename}.json', 'w') as json_file:
-            json.dump(serialized_data, json_file)
-
-    def _prepare_db(self) -> None:
-        try:
-            self.cursor.execute('CREATE TABLE reservation(full_name varchar, datetime_from time, datetime_to time)')
-        except sqlite3.OperationalError:
-            pass
+    def _commit(self) -> None:
+        """Commits the current transaction, unless writes are grouped by transaction()."""
+        if not self._grouped:
+            self.connection.commit()
+
+    def _rollback(self) -> None:
+        """Rolls back the current transaction, forgetting ids of users it may have added."""
+        self.connection.rollback()
+        self.users.clear()
+
+    def _insert_reservation(self, name: str, res_start: int, res_end: int) -> None:
+        """Inserts reservation, updates its quota counters and logs it in the current transaction, then commits."""
+        user = self.users.get_or_create(name=name)
+        self.cursor.execute(
+            Queries.INSERT_RESERVATION, {'court': self.court_number, 'user': user, 'start': res_start, 'end': res_end}
+        )
+        self.quota.update(reservations=[(user, res_start)], delta=1)
+        self.change_log.record(kind=ChangeLog.INSERT, reservations=[(name, res_start, res_end)])
+        self.bitmap.add(reservations=[(res_start, res_end)])
+        self._commit()
+        if self.cache is not None:
+            self.cache.add(name=name, start=res_start, end=res_end)
 
     def _serialize_reservations(self, reservations: list) -> list:
         """Serializes reservations data."""
@@ -153,40 +663,123 @@ class Model:
         return serialized_reservations
 
     def check_if_eligible(self, name: str, datetime_: dt.datetime) -> bool:
-        """Checks if there are already 3 reservations made for provided name for this week."""
-        weekday = datetime_.weekday()
-        date_ = datetime_.date()
-        week_start = date_ - dt.timedelta(days=weekday)
-        week_end = date_ + dt.timedelta(days=6 - weekday)
-
-        user_reservation_count = len(
-            self.cursor.execute(
-                f"SELECT * FROM reservation "
-                f"WHERE full_name='{name}' "
-                f"AND datetime_from >= '{week_start}' AND datetime_from <= '{week_end}'"
-            ).fetchall()
+        """Checks if provided name is still below every limit in QUOTA_LIMITS for the periods of provided datetime."""
+        minute = EpochMinutes.from_datetime(datetime_)
+        for period, limit in self.QUOTA_LIMITS.items():
+            if self._count_reservations(name=name, period=period, minute=minute) >= limit:
+                return False
+
+        return True
+
+    def recommend_other_date(
+            self,
+            datetime_: dt.datetime,
+            length: int = Availability.SLOT_MINUTES,
+            horizon: dt.timedelta = RECOMMENDATION_HORIZON,
+            opening_hours: tuple = None
+    ) -> dt.datetime:
+        """Recommends the earliest date after the one requested by User, with at least length minutes free.
+        Returns None if there is no such date within the horizon."""
+        window_start = EpochMinutes.from_datetime(datetime_)
+        window_end = EpochMinutes.from_datetime(datetime_ + horizon)
+
+        for gap_start, _ in self._free_gaps(
+                window_start=window_start, window_end=window_end, length=length, opening_hours=opening_hours
+        ):
+            return EpochMinutes.to_datetime(gap_start)
+
+        return None
+
+    def recommend_other_dates(
+            self,
+            datetime_: dt.datetime,
+            length: int = Availability.SLOT_MINUTES,
+            count: int = 3,
+            horizon: dt.timedelta = RECOMMENDATION_HORIZON,
+            opening_hours: tuple = None,
+            not_before: dt.datetime = None
+    ) -> list:
+        """Recommends up to count dates with at least length minutes free, closest to the one requested by User.
+        Dates are searched within the horizon on both sides of the requested date, but not before not_before."""
+        window_start = datetime_ - horizon
+        if not_before is not None:
+            window_start = max(window_start, not_before)
+
+        gaps = self._free_gaps(
+            window_start=EpochMinutes.from_datetime(window_start),
+            window_end=EpochMinutes.from_datetime(datetime_ + horizon),
+            length=length,
+            opening_hours=opening_hours
+        )
+        starts = Availability.closest_starts(
+            gaps=gaps, requested=EpochMinutes.from_datetime(datetime_), length=length, count=count
+        )
+        return [EpochMinutes.to_datetime(start) for start in starts]
+
+    def _free_gaps(self, window_start: int, window_end: int, length: int, opening_hours: tuple = None):
+        """Yields free (start, end) gaps of whole slots, at least length minutes long, in the window, optionally
+        within (opening, closing) hours. Gaps are found in day bitmaps, without reading reservation rows."""
+        gaps = self.bitmap.free_gaps(window_start=window_start, window_end=window_end, length=length)
+        if opening_hours is None:
+            return gaps
+
+        opening, closing = opening_hours
+        return Availability.within_opening_hours(
+            gaps=gaps,
+            opening_hours=(opening.hour * 60 + opening.minute, closing.hour * 60 + closing.minute),
+            min_length=length
         )
 
-        if user_reservation_count > 2:
-            return False
+    # Lookups, answered by the cache when enabled. Times are epoch minutes:
+    def _next_reservation(self, minute: int) -> tuple:
+        """Returns (start, end) of the first reservation ending after provided minute, or None."""
+        if self.cache is not None:
+            return self.cache.next_reservation(minute=minute)
 
-        return True
+        return self.cursor.execute(Queries.NEXT_RESERVATION, {'court': self.court_number, 'minute': minute}).fetchone()
 
-    def recommend_other_date(self, datetime_: dt.datetime) -> dt.datetime:
-        """Recommends other date if the date requested by User is unavailable."""
-        reservations = self.cursor.execute(
-            f"SELECT * FROM reservation "
-            f"WHERE datetime_to > '{datetime_}'"
-            f"ORDER BY datetime_from"
-        ).fetchall()
+    def _reservations_overlapping(self, window_start: int, window_end: int):
+        """Returns (start, end) of reservations overlapping provided window, ordered by start."""
+        if self.cache is not None:
+            return self.cache.reservations_overlapping(window_start=window_start, window_end=window_end)
 
-        for i, reservation in enumerate(reservations[:-1]):
-            current_end = dt.datetime.strptime(reservation[2], self.DB_DATETIME_FORMAT)
-            next_start = dt.datetime.strptime(reservations[i + 1][1], self.DB_DATETIME_FORMAT)
+        # Own cursor, so callers can stream the rows and stop early:
+        return self.connection.execute(
+            Queries.RESERVATIONS_OVERLAPPING,
+            {'court': self.court_number, 'window_start': window_start, 'window_end': window_end}
+        )
 
-            delta = (next_start - current_end).total_seconds()
-            if delta >= 1800:
-                return current_end
+    def _reservations_starting_between(self, range_start: int, range_end: int):
+        """Yields (name, start, end) of reservations starting in [range_start, range_end), ordered by start.
+        Reservations starting before the archive cutoff are read from the archive."""
+        cutoff = self.archive.cutoff()
+        if cutoff is not None and range_start < cutoff:
+            cursor = self.archive.reservations_starting_between(
+                range_start=range_start, range_end=min(range_end, cutoff)
+            )
+            while rows := cursor.fetchmany(self.EXPORT_BATCH_SIZE):
+                yield from rows
+            range_start = cutoff
+            if range_start >= range_end:
+                return None
+
+        if self.cache is not None:
+            yield from self.cache.reservations_starting_between(range_start=range_start, range_end=range_end)
+            return None
+
+        cursor = self.connection.execute(
+            Queries.RESERVATIONS_STARTING_BETWEEN,
+            {'court': self.court_number, 'range_start': range_start, 'range_end': range_end}
+        )
+        while rows := cursor.fetchmany(self.EXPORT_BATCH_SIZE):
+            yield from rows
+
+    def _count_reservations(self, name: str, period: str, minute: int) -> int:
+        """Returns count of reservations made by provided name in the period containing provided minute."""
+        if self.cache is not None:
+            return self.cache.count_reservations(
+                name=name, range_start=Quota.period_start(period, minute), range_end=Quota.period_end(period, minute)
+            )
 
-        # If no space in-between existing reservations, return end of last reservation.
-        return dt.datetime.strptime(reservations[-1][2], self.DB_DATETIME_FORMAT)
+        user = self.users.find(name=name)
+        return 0 if user is None else self.quota.count(user=user, period=period, minute=minute)
@@ -0,0 +1,131 @@
+import concurrent.futures
+import datetime as dt
+import itertools
+import json
+import os.path
+import shutil
+import tempfile
+
+from mvc.model import Model
+
+
+def export_shard(shard: tuple) -> str:
+    """Exports (court, database, date_from, date_to, file_format, directory) shard with its own read-only Model,
+    returns path of the written file. Runs in worker processes."""
+    court, database, date_from, date_to, file_format, directory = shard
+    model = Model(court_number=court, database=database, read_only=True)
+    model.EXPORTS_DIRECTORY = directory
+    filename = f'{court}_{date_from:%Y%m%d}'
+    try:
+        model.export_schedule_data(date_from=date_from, date_to=date_to, file_format=file_format, filename=filename)
+    finally:
+        model.connection.close()
+    return os.path.join(directory, f'{filename}.{file_format}')
+
+
+class ParallelExport:
+    """Exports schedules of several courts at once, e.g. for month-end reporting. Work is split into shards of
+    one court and a part of the date range, each exported by Model.export_schedule_data in a pool of worker
+    processes. Shard files are merged in court and date order as they are finished, so the result does not depend
+    on which worker was faster. Courts are kept in their own tennis_court_<court>.db files, or in one shared
+    database."""
+    # Every shard opens its own connection, a few shards per worker balance the load without adding up its cost:
+    SHARDS_PER_WORKER = 4
+    FILE_FORMATS = ('csv', 'json')
+    EXPORTS_DIRECTORY = Model.EXPORTS_DIRECTORY
+
+    OK, ERROR = Model.OK, Model.ERROR
+
+    def __init__(self, courts, database: str = None, workers: int = None):
+        self.courts = list(courts)
+        self.database = database
+        self.workers = workers or os.cpu_count()
+
+    def export(self, date_from: dt.date, date_to: dt.date, file_format: str, filename: str, per_court=False) -> tuple:
+        """Exports every court into one file, with a court column in csv and courts as keys of json.
+        With per_court, each court is exported into <filename>_<court> file, the same as export_schedule_data."""
+        if file_format not in self.FILE_FORMATS:
+            return self.ERROR, f'Schedules can not be exported to {file_format} files in parallel!'
+        if not self.courts:
+            return self.ERROR, 'No courts to export!'
+
+        # Workers only read, so every database is upgraded to the current schema first:
+        for court in self.courts:
+            Model(court_number=court, database=self.database).connection.close()
+
+        os.makedirs(self.EXPORTS_DIRECTORY, exist_ok=True)
+        filename = os.path.join(self.EXPORTS_DIRECTORY, filename)
+        with tempfile.TemporaryDirectory() as directory:
+            shards = [
+                (court, self.database, shard_from, shard_to, file_format, directory)
+                for court in self.courts
+                for shard_from, shard_to in self._date_ranges(date_from=date_from, date_to=date_to)
+            ]
+            if self.workers == 1:
+                self._merge(shards=shards, paths=map(export_shard, shards), filename=filename, per_court=per_court)
+            else:
+                with concurrent.futures.ProcessPoolExecutor(max_workers=self.workers) as executor:
+                    paths = executor.map(export_shard, shards)
+                    self._merge(shards=shards, paths=paths, filename=filename, per_court=per_court)
+
+        if per_court:
+            return self.OK, f'Exported {len(self.courts)} courts to: {os.path.abspath(filename)}_<court>.{file_format}.'
+        return self.OK, f'Exported {len(self.courts)} courts to: {os.path.abspath(filename)}.{file_format}.'
+
+    def _date_ranges(self, date_from: dt.date, date_to: dt.date):
+        """Yields (from, to) parts of provided range, as many for every court as gives SHARDS_PER_WORKER shards
+        to every worker."""
+        days = (date_to - date_from).days + 1
+        parts = min(days, -(-self.workers * self.SHARDS_PER_WORKER // len(self.courts)))
+        for part in range(parts):
+            yield (
+                date_from + dt.timedelta(days=days * part // parts),
+                date_from + dt.timedelta(days=days * (part + 1) // parts - 1)
+            )
+
+    def _merge(self, shards: list, paths, filename: str, per_court: bool) -> None:
+        """Writes shard files, received in order of shards, into the output files, removing each one merged."""
+        file_format = shards[0][4]
+        courts = itertools.groupby(zip(shards, paths), key=lambda shard_path: shard_path[0][0])
+        if per_court:
+            for court, court_shards in courts:
+                with open(f'{filename}_{court}.{file_format}', 'w', newline='') as output:
+                    self._merge_court(output=output, paths=(path for _, path in court_shards), file_format=file_format)
+            return None
+
+        with open(f'{filename}.{file_format}', 'w', newline='') as output:
+            if file_format == 'json':
+                output.write('{')
+            for i, (court, court_shards) in enumerate(courts):
+                paths = (path for _, path in court_shards)
+                if file_format == 'csv':
+                    self._merge_court(output=output, paths=paths, file_format=file_format, court=court, header=i == 0)
+                else:
+                    output.write(f'{", " if i else ""}{json.dumps(str(court))}: ')
+                    self._merge_court(output=output, paths=paths, file_format=file_format)
+            if file_format == 'json':
+                output.write('}')
+
+    @staticmethod
+    def _merge_court(output, paths, file_format: str, court=None, header=True) -> None:
+        """Appends shards of one court: csv rows under one header, optionally prefixed with the court,
+        or days of json objects as one object."""
+        if file_format == 'json':
+            output.write('{')
+        for i, path in enumerate(paths):
+            with open(path, newline='') as shard:
+                if file_format == 'json':
+                    # Every shard holds at least one day, days are separated as in export_schedule_data:
+                    output.write(', ' if i else '')
+                    output.write(shard.read()[1:-1])
+                elif court is None:
+                    header_line = shard.readline()
+                    output.write(header_line if header and i == 0 else '')
+                    shutil.copyfileobj(shard, output)
+                else:
+                    header_line = shard.readline()
+                    output.write(f'court,{header_line}' if header and i == 0 else '')
+                    output.writelines(f'{court},{line}' for line in shard)
+            os.remove(path)
+        if file_format == 'json':
+            output.write('}')
@@ -0,0 +1,56 @@
+import contextlib
+import queue
+import sqlite3
+import threading
+
+from mvc.queries import Queries
+
+
+class ConnectionPool:
+    """Bounded pool of connections to one database, shared between threads.
+    Connections are opened lazily up to size, and each is handed out to one caller at a time."""
+
+    def __init__(self, database: str, size: int = 4, timeout: float = 5.0):
+        self.database = database
+        self.size = size
+        # Seconds a connection waits for another one to release the write lock:
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._opened = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def connection(self):
+        """Borrows a connection, waiting for one to be returned if all of them are in use."""
+        connection = self._acquire()
+        try:
+            yield connection
+        finally:
+            if connection.in_transaction:
+                connection.rollback()
+            self._idle.put(connection)
+
+    def close(self) -> None:
+        """Closes every connection, waiting for borrowed ones to be returned."""
+        for _ in range(len(self._opened)):
+            self._idle.get().close()
+        self._opened.clear()
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._opened) < self.size:
+                connection = sqlite3.connect(
+                    self.database,
+                    timeout=self.timeout,
+                    check_same_thread=False,
+                    cached_statements=Queries.CACHED_STATEMENTS
+                )
+                self._opened.append(connection)
+                return connection
+
+        return self._idle.get()
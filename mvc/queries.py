@@ -0,0 +1,241 @@
+class Queries:
+    """Named, parameterized SQL statements used by Model, ReservationCache, Quota, Users, ChangeLog, Archive and Club.
+    Values are always bound, never formatted into the text, so any name is stored safely
+    and each statement is compiled once and then reused from the sqlite3 statement cache."""
+    CACHED_STATEMENTS = 256
+
+    INSERT_COURT = (
+        'INSERT OR IGNORE INTO court(number) VALUES (:court)'
+    )
+    SELECT_COURT = (
+        'SELECT 1 FROM court WHERE number = :court'
+    )
+    SELECT_COURTS = (
+        'SELECT number FROM court ORDER BY number'
+    )
+    SELECT_USER_ID = (
+        'SELECT id FROM user WHERE full_name = :name'
+    )
+    INSERT_USER = (
+        'INSERT OR IGNORE INTO user(full_name) VALUES (:name)'
+    )
+    INSERT_RESERVATION = (
+        'INSERT INTO reservation(court, user_id, datetime_from, datetime_to) '
+        'VALUES (:court, :user, :start, :end)'
+    )
+    INSERT_RECURRING_RESERVATION = (
+        'INSERT INTO reservation(court, user_id, datetime_from, datetime_to, recurrence_id) '
+        'VALUES (:court, :user, :start, :end, :recurrence)'
+    )
+    INSERT_RECURRENCE = (
+        'INSERT INTO recurrence(court, full_name, rule, length) VALUES (:court, :name, :rule, :length)'
+    )
+    SELECT_RECURRENCES = (
+        'SELECT id, full_name, rule, length FROM recurrence WHERE court = :court ORDER BY id'
+    )
+    SELECT_RESERVATION_ID = (
+        'SELECT id, datetime_to FROM reservation '
+        'WHERE court = :court AND user_id = :user AND datetime_from = :start'
+    )
+    DELETE_RESERVATION = (
+        'DELETE FROM reservation WHERE id = :id'
+    )
+    NEXT_RESERVATION = (
+        'SELECT datetime_from, datetime_to FROM reservation '
+        'WHERE court = :court AND datetime_to > :minute '
+        'ORDER BY datetime_to LIMIT 1'
+    )
+    # Reservation overlapping window start, followed by every reservation starting inside the window:
+    RESERVATIONS_OVERLAPPING = (
+        'SELECT * FROM ('
+        'SELECT datetime_from, datetime_to FROM reservation '
+        'WHERE court = :court AND datetime_to > :window_start ORDER BY datetime_to LIMIT 1) '
+        'UNION '
+        'SELECT datetime_from, datetime_to FROM reservation '
+        'WHERE court = :court AND datetime_from >= :window_start AND datetime_from < :window_end '
+        'ORDER BY datetime_from'
+    )
+    RESERVATIONS_STARTING_BETWEEN = (
+        'SELECT full_name, datetime_from, datetime_to FROM reservation JOIN user ON user.id = reservation.user_id '
+        'WHERE court = :court AND datetime_from >= :range_start AND datetime_from < :range_end '
+        'ORDER BY datetime_from'
+    )
+    ALL_RESERVATIONS = (
+        'SELECT full_name, datetime_from, datetime_to FROM reservation JOIN user ON user.id = reservation.user_id '
+        'WHERE court = :court '
+        'ORDER BY datetime_from'
+    )
+    # Courts whose first reservation ending after start does not begin before end:
+    FIRST_FREE_COURT = (
+        'SELECT number FROM court '
+        'WHERE COALESCE(('
+        'SELECT datetime_from FROM reservation '
+        'WHERE court = court.number AND datetime_to > :start ORDER BY datetime_to LIMIT 1'
+        '), :end) >= :end '
+        'ORDER BY number LIMIT 1'
+    )
+    CLUB_RESERVATIONS_STARTING_BETWEEN = (
+        'SELECT court, full_name, datetime_from, datetime_to '
+        'FROM reservation JOIN user ON user.id = reservation.user_id '
+        'WHERE court IN (SELECT number FROM court) '
+        'AND datetime_from >= :range_start AND datetime_from < :range_end '
+        'ORDER BY court, datetime_from'
+    )
+    # Archive attached as archive, see Archive:
+    SELECT_ARCHIVE_CUTOFF = (
+        'SELECT archived_before FROM archive.archive_cutoff WHERE court = :court'
+    )
+    UPSERT_ARCHIVE_CUTOFF = (
+        'INSERT INTO archive.archive_cutoff(court, archived_before) VALUES (:court, :before) '
+        'ON CONFLICT DO UPDATE SET archived_before = MAX(archived_before, excluded.archived_before)'
+    )
+    HAS_RESERVATIONS_BEFORE = (
+        'SELECT 1 FROM reservation WHERE court = :court AND datetime_from < :before LIMIT 1'
+    )
+    ARCHIVE_RESERVATIONS = (
+        'INSERT OR IGNORE INTO archive.reservation(court, full_name, datetime_from, datetime_to, recurrence_id) '
+        'SELECT court, full_name, datetime_from, datetime_to, recurrence_id '
+        'FROM main.reservation JOIN main.user ON user.id = reservation.user_id '
+        'WHERE court = :court AND datetime_from < :before'
+    )
+    DELETE_ARCHIVED_RESERVATIONS = (
+        'DELETE FROM main.reservation WHERE court = :court AND datetime_from < :before'
+    )
+    ARCHIVED_RESERVATIONS_STARTING_BETWEEN = (
+        'SELECT full_name, datetime_from, datetime_to FROM archive.reservation '
+        'WHERE court = :court AND datetime_from >= :range_start AND datetime_from < :range_end '
+        'ORDER BY datetime_from'
+    )
+    # Archived reservations before their court's cutoff, followed by live ones from the cutoff on:
+    CLUB_ARCHIVED_RESERVATIONS_STARTING_BETWEEN = (
+        'SELECT court, full_name, datetime_from, datetime_to FROM archive.reservation AS archived '
+        'WHERE court IN (SELECT number FROM court) '
+        'AND datetime_from >= :range_start AND datetime_from < :range_end '
+        'AND datetime_from < (SELECT archived_before FROM archive.archive_cutoff WHERE court = archived.court) '
+        'UNION ALL '
+        'SELECT court, full_name, datetime_from, datetime_to '
+        'FROM reservation JOIN user ON user.id = reservation.user_id '
+        'WHERE court IN (SELECT number FROM court) '
+        'AND datetime_from >= :range_start AND datetime_from < :range_end '
+        'AND datetime_from >= COALESCE('
+        '(SELECT archived_before FROM archive.archive_cutoff WHERE court = reservation.court), :range_start) '
+        'ORDER BY court, datetime_from'
+    )
+    # Per-court file attached as court_file, its recurrence ids are shifted past the ones in use:
+    SELECT_RECURRENCE_ID_OFFSET = (
+        'SELECT COALESCE(MAX(id), 0) FROM recurrence'
+    )
+    COPY_COURT_FILE_RECURRENCES = (
+        'INSERT INTO recurrence(id, court, full_name, rule, length) '
+        'SELECT id + :offset, :court, full_name, rule, length FROM court_file.recurrence'
+    )
+    # Users of the file are added by name, and referenced by their ids in the club database:
+    COPY_COURT_FILE_USERS = (
+        'INSERT OR IGNORE INTO main.user(full_name) SELECT full_name FROM court_file.user'
+    )
+    COPY_COURT_FILE_RESERVATIONS = (
+        'INSERT INTO main.reservation(court, user_id, datetime_from, datetime_to, recurrence_id) '
+        'SELECT :court, club_user.id, datetime_from, datetime_to, recurrence_id + :offset '
+        'FROM court_file.reservation AS copied '
+        'JOIN court_file.user AS file_user ON file_user.id = copied.user_id '
+        'JOIN main.user AS club_user ON club_user.full_name = file_user.full_name'
+    )
+    COPY_COURT_FILE_QUOTA = (
+        'INSERT INTO main.reservation_quota(court, period, period_start, user_id, reservation_count) '
+        'SELECT :court, period, period_start, club_user.id, reservation_count '
+        'FROM court_file.reservation_quota AS copied '
+        'JOIN court_file.user AS file_user ON file_user.id = copied.user_id '
+        'JOIN main.user AS club_user ON club_user.full_name = file_user.full_name'
+    )
+    COPY_COURT_FILE_DAY_SLOTS = (
+        'INSERT INTO reservation_day(court, day, slots) '
+        'SELECT :court, day, slots FROM court_file.reservation_day'
+    )
+    COPY_COURT_FILE_CHANGES = (
+        'INSERT INTO reservation_change(court, kind, full_name, datetime_from, datetime_to) '
+        "SELECT :court, 'insert', full_name, datetime_from, datetime_to "
+        'FROM court_file.reservation JOIN court_file.user ON user.id = reservation.user_id '
+        'ORDER BY datetime_from'
+    )
+    # The file's archive holds only its own court, and is attached as court_archive next to the club one:
+    COPY_COURT_FILE_ARCHIVE = (
+        'INSERT INTO archive.reservation(court, full_name, datetime_from, datetime_to, recurrence_id) '
+        'SELECT :court, full_name, datetime_from, datetime_to, recurrence_id + :offset FROM court_archive.reservation'
+    )
+    COPY_COURT_FILE_ARCHIVE_CUTOFF = (
+        'INSERT INTO archive.archive_cutoff(court, archived_before) '
+        'SELECT :court, MAX(archived_before) FROM court_archive.archive_cutoff HAVING COUNT(*) > 0 '
+        'ON CONFLICT DO UPDATE SET archived_before = MAX(archived_before, excluded.archived_before)'
+    )
+    LAST_RESERVATION_ID = (
+        'SELECT COALESCE(MAX(id), 0) FROM main.reservation'
+    )
+    INSERT_CHANGES_AFTER = (
+        'INSERT INTO reservation_change(court, kind, full_name, datetime_from, datetime_to) '
+        "SELECT court, 'insert', full_name, datetime_from, datetime_to "
+        'FROM main.reservation JOIN main.user ON user.id = reservation.user_id '
+        'WHERE reservation.id > :after AND court = :court '
+        'ORDER BY reservation.id'
+    )
+    INSERT_CHANGE = (
+        'INSERT INTO reservation_change(court, kind, full_name, datetime_from, datetime_to) '
+        'VALUES (:court, :kind, :name, :start, :end)'
+    )
+    LAST_CHANGE = (
+        'SELECT COALESCE(MAX(seq), 0) FROM reservation_change WHERE court = :court'
+    )
+    # Last change of every reservation changed in (after, until], reservations are told apart by name and start:
+    CHANGES_BETWEEN = (
+        'SELECT kind, full_name, datetime_from, datetime_to FROM reservation_change '
+        'WHERE seq IN ('
+        'SELECT MAX(seq) FROM reservation_change '
+        'WHERE court = :court AND seq > :after AND seq <= :until '
+        'GROUP BY full_name, datetime_from) '
+        'ORDER BY datetime_from, seq'
+    )
+    SELECT_WATERMARK = (
+        'SELECT seq FROM export_watermark WHERE court = :court AND target = :target'
+    )
+    UPSERT_WATERMARK = (
+        'INSERT INTO export_watermark(court, target, seq) VALUES (:court, :target, :seq) '
+        'ON CONFLICT DO UPDATE SET seq = excluded.seq'
+    )
+    SELECT_QUOTA_COUNT = (
+        'SELECT reservation_count FROM reservation_quota '
+        'WHERE court = :court AND period = :period AND period_start = :period_start AND user_id = :user'
+    )
+    QUOTA_COUNTS_BETWEEN = (
+        'SELECT full_name, period_start, reservation_count '
+        'FROM reservation_quota JOIN user ON user.id = reservation_quota.user_id '
+        'WHERE court = :court AND period = :period AND period_start >= :range_start AND period_start <= :range_end'
+    )
+    # Counters of reservations with ids above :after, grouped by SQLite with the period starts of Quota.period_start:
+    ADD_WEEK_QUOTA_AFTER = (
+        'INSERT INTO reservation_quota(court, period, period_start, user_id, reservation_count) '
+        "SELECT court, 'week', (datetime_from / 1440 - (datetime_from / 1440 + 3) % 7) * 1440, user_id, COUNT(*) "
+        'FROM main.reservation WHERE id > :after AND court = :court GROUP BY 3, 4 '
+        'ON CONFLICT DO UPDATE SET reservation_count = reservation_count + excluded.reservation_count'
+    )
+    ADD_MONTH_QUOTA_AFTER = (
+        'INSERT INTO reservation_quota(court, period, period_start, user_id, reservation_count) '
+        "SELECT court, 'month', "
+        "CAST(strftime('%s', datetime_from * 60, 'unixepoch', 'start of month') AS INTEGER) / 60, user_id, COUNT(*) "
+        'FROM main.reservation WHERE id > :after AND court = :court GROUP BY 3, 4 '
+        'ON CONFLICT DO UPDATE SET reservation_count = reservation_count + excluded.reservation_count'
+    )
+    UPSERT_QUOTA = (
+        'INSERT INTO reservation_quota(court, period, period_start, user_id, reservation_count) '
+        'VALUES (:court, :period, :period_start, :user, :delta) '
+        'ON CONFLICT DO UPDATE SET reservation_count = reservation_count + excluded.reservation_count'
+    )
+    DAY_SLOTS_BETWEEN = (
+        'SELECT day, slots FROM reservation_day '
+        'WHERE court = :court AND day >= :day_from AND day <= :day_to'
+    )
+    UPSERT_DAY_SLOTS = (
+        'INSERT INTO reservation_day(court, day, slots) VALUES (:court, :day, :slots) '
+        'ON CONFLICT DO UPDATE SET slots = slots | excluded.slots'
+    )
+    REPLACE_DAY_SLOTS = (
+        'INSERT OR REPLACE INTO reservation_day(court, day, slots) VALUES (:court, :day, :slots)'
+    )
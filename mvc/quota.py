@@ -0,0 +1,85 @@
+import functools
+import sqlite3
+
+from mvc.queries import Queries
+from utils.epoch import EpochMinutes
+
+
+class Quota:
+    """Reservation counters per court, user and period, kept in reservation_quota table.
+    Counters are updated in the same transaction as reservations, so checking a limit is
+    a single primary key lookup. All times are epoch minutes."""
+    PERIODS = ('week', 'month')
+    ADD_AFTER_QUERIES = {'week': Queries.ADD_WEEK_QUOTA_AFTER, 'month': Queries.ADD_MONTH_QUOTA_AFTER}
+
+    def __init__(self, connection: sqlite3.Connection, court_number=1):
+        self.connection = connection
+        self.court_number = court_number
+
+    @staticmethod
+    def period_start(period: str, minute: int) -> int:
+        """Returns start of the period containing provided minute."""
+        match period:
+            case 'week':
+                return EpochMinutes.week_start(minute)
+            case 'month':
+                return Quota._month_start(minute // EpochMinutes.MINUTES_PER_DAY)
+        raise ValueError(f'Unknown quota period: {period}!')
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _month_start(day: int) -> int:
+        """Returns start of the month containing provided day since the epoch, memoized for bulk updates."""
+        date_ = EpochMinutes.to_datetime(day * EpochMinutes.MINUTES_PER_DAY).date()
+        return EpochMinutes.from_date(date_.replace(day=1))
+
+    @classmethod
+    def period_end(cls, period: str, minute: int) -> int:
+        """Returns start of the period following the one containing provided minute."""
+        match period:
+            case 'week':
+                return EpochMinutes.week_start(minute) + 7 * EpochMinutes.MINUTES_PER_DAY
+            case 'month':
+                return cls.period_start(period, cls.period_start(period, minute) + 31 * EpochMinutes.MINUTES_PER_DAY)
+        raise ValueError(f'Unknown quota period: {period}!')
+
+    def count(self, user: int, period: str, minute: int) -> int:
+        """Returns count of reservations made by provided user id in the period containing provided minute."""
+        row = self.connection.execute(Queries.SELECT_QUOTA_COUNT, {
+            'court': self.court_number,
+            'period': period,
+            'period_start': self.period_start(period, minute),
+            'user': user
+        }).fetchone()
+        return row[0] if row else 0
+
+    def counts_between(self, period: str, range_start: int, range_end: int) -> dict:
+        """Returns {(name, period start): count} for periods containing minutes from range_start to range_end."""
+        rows = self.connection.execute(Queries.QUOTA_COUNTS_BETWEEN, {
+            'court': self.court_number,
+            'period': period,
+            'range_start': self.period_start(period, range_start),
+            'range_end': self.period_start(period, range_end)
+        })
+        return {(name, period_start): count for name, period_start, count in rows}
+
+    def add_inserted_after(self, reservation_id: int) -> None:
+        """Counts reservations with ids above provided one, in the current transaction. Used for batches, which
+        are grouped by SQLite in one statement per period instead of binding a counter at a time."""
+        for period in self.PERIODS:
+            self.connection.execute(
+                self.ADD_AFTER_QUERIES[period], {'court': self.court_number, 'after': reservation_id}
+            )
+
+    def update(self, reservations, delta: int) -> None:
+        """Adds delta to counters of every (user id, start) reservation, in the current transaction."""
+        deltas = {}
+        for user, start in reservations:
+            for period in self.PERIODS:
+                key = (period, self.period_start(period, start), user)
+                deltas[key] = deltas.get(key, 0) + delta
+
+        self.connection.executemany(Queries.UPSERT_QUOTA, (
+            {'court': self.court_number, 'period': period, 'period_start': period_start, 'user': user, 'delta': delta}
+            for (period, period_start, user), delta in deltas.items()
+        ))
@@ -0,0 +1,72 @@
+import datetime as dt
+from typing import Iterable
+
+from utils.epoch import EpochMinutes
+
+
+class ScheduleArrays:
+    """Schedule of a date range as numpy arrays, one entry per reservation ordered by start.
+    Starts and ends are datetime64[m], which count minutes since the epoch like the database does,
+    so rows are copied without any conversion. Reservations of i-th day of the range are
+    [day_offsets[i]:day_offsets[i + 1]]. numpy is optional, it is imported on first use of this class."""
+
+    def __init__(self, date_from: dt.date, names, starts, ends, day_offsets):
+        self.date_from = date_from
+        self.names = names
+        self.starts = starts
+        self.ends = ends
+        self.day_offsets = day_offsets
+
+    @classmethod
+    def from_rows(cls, date_from: dt.date, date_to: dt.date, rows: Iterable) -> 'ScheduleArrays':
+        """Builds arrays from (name, start, end) rows in epoch minutes, ordered by start."""
+        numpy = cls.numpy()
+        names, starts, ends = [], [], []
+        for name, res_start, res_end in rows:
+            names.append(name)
+            starts.append(res_start)
+            ends.append(res_end)
+
+        range_start = EpochMinutes.from_date(date_from)
+        day_starts = numpy.arange((date_to - date_from).days + 2, dtype=numpy.int64)
+        day_starts = day_starts * EpochMinutes.MINUTES_PER_DAY + range_start
+        starts = numpy.array(starts, dtype=numpy.int64)
+        return cls(
+            date_from=date_from,
+            names=numpy.array(names, dtype=object),
+            starts=starts.view('datetime64[m]'),
+            ends=numpy.array(ends, dtype=numpy.int64).view('datetime64[m]'),
+            day_offsets=numpy.searchsorted(starts, day_starts)
+        )
+
+    @staticmethod
+    def numpy():
+        """Returns numpy module, importing it takes longer than starting the whole REPL."""
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError('Schedule arrays require numpy, install it with `pip install numpy`.') from None
+        return numpy
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def durations(self):
+        """Lengths of reservations in minutes."""
+        return (self.ends - self.starts).astype(self.numpy().int64)
+
+    @property
+    def counts_per_day(self):
+        """Count of reservations on each day of the range."""
+        return self.numpy().diff(self.day_offsets)
+
+    def to_schedule_data(self) -> dict:
+        """Returns the same {date: [(name, start, end)]} dict as Model.get_schedule_data."""
+        names = self.names.tolist()
+        starts = self.starts.astype('datetime64[s]').tolist()
+        ends = self.ends.astype('datetime64[s]').tolist()
+        return {
+            self.date_from + dt.timedelta(days=day): list(zip(names[first:last], starts[first:last], ends[first:last]))
+            for day, (first, last) in enumerate(zip(self.day_offsets[:-1].tolist(), self.day_offsets[1:].tolist()))
+        }
@@ -0,0 +1,67 @@
+import csv
+import datetime as dt
+import functools
+import json
+import os.path
+
+
+class ScheduleReader:
+    """Reads schedules back from csv and json files written by Model.export_schedule_data.
+    Yields (name, start, end) for every reservation, with start and end set to None when they can not be parsed."""
+    FILE_FORMATS = ('csv', 'json')
+
+    def read(self, filename: str):
+        """Reads provided file, picking the format from its extension. The file is opened before returning,
+        so a missing or unreadable one raises OSError here rather than while reservations are imported."""
+        file_format = os.path.splitext(filename)[1].lstrip('.').lower()
+        match file_format:
+            case 'csv':
+                return self.read_csv(filename=filename)
+            case 'json':
+                return self.read_json(filename=filename)
+            case _:
+                raise ValueError(f'Unsupported file format: {file_format or filename}!')
+
+    def read_csv(self, filename: str):
+        return self._csv_rows(csv_file=open(filename, newline=''))
+
+    def read_json(self, filename: str):
+        with open(filename) as json_file:
+            return self._json_rows(data=json.load(json_file))
+
+    def _csv_rows(self, csv_file):
+        with csv_file:
+            reader = csv.reader(csv_file, delimiter=',')
+            next(reader, None)
+            for row in reader:
+                try:
+                    name, start, end = row
+                    yield name, self._parse_datetime(start), self._parse_datetime(end)
+                except ValueError:
+                    yield (row[0] if row else ''), None, None
+
+    def _json_rows(self, data: dict):
+        for date_, reservations in data.items():
+            for reservation in reservations:
+                name = reservation.get('name', '')
+                try:
+                    start = self._parse_datetime(f"{date_} {reservation['start_time']}")
+                    end = self._parse_datetime(f"{date_} {reservation['end_time']}")
+                except (KeyError, TypeError, ValueError):
+                    yield name, None, None
+                    continue
+
+                # Only hours are exported, so reservations ending past midnight end on the next day:
+                if end <= start:
+                    end += dt.timedelta(days=1)
+                yield name, start, end
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _parse_datetime(datetime_: str) -> dt.datetime:
+        """Parses exported 'dd.mm.yyyy HH:MM' datetimes, several times faster than strptime.
+        Memoized, since back to back reservations end when the next one starts."""
+        if len(datetime_) != 16 or datetime_[2] != '.' or datetime_[5] != '.' or datetime_[13] != ':':
+            raise ValueError(f'Invalid datetime: {datetime_}')
+
+        return dt.datetime.fromisoformat(f'{datetime_[6:10]}-{datetime_[3:5]}-{datetime_[0:2]}T{datetime_[11:16]}')
@@ -0,0 +1,251 @@
+import sqlite3
+
+
+class Schema:
+    """Versioned database schema. Current version is tracked with PRAGMA user_version,
+    missing migrations are applied in order inside a single write transaction."""
+    VERSION = 8
+
+    def __init__(self, connection: sqlite3.Connection, court_number=1):
+        self.connection = connection
+        # Court of the rows that existed before databases had a court dimension:
+        self.court_number = court_number
+
+    def migrate(self) -> None:
+        """Upgrades database to the current schema version, preserving existing data."""
+        # An up to date file is opened with a single read, without trying any DDL:
+        if self._version() == self.VERSION:
+            return None
+
+        # Write-ahead log lets readers of other connections work during a write, the mode is stored in the file:
+        self.connection.execute('PRAGMA journal_mode = WAL')
+
+        # Version is read again under the write lock, other connections may be upgrading the same file:
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            for target_version in range(self._version() + 1, self.VERSION + 1):
+                migration = getattr(self, f'_migrate_to_{target_version}')
+                for statement in self._statements(migration()):
+                    self.connection.execute(statement)
+                self.connection.execute(f'PRAGMA user_version = {target_version}')
+        except sqlite3.Error:
+            self.connection.rollback()
+            raise
+        self.connection.commit()
+
+    def _version(self) -> int:
+        return self.connection.execute('PRAGMA user_version').fetchone()[0]
+
+    @staticmethod
+    def _statements(script: str):
+        """Yields statements of the script one by one, so they can run in an already open transaction."""
+        statement = ''
+        for part in script.split(';'):
+            statement += part + ';'
+            if sqlite3.complete_statement(statement):
+                yield statement.strip()
+                statement = ''
+
+    @staticmethod
+    def _literal(value) -> str:
+        """Returns SQL literal for provided court number, scripts can not bind parameters."""
+        if isinstance(value, int):
+            return str(value)
+
+        return "'" + str(value).replace("'", "''") + "'"
+
+    def _has_table(self, table: str) -> bool:
+        return self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)
+        ).fetchone() is not None
+
+    def _migrate_to_1(self) -> str:
+        """Integer primary key, epoch-minute columns and indexes for every lookup Model performs.
+        Legacy 'YYYY-MM-DD HH:MM' text rows are converted in place."""
+        script = '''
+            CREATE TABLE reservation(
+                id INTEGER PRIMARY KEY,
+                full_name TEXT NOT NULL,
+                datetime_from INTEGER NOT NULL,
+                datetime_to INTEGER NOT NULL
+            );
+            CREATE INDEX idx_reservation_from ON reservation(datetime_from);
+            CREATE INDEX idx_reservation_to ON reservation(datetime_to);
+            CREATE INDEX idx_reservation_name_from ON reservation(full_name, datetime_from);
+        '''
+        if self._has_table('reservation'):
+            script = f'''
+                ALTER TABLE reservation RENAME TO reservation_legacy;
+                {script}
+                INSERT INTO reservation(full_name, datetime_from, datetime_to)
+                    SELECT full_name,
+                           CAST(strftime('%s', datetime_from) AS INTEGER) / 60,
+                           CAST(strftime('%s', datetime_to) AS INTEGER) / 60
+                    FROM reservation_legacy
+                    ORDER BY rowid;
+                DROP TABLE reservation_legacy;
+            '''
+        return script
+
+    def _migrate_to_2(self) -> str:
+        """Reservation counters per name, week and month, filled from existing reservations."""
+        return '''
+            CREATE TABLE reservation_quota(
+                period TEXT NOT NULL,
+                period_start INTEGER NOT NULL,
+                full_name TEXT NOT NULL,
+                reservation_count INTEGER NOT NULL,
+                PRIMARY KEY (period, period_start, full_name)
+            ) WITHOUT ROWID;
+            INSERT INTO reservation_quota
+                SELECT 'week', (datetime_from / 1440 - (datetime_from / 1440 + 3) % 7) * 1440, full_name, COUNT(*)
+                FROM reservation
+                GROUP BY 2, 3;
+            INSERT INTO reservation_quota
+                SELECT 'month',
+                       CAST(strftime('%s', datetime_from * 60, 'unixepoch', 'start of month') AS INTEGER) / 60,
+                       full_name,
+                       COUNT(*)
+                FROM reservation
+                GROUP BY 2, 3;
+        '''
+
+    def _migrate_to_3(self) -> str:
+        """Court dimension, so one database can hold every court of a club. Existing rows belong to the
+        court of the per-court file they are in."""
+        court = self._literal(self.court_number)
+        return f'''
+            CREATE TABLE court(number INTEGER NOT NULL, PRIMARY KEY (number)) WITHOUT ROWID;
+            INSERT INTO court(number) SELECT {court} WHERE EXISTS (SELECT 1 FROM reservation);
+
+            ALTER TABLE reservation ADD COLUMN court INTEGER NOT NULL DEFAULT {court};
+            DROP INDEX idx_reservation_from;
+            DROP INDEX idx_reservation_to;
+            DROP INDEX idx_reservation_name_from;
+            CREATE INDEX idx_reservation_court_from ON reservation(court, datetime_from);
+            CREATE INDEX idx_reservation_court_to ON reservation(court, datetime_to);
+            CREATE INDEX idx_reservation_court_name_from ON reservation(court, full_name, datetime_from);
+
+            ALTER TABLE reservation_quota RENAME TO reservation_quota_v2;
+            CREATE TABLE reservation_quota(
+                court INTEGER NOT NULL,
+                period TEXT NOT NULL,
+                period_start INTEGER NOT NULL,
+                full_name TEXT NOT NULL,
+                reservation_count INTEGER NOT NULL,
+                PRIMARY KEY (court, period, period_start, full_name)
+            ) WITHOUT ROWID;
+            INSERT INTO reservation_quota
+                SELECT {court}, period, period_start, full_name, reservation_count FROM reservation_quota_v2;
+            DROP TABLE reservation_quota_v2;
+        '''
+
+    def _migrate_to_4(self) -> str:
+        """Bitmap of busy 30 minute slots per court and day, see DayBitmap. Existing reservations are
+        expanded to the slots they overlap, slots shared by two reservations are counted once."""
+        return '''
+            CREATE TABLE reservation_day(
+                court INTEGER NOT NULL,
+                day INTEGER NOT NULL,
+                slots INTEGER NOT NULL,
+                PRIMARY KEY (court, day)
+            ) WITHOUT ROWID;
+            WITH RECURSIVE slot(court, minute, datetime_to) AS (
+                SELECT court, datetime_from / 30 * 30, datetime_to FROM reservation
+                UNION ALL
+                SELECT court, minute + 30, datetime_to FROM slot WHERE minute + 30 < datetime_to
+            )
+            INSERT INTO reservation_day
+                SELECT court, minute / 1440, SUM(DISTINCT 1 << ((minute % 1440) / 30))
+                FROM slot
+                GROUP BY 1, 2;
+        '''
+
+    def _migrate_to_5(self) -> str:
+        """Recurrence rules, stored once per recurring reservation. Each booked occurrence is a regular
+        reservation referencing its rule."""
+        return '''
+            CREATE TABLE recurrence(
+                id INTEGER PRIMARY KEY,
+                court INTEGER NOT NULL,
+                full_name TEXT NOT NULL,
+                rule TEXT NOT NULL,
+                length INTEGER NOT NULL
+            );
+            ALTER TABLE reservation ADD COLUMN recurrence_id INTEGER REFERENCES recurrence(id);
+        '''
+
+    def _migrate_to_6(self) -> str:
+        """Log of created and deleted reservations, and the last change exported to each target, see ChangeLog.
+        Existing reservations are logged as created, so the first delta export of a target holds all of them."""
+        return '''
+            CREATE TABLE reservation_change(
+                seq INTEGER PRIMARY KEY,
+                court INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                full_name TEXT NOT NULL,
+                datetime_from INTEGER NOT NULL,
+                datetime_to INTEGER NOT NULL
+            );
+            CREATE INDEX idx_reservation_change_court_seq ON reservation_change(court, seq);
+            CREATE TABLE export_watermark(
+                court INTEGER NOT NULL,
+                target TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                PRIMARY KEY (court, target)
+            ) WITHOUT ROWID;
+            INSERT INTO reservation_change(court, kind, full_name, datetime_from, datetime_to)
+                SELECT court, 'insert', full_name, datetime_from, datetime_to
+                FROM reservation
+                ORDER BY court, datetime_from;
+        '''
+
+    def _migrate_to_7(self) -> str:
+        """Names stored once in user table, reservations and quota counters reference them by id, see Users.
+        Archived reservations and the change log keep names, they are not looked up by them."""
+        return '''
+            CREATE TABLE user(
+                id INTEGER PRIMARY KEY,
+                full_name TEXT NOT NULL UNIQUE
+            );
+            INSERT INTO user(full_name)
+                SELECT full_name FROM reservation UNION SELECT full_name FROM reservation_quota;
+
+            CREATE TABLE reservation_v7(
+                id INTEGER PRIMARY KEY,
+                court INTEGER NOT NULL,
+                user_id INTEGER NOT NULL REFERENCES user(id),
+                datetime_from INTEGER NOT NULL,
+                datetime_to INTEGER NOT NULL,
+                recurrence_id INTEGER REFERENCES recurrence(id)
+            );
+            INSERT INTO reservation_v7(id, court, user_id, datetime_from, datetime_to, recurrence_id)
+                SELECT reservation.id, court, user.id, datetime_from, datetime_to, recurrence_id
+                FROM reservation JOIN user ON user.full_name = reservation.full_name;
+            DROP TABLE reservation;
+            ALTER TABLE reservation_v7 RENAME TO reservation;
+            CREATE INDEX idx_reservation_court_from ON reservation(court, datetime_from);
+            CREATE INDEX idx_reservation_court_to ON reservation(court, datetime_to);
+            CREATE INDEX idx_reservation_court_user_from ON reservation(court, user_id, datetime_from);
+
+            ALTER TABLE reservation_quota RENAME TO reservation_quota_v6;
+            CREATE TABLE reservation_quota(
+                court INTEGER NOT NULL,
+                period TEXT NOT NULL,
+                period_start INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                reservation_count INTEGER NOT NULL,
+                PRIMARY KEY (court, period, period_start, user_id)
+            ) WITHOUT ROWID;
+            INSERT INTO reservation_quota
+                SELECT court, period, period_start, user.id, reservation_count
+                FROM reservation_quota_v6 JOIN user ON user.full_name = reservation_quota_v6.full_name;
+            DROP TABLE reservation_quota_v6;
+        '''
+
+    def _migrate_to_8(self) -> str:
+        """Index of reservations by user dropped, limits are checked with quota counters and a reservation
+        to cancel is found by its start. Imports no longer update it for every row."""
+        return '''
+            DROP INDEX idx_reservation_court_user_from;
+        '''
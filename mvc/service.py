@@ -0,0 +1,255 @@
+import asyncio
+import concurrent.futures
+import datetime as dt
+import http
+import json
+import sqlite3
+import threading
+import urllib.parse
+
+from mvc.availability import Availability
+from mvc.day_bitmap import DayBitmap
+from mvc.model import Model
+from utils.validator import Validator
+
+
+class Service:
+    """Asynchronous HTTP/JSON front end of Model, so web and kiosk clients can share one process.
+    Blocking SQLite calls run on a bounded thread pool, where every worker thread keeps its own Model
+    per court. Reads run concurrently, writes to the same court are serialized with a lock.
+
+    Routes, court is a court number and datetimes follow dd.mm.yyyy HH:MM pattern:
+        GET    /courts/<court>/availability?datetime=<datetime>
+        GET    /courts/<court>/schedule?from=<dd.mm.yyyy>&to=<dd.mm.yyyy>
+        GET    /courts/<court>/busy-slots?from=<dd.mm.yyyy>&to=<dd.mm.yyyy>
+        POST   /courts/<court>/reservations     {"name": ..., "start": <datetime>, "end": <datetime>}
+        DELETE /courts/<court>/reservations     {"name": ..., "start": <datetime>}
+        POST   /courts/<court>/recurring-reservations   {"name": ..., "start": <datetime>, "length": 90,
+                                                         "rule": "FREQ=WEEKLY;UNTIL=20250630"}
+        POST   /courts/<court>/exports          {"from": ..., "to": ..., "format": "csv", "filename": ...}
+    """
+    DATE_FORMAT = '%d.%m.%Y'
+    DATETIME_FORMAT = '%d.%m.%Y %H:%M'
+    VALIDATOR = Validator()
+    MAX_BODY_SIZE = 64 * 1024
+
+    def __init__(self, database: str = None, host: str = '127.0.0.1', port: int = 8080, workers: int = 4):
+        """Serves per-court tennis_court_<court>.db files, or every court of a shared database if provided."""
+        self.database = database
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='service')
+        self._models = threading.local()
+        self._write_locks = {}
+        self._routes = {
+            ('GET', 'availability'): self._availability,
+            ('GET', 'schedule'): self._schedule,
+            ('GET', 'busy-slots'): self._busy_slots,
+            ('POST', 'reservations'): self._create_reservation,
+            ('DELETE', 'reservations'): self._delete_reservation,
+            ('POST', 'recurring-reservations'): self._create_recurring_reservation,
+            ('POST', 'exports'): self._export,
+        }
+
+    async def start(self) -> asyncio.Server:
+        """Starts listening, returns the server so caller can learn its address and close it."""
+        return await asyncio.start_server(self._handle_connection, host=self.host, port=self.port)
+
+    async def serve(self) -> None:
+        """Serves requests until cancelled."""
+        server = await self.start()
+        async with server:
+            await server.serve_forever()
+
+    def close(self) -> None:
+        """Waits for running database calls, then closes connections of every worker thread."""
+        barrier = threading.Barrier(self.workers)
+        for _ in range(self.workers):
+            self.executor.submit(self._close_models, barrier)
+        self.executor.shutdown(wait=True)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answers requests of one keep-alive connection, until client closes it."""
+        try:
+            while request_line := await reader.readline():
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length', 0))
+                if length > self.MAX_BODY_SIZE:
+                    status, payload = http.HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': 'Request body too large!'}
+                else:
+                    status, payload = await self._dispatch(method, target, await reader.readexactly(length))
+
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                body = json.dumps(payload).encode()
+                writer.write(
+                    f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+                    f'Content-Type: application/json\r\n'
+                    f'Content-Length: {len(body)}\r\n'
+                    f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'.encode('latin-1') + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, target: str, body: bytes) -> tuple:
+        """Routes request to its handler, returns (status, payload)."""
+        url = urllib.parse.urlsplit(target)
+        parts = url.path.strip('/').split('/')
+        # Court numbers name database files, so only plain ones are accepted:
+        if len(parts) != 3 or parts[0] != 'courts' or not parts[1].isalnum() or (method, parts[2]) not in self._routes:
+            return http.HTTPStatus.NOT_FOUND, {'error': 'Unknown route!'}
+
+        try:
+            query = dict(urllib.parse.parse_qsl(url.query))
+            data = json.loads(body) if body else {}
+            return await self._routes[method, parts[2]](court=parts[1], query=query, data=data)
+        except (KeyError, TypeError, ValueError, AttributeError) as error:
+            return http.HTTPStatus.BAD_REQUEST, {'error': f'Invalid request: {error}'}
+        except sqlite3.OperationalError as error:
+            return http.HTTPStatus.SERVICE_UNAVAILABLE, {'error': f'Database unavailable: {error}'}
+
+    # Handlers:
+    async def _availability(self, court: str, query: dict, data: dict) -> tuple:
+        datetime_ = dt.datetime.strptime(query['datetime'], self.DATETIME_FORMAT)
+        lengths = await self._read(court, lambda model: model.check_possible_reservations(datetime_=datetime_))
+        return http.HTTPStatus.OK, {'court': court, 'datetime': query['datetime'], 'lengths': lengths}
+
+    async def _schedule(self, court: str, query: dict, data: dict) -> tuple:
+        date_from = dt.datetime.strptime(query['from'], self.DATE_FORMAT).date()
+        date_to = dt.datetime.strptime(query['to'], self.DATE_FORMAT).date()
+        if not self.VALIDATOR.validate_date_range(date_from=date_from, date_to=date_to):
+            return http.HTTPStatus.BAD_REQUEST, {'error': 'Incorrect date range!'}
+
+        schedule = await self._read(court, lambda model: model.get_schedule_data(date_from=date_from, date_to=date_to))
+        return http.HTTPStatus.OK, {
+            date_.strftime(self.DATE_FORMAT): [
+                {'name': name, 'start': start.strftime(self.DATETIME_FORMAT), 'end': end.strftime(self.DATETIME_FORMAT)}
+                for name, start, end in reservations
+            ]
+            for date_, reservations in schedule.items()
+        }
+
+    async def _busy_slots(self, court: str, query: dict, data: dict) -> tuple:
+        """Compact free/busy data: a string of 48 half-hour slots per day, '1' marks a busy slot."""
+        date_from = dt.datetime.strptime(query['from'], self.DATE_FORMAT).date()
+        date_to = dt.datetime.strptime(query['to'], self.DATE_FORMAT).date()
+        if not self.VALIDATOR.validate_date_range(date_from=date_from, date_to=date_to):
+            return http.HTTPStatus.BAD_REQUEST, {'error': 'Incorrect date range!'}
+
+        busy_slots = await self._read(court, lambda model: model.get_busy_slots(date_from=date_from, date_to=date_to))
+        full_day = (1 << DayBitmap.SLOTS_PER_DAY) - 1
+        return http.HTTPStatus.OK, {
+            date_.strftime(self.DATE_FORMAT): {
+                'slots': f'{mask:0{DayBitmap.SLOTS_PER_DAY}b}'[::-1],
+                'longest_free_minutes': DayBitmap.longest_run(~mask & full_day) * DayBitmap.SLOT_MINUTES
+            }
+            for date_, mask in busy_slots.items()
+        }
+
+    async def _create_reservation(self, court: str, query: dict, data: dict) -> tuple:
+        name = data['name'].strip()
+        res_start = dt.datetime.strptime(data['start'], self.DATETIME_FORMAT)
+        res_end = dt.datetime.strptime(data['end'], self.DATETIME_FORMAT)
+        if not name or res_end <= res_start:
+            return http.HTTPStatus.BAD_REQUEST, {'error': 'Name is empty or reservation ends before it starts!'}
+        if not self.VALIDATOR.validate_one_hour_limit(datetime_=res_start):
+            return http.HTTPStatus.BAD_REQUEST, {'error': 'Can not make a reservation less than 1h before!'}
+        length = int((res_end - res_start).total_seconds()) // 60
+        if length % Availability.SLOT_MINUTES or length > Availability.MAX_RESERVATION_MINUTES:
+            return http.HTTPStatus.BAD_REQUEST, {'error': 'Reservation can last 30, 60 or 90 minutes!'}
+
+        error, message = await self._write(
+            court, lambda model: model.book_reservation(name=name, res_start=res_start, res_end=res_end)
+        )
+        if error:
+            return http.HTTPStatus.CONFLICT, {'error': message}
+
+        return http.HTTPStatus.CREATED, {'message': message}
+
+    async def _create_recurring_reservation(self, court: str, query: dict, data: dict) -> tuple:
+        name, length, rule = data['name'].strip(), int(data['length']), data['rule']
+        res_start = dt.datetime.strptime(data['start'], self.DATETIME_FORMAT)
+        if not name:
+            return http.HTTPStatus.BAD_REQUEST, {'error': 'Name is empty!'}
+        if not self.VALIDATOR.validate_one_hour_limit(datetime_=res_start):
+            return http.HTTPStatus.BAD_REQUEST, {'error': 'Can not make a reservation less than 1h before!'}
+        if length <= 0 or length % Availability.SLOT_MINUTES or length > Availability.MAX_RESERVATION_MINUTES:
+            return http.HTTPStatus.BAD_REQUEST, {'error': 'Reservation can last 30, 60 or 90 minutes!'}
+
+        error, message, rejected = await self._write(court, lambda model: model.create_recurring_reservation(
+            name=name, res_start=res_start, length=length, rule=rule
+        ))
+        payload = {
+            'error' if error else 'message': message,
+            'rejected': [
+                {'start': start.strftime(self.DATETIME_FORMAT), 'reason': reason} for start, reason in rejected
+            ]
+        }
+        return (http.HTTPStatus.CONFLICT if error else http.HTTPStatus.CREATED), payload
+
+    async def _delete_reservation(self, court: str, query: dict, data: dict) -> tuple:
+        name = data['name']
+        res_start = dt.datetime.strptime(data['start'], self.DATETIME_FORMAT)
+        if not self.VALIDATOR.validate_one_hour_limit(datetime_=res_start):
+            return http.HTTPStatus.BAD_REQUEST, {'error': 'Can not cancel a reservation less than 1h before!'}
+
+        error, message = await self._write(
+            court, lambda model: model.delete_reservation(name=name, datetime_=res_start)
+        )
+        if error:
+            return http.HTTPStatus.NOT_FOUND, {'error': message}
+
+        return http.HTTPStatus.OK, {'message': message}
+
+    async def _export(self, court: str, query: dict, data: dict) -> tuple:
+        date_from = dt.datetime.strptime(data['from'], self.DATE_FORMAT).date()
+        date_to = dt.datetime.strptime(data['to'], self.DATE_FORMAT).date()
+        file_format, filename = data['format'], data['filename']
+        if not self.VALIDATOR.validate_date_range(date_from=date_from, date_to=date_to):
+            return http.HTTPStatus.BAD_REQUEST, {'error': 'Incorrect date range!'}
+        if file_format not in ('csv', 'json', 'bin') or not self.VALIDATOR.validate_filename(filename=filename):
+            return http.HTTPStatus.BAD_REQUEST, {'error': 'Unknown file format or restricted characters in filename!'}
+
+        _, message = await self._read(court, lambda model: model.export_schedule_data(
+            date_from=date_from, date_to=date_to, file_format=file_format, filename=filename
+        ))
+        return http.HTTPStatus.CREATED, {'message': message}
+
+    # Database calls:
+    async def _read(self, court: str, call):
+        """Runs call(model) on the thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self._call, court, call)
+
+    async def _write(self, court: str, call):
+        """Runs call(model) on the thread pool, one write per court at a time."""
+        lock = self._write_locks.setdefault(court, asyncio.Lock())
+        async with lock:
+            return await self._read(court, call)
+
+    def _close_models(self, barrier: threading.Barrier) -> None:
+        """Closes Models of the calling worker thread. Waiting on the barrier keeps the worker busy,
+        so each of the close calls runs in another thread."""
+        for model in getattr(self._models, 'by_court', {}).values():
+            model.connection.close()
+        self._models.by_court = {}
+        barrier.wait()
+
+    def _call(self, court: str, call):
+        """Runs in a worker thread, with Model of provided court owned by that thread."""
+        if not hasattr(self._models, 'by_court'):
+            self._models.by_court = {}
+        models = self._models.by_court
+        if court not in models:
+            models[court] = Model(court_number=court, database=self.database)
+
+        return call(models[court])
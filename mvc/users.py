@@ -0,0 +1,50 @@
+import collections
+import sqlite3
+from typing import Optional
+
+from mvc.queries import Queries
+
+
+class Users:
+    """Names of people making reservations, stored once in user table and referenced by id from reservations
+    and quota counters. Ids of the last CACHE_SIZE names used are kept in memory, so a name is looked up
+    once per session. Ids of rolled back users may be given to other names, callers clear the cache after
+    every rollback."""
+    CACHE_SIZE = 1024
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+        self._ids = collections.OrderedDict()
+
+    def find(self, name: str) -> Optional[int]:
+        """Returns id of provided name, or None if it has never made a reservation."""
+        user = self._ids.get(name)
+        if user is not None:
+            self._ids.move_to_end(name)
+            return user
+
+        row = self.connection.execute(Queries.SELECT_USER_ID, {'name': name}).fetchone()
+        if row is None:
+            return None
+        return self._remember(name=name, user=row[0])
+
+    def get_or_create(self, name: str) -> int:
+        """Returns id of provided name, adding it in the current transaction if needed. Another connection may
+        add the same name after it was looked up, so the insert is skipped on conflict and the id read back."""
+        user = self.find(name=name)
+        if user is not None:
+            return user
+
+        self.connection.execute(Queries.INSERT_USER, {'name': name})
+        return self._remember(
+            name=name, user=self.connection.execute(Queries.SELECT_USER_ID, {'name': name}).fetchone()[0]
+        )
+
+    def clear(self) -> None:
+        self._ids.clear()
+
+    def _remember(self, name: str, user: int) -> int:
+        self._ids[name] = user
+        if len(self._ids) > self.CACHE_SIZE:
+            self._ids.popitem(last=False)
+        return user
@@ -46,6 +46,16 @@ class View:
         for pos, choice in enumerate(choices):
             print(f'{self.tab}{pos + 1}. {choice}')
 
+    def print_rejected_rows(self, rejected: list) -> None:
+        """Prints rows rejected by an import, with the reason."""
+        for position, reason in rejected:
+            self.print_error(error_message=f'Row {position}: {reason}')
+
+    def print_rejected_occurrences(self, rejected: list) -> None:
+        """Prints occurrences of a recurring reservation which could not be booked, with the reason."""
+        for start, reason in rejected:
+            self.print_error(error_message=f'{start.strftime(self.DATETIME_FORMAT)}: {reason}')
+
     def print_schedule(self, schedule_data: dict) -> None:
         """Prints schedule."""
         for day, reservations in schedule_data.items():
@@ -59,6 +69,22 @@ class View:
                 print(self.tab * 2 + 'No reservations.')
             print('')
 
+    def print_statistics(self, snapshot: dict, statements=10) -> None:
+        """Prints latencies of methods and the statements which did most work, full scans in red."""
+        print(f'{self.tab}{"method":32} {"calls":>7} {"p50 us":>8} {"p99 us":>8} {"max us":>8}')
+        for name, summary in snapshot['methods'].items():
+            if summary['calls']:
+                print(f"{self.tab}{name:32} {summary['calls']:7} {summary['p50_us']:8}"
+                      f" {summary['p99_us']:8} {summary['max_us']:8}")
+        print('')
+        for summary in snapshot['statements'][:statements]:
+            print(f"{self.tab}{summary['executions']} executions, {summary['steps']} steps: {summary['sql']}")
+            for detail in summary['plan'] or ():
+                print(f'{self.tab * 2}{detail}')
+        print('')
+        for sql in snapshot['full_scans']:
+            self.print_error(error_message=f'Full scan: {sql}')
+
     def print_success(self, success_message: str) -> None:
         """Prints provided success message with some styling."""
         success_message = self.tab + success_message
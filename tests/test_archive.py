@@ -0,0 +1,171 @@
+import os
+import datetime as dt
+from unittest import TestCase
+
+from mvc.club import Club
+from mvc.model import Model
+from mvc.queries import Queries
+from utils.epoch import EpochMinutes
+
+
+class TestArchive(TestCase):
+    def setUp(self) -> None:
+        self.model = Model(court_number='TEST')
+        self.old_start = dt.datetime(2024, 1, 1, 10, 0)
+        self.new_start = dt.datetime(2024, 3, 1, 10, 0)
+        for res_start in (self.old_start, self.new_start):
+            self.model.create_reservation(
+                name='John Doe', res_start=res_start, res_end=res_start + dt.timedelta(hours=1)
+            )
+
+    def tearDown(self) -> None:
+        self.model.connection.close()
+        for filename in ('tennis_court_TEST.db', 'tennis_court_TEST_archive.db'):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def _live_count(self) -> int:
+        return self.model.cursor.execute('SELECT COUNT(*) FROM main.reservation').fetchone()[0]
+
+    def test_archive_reservations(self):
+        """Tests if reservations before the cutoff are moved out of the live table."""
+        error, message = self.model.archive_reservations(before=dt.date(2024, 2, 1))
+
+        self.assertEqual((error, message), (Model.OK, 'Archived 1 reservations.'))
+        self.assertEqual(self._live_count(), 1)
+        self.assertTrue(os.path.exists('tennis_court_TEST_archive.db'))
+
+    def test_nothing_to_archive(self):
+        """Tests if the archive file is not created when no reservation is old enough."""
+        error, message = self.model.archive_reservations(before=dt.date(2023, 1, 1))
+
+        self.assertEqual((error, message), (Model.OK, 'Nothing to archive.'))
+        self.assertFalse(os.path.exists('tennis_court_TEST_archive.db'))
+
+    def test_archive_future_FAIL(self):
+        """Tests if reservations can not be archived before they took place."""
+        error, _ = self.model.archive_reservations(before=dt.date.today() + dt.timedelta(days=1))
+
+        self.assertEqual(error, Model.ERROR)
+        self.assertEqual(self._live_count(), 2)
+
+    def test_schedule_includes_archive(self):
+        """Tests if schedule over an archived range reads both the archive and the live table."""
+        self.model.archive_reservations(before=dt.date(2024, 2, 1))
+
+        schedule = self.model.get_schedule_data(date_from=dt.date(2024, 1, 1), date_to=dt.date(2024, 3, 1))
+
+        self.assertEqual(
+            [start for reservations in schedule.values() for _, start, _ in reservations],
+            [self.old_start, self.new_start]
+        )
+
+    def test_schedule_after_interrupted_move(self):
+        """Tests if a reservation copied to the archive, but not yet deleted from the live table, is read once."""
+        self.model.archive_reservations(before=dt.date(2024, 2, 1))
+        self.model.cursor.execute(Queries.INSERT_RESERVATION, {
+            'court': 'TEST',
+            'user': self.model.users.get_or_create(name='John Doe'),
+            'start': EpochMinutes.from_datetime(self.old_start),
+            'end': EpochMinutes.from_datetime(self.old_start) + 60
+        })
+        self.model.connection.commit()
+
+        schedule = self.model.get_schedule_data(date_from=dt.date(2024, 1, 1), date_to=dt.date(2024, 1, 1))
+
+        self.assertEqual(len(schedule[dt.date(2024, 1, 1)]), 1)
+
+    def test_import_archived_date_FAIL(self):
+        """Tests if reservations can not be imported into an archived range."""
+        self.model.archive_reservations(before=dt.date(2024, 2, 1))
+        res_start = dt.datetime(2024, 1, 2, 10, 0)
+
+        _, _, rejected = self.model.import_reservations(
+            reservations=[('Jane Doe', res_start, res_start + dt.timedelta(hours=1))]
+        )
+
+        self.assertEqual(rejected, [(1, 'Date is archived.')])
+
+    def test_book_archived_date_FAIL(self):
+        """Tests if a single reservation can not be booked or created in an archived range, grouped or not."""
+        self.model.archive_reservations(before=dt.date(2024, 2, 1))
+        self.model.connection.close()
+        self.model = Model(court_number='TEST')
+        res_end = self.old_start + dt.timedelta(hours=1)
+
+        booked = self.model.book_reservation(name='Jane Doe', res_start=self.old_start, res_end=res_end)
+        created = self.model.create_reservation(name='Jane Doe', res_start=self.old_start, res_end=res_end)
+        with self.model.transaction():
+            grouped = self.model.book_reservation(name='Jane Doe', res_start=self.old_start, res_end=res_end)
+
+        self.assertEqual([booked, created, grouped], [(Model.ERROR, 'Date is archived.')] * 3)
+        self.assertEqual(self._live_count(), 1)
+
+    def test_reopened_model_reads_archive(self):
+        """Tests if the archive is attached by a Model opened later."""
+        self.model.archive_reservations(before=dt.date(2024, 2, 1))
+        self.model.connection.close()
+        self.model = Model(court_number='TEST')
+
+        schedule = self.model.get_schedule_data(date_from=dt.date(2024, 1, 1), date_to=dt.date(2024, 1, 1))
+
+        self.assertEqual(len(schedule[dt.date(2024, 1, 1)]), 1)
+        self.assertEqual(self.model.compact(), (Model.OK, 'Compacted tennis_court_TEST.db.'))
+
+
+class TestClubArchive(TestCase):
+    def setUp(self) -> None:
+        self.club = Club(database='tennis_club_TEST.db')
+        self.court_1 = self.club.court(court_number=1)
+        self.court_2 = self.club.court(court_number=2)
+
+    def tearDown(self) -> None:
+        self.court_1.connection.close()
+        self.court_2.connection.close()
+        self.club.pool.close()
+        for filename in ('tennis_club_TEST.db', 'tennis_club_TEST_archive.db'):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_get_schedule_data(self):
+        """Tests if club schedule reads archived reservations of one court and live ones of the other."""
+        res_start = dt.datetime(2024, 1, 1, 10, 0)
+        res_end = res_start + dt.timedelta(hours=1)
+        self.court_1.create_reservation(name='John Doe', res_start=res_start, res_end=res_end)
+        self.court_2.create_reservation(name='Jane Doe', res_start=res_start, res_end=res_end)
+        self.court_1.archive_reservations(before=dt.date(2024, 2, 1))
+
+        schedule = self.club.get_schedule_data(date_from=dt.date(2024, 1, 1), date_to=dt.date(2024, 1, 1))
+
+        self.assertEqual(schedule, {
+            1: {dt.date(2024, 1, 1): [('John Doe', res_start, res_end)]},
+            2: {dt.date(2024, 1, 1): [('Jane Doe', res_start, res_end)]},
+        })
+
+    def test_import_archived_court_file(self):
+        """Tests if reservations archived in a per-court file are imported with it, and read through the cutoff."""
+        for filename in ('tennis_court_TEST.db', 'tennis_court_TEST_archive.db'):
+            self.addCleanup(lambda f=filename: os.path.exists(f) and os.remove(f))
+        court_file = Model(court_number='TEST')
+        old_start, new_start = dt.datetime(2020, 1, 1, 10, 0), dt.datetime(2024, 3, 1, 10, 0)
+        for res_start in (old_start, new_start):
+            court_file.create_reservation(
+                name='John Doe', res_start=res_start, res_end=res_start + dt.timedelta(hours=1)
+            )
+        court_file.archive_reservations(before=dt.date(2021, 1, 1))
+        court_file.connection.close()
+
+        error, message = self.club.import_court_file(court_number=5, filename='tennis_court_TEST.db')
+        schedule = self.club.get_schedule_data(date_from=dt.date(2020, 1, 1), date_to=dt.date(2024, 3, 1))
+
+        self.assertEqual((error, message), (Club.OK, 'Imported 1 reservations of court 5, and 1 archived ones.'))
+        self.assertEqual(
+            [start for reservations in schedule[5].values() for _, start, _ in reservations], [old_start, new_start]
+        )
+        court_5 = self.club.court(court_number=5)
+        self.assertEqual(court_5.archive.cutoff(), EpochMinutes.from_date(dt.date(2021, 1, 1)))
+        self.assertEqual(
+            court_5.book_reservation(name='Jane Doe', res_start=old_start, res_end=old_start + dt.timedelta(hours=1)),
+            (Model.ERROR, 'Date is archived.')
+        )
+        court_5.connection.close()
@@ -0,0 +1,82 @@
+import io
+import json
+import os
+from unittest import TestCase, mock
+
+from mvc.batch import BatchRunner
+from mvc.model import Model
+
+
+class TestBatchRunner(TestCase):
+    def setUp(self) -> None:
+        self.output = io.StringIO()
+        self.runner = BatchRunner(court_number='TEST', output=self.output)
+
+    def tearDown(self) -> None:
+        if os.path.exists('tennis_court_TEST.db'):
+            os.remove('tennis_court_TEST.db')
+
+    def _run(self, *operations) -> list:
+        self.summary = self.runner.run(
+            lines=[operation if isinstance(operation, str) else json.dumps(operation) for operation in operations]
+        )
+        return [json.loads(line) for line in self.output.getvalue().splitlines()]
+
+    def test_operations_OK(self):
+        """Tests if every kind of operation runs, with results in the order of operations."""
+        results = self._run(
+            {'op': 'create', 'id': 'a', 'name': 'John Doe', 'start': '01.06.2030 10:00', 'end': '01.06.2030 11:00'},
+            {'op': 'availability', 'datetime': '01.06.2030 11:00'},
+            {'op': 'schedule', 'from': '01.06.2030', 'to': '01.06.2030'},
+            {'op': 'delete', 'name': 'John Doe', 'start': '01.06.2030 10:00'},
+            {'op': 'availability', 'datetime': '01.06.2030 10:00'},
+        )
+
+        self.assertEqual([result['status'] for result in results], ['ok'] * 5)
+        self.assertEqual(results[0]['id'], 'a')
+        self.assertEqual(results[1]['lengths'], [30, 60, 90])
+        self.assertEqual(results[2]['schedule'], {
+            '01.06.2030': [{'name': 'John Doe', 'start': '01.06.2030 10:00', 'end': '01.06.2030 11:00'}]
+        })
+        self.assertEqual(results[4]['lengths'], [30, 60, 90])
+        self.assertEqual((self.summary['operations'], self.summary['errors']), (5, 0))
+
+    def test_writes_checked_within_group(self):
+        """Tests if grouped writes see each other, so collisions and quota limits still apply."""
+        results = self._run(*(
+            {'op': 'create', 'name': 'John Doe', 'start': f'0{day}.06.2030 10:00', 'end': f'0{day}.06.2030 11:00'}
+            for day in (3, 4, 5, 6)
+        ), {'op': 'create', 'name': 'Jane Doe', 'start': '03.06.2030 10:30', 'end': '03.06.2030 11:30'})
+
+        self.assertEqual([result['status'] for result in results], ['ok', 'ok', 'ok', 'error', 'error'])
+        self.assertEqual(results[3]['error'], 'You have already reached the reservation limit for this period!')
+        self.assertEqual(results[4]['error'], 'Selected time is no longer available!')
+
+    def test_writes_grouped_into_transactions(self):
+        """Tests if consecutive writes are committed together, a read ending the group."""
+        creates = [
+            {'op': 'create', 'name': f'Player {day}', 'start': f'0{day}.06.2030 10:00', 'end': f'0{day}.06.2030 10:30'}
+            for day in (1, 2, 3)
+        ]
+        read = {'op': 'availability', 'datetime': '01.06.2030 12:00'}
+        with mock.patch.object(Model, 'transaction', autospec=True, side_effect=Model.transaction) as transaction:
+            results = self._run(creates[0], creates[1], read, creates[2])
+
+        self.assertEqual([result['status'] for result in results], ['ok'] * 4)
+        self.assertEqual(transaction.call_count, 2)
+
+    def test_invalid_lines(self):
+        """Tests if invalid lines are reported and do not stop the run."""
+        results = self._run(
+            'not json',
+            {'op': 'drop'},
+            {'op': 'create', 'court': '../other', 'name': 'John Doe'},
+            {'op': 'create', 'name': 'John Doe', 'start': '01.06.2030', 'end': '01.06.2030 11:00'},
+            {'op': 'create', 'name': 'John Doe', 'start': '01.06.2030 10:00', 'end': '01.06.2030 12:00'},
+            {'op': 'availability', 'datetime': '01.06.2030 10:00'},
+        )
+
+        self.assertEqual([result['status'] for result in results], ['error'] * 5 + ['ok'])
+        self.assertEqual([result['line'] for result in results], [1, 2, 3, 4, 5, 6])
+        self.assertFalse(os.path.exists('tennis_court_../other.db'))
+        self.assertEqual(self.summary['errors'], 5)
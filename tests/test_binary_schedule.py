@@ -0,0 +1,52 @@
+import os
+import datetime as dt
+import tempfile
+from unittest import TestCase
+
+from mvc.binary_schedule import BinaryScheduleReader, BinaryScheduleWriter
+
+
+class TestBinarySchedule(TestCase):
+    """Tests binary schedule round trip."""
+    schedule = {
+        dt.date(2025, 1, 1): [
+            ('John Doe', dt.datetime(2025, 1, 1, 9, 0), dt.datetime(2025, 1, 1, 10, 30)),
+            ('Zoë Doe', dt.datetime(2025, 1, 1, 11, 0), dt.datetime(2025, 1, 1, 11, 30)),
+        ],
+        dt.date(2025, 1, 2): [],
+        dt.date(2025, 1, 3): [
+            ('John Doe', dt.datetime(2025, 1, 3, 23, 30), dt.datetime(2025, 1, 4, 0, 30)),
+        ],
+    }
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        filename = os.path.join(self.directory.name, 'schedule')
+        BinaryScheduleWriter().write(days=self.schedule.items(), filename=filename)
+        self.reader = BinaryScheduleReader(f'{filename}.bin')
+
+    def tearDown(self) -> None:
+        self.reader.close()
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        """Tests if schedule read back equals the written one, with names stored once."""
+        self.assertEqual(self.reader.get_schedule_data(dt.date(2024, 12, 1), dt.date(2025, 2, 1)), self.schedule)
+        self.assertEqual(self.reader.names, ['John Doe', 'Zoë Doe'])
+        self.assertEqual(len(self.reader), 3)
+
+    def test_reservations_between(self):
+        """Tests if reservations are found by their start."""
+        reservations = self.reader.reservations_between(dt.datetime(2025, 1, 1, 10, 0), dt.datetime(2025, 1, 4))
+        self.assertEqual([start for _, start, _ in reservations], [
+            dt.datetime(2025, 1, 1, 11, 0), dt.datetime(2025, 1, 3, 23, 30)
+        ])
+
+    def test_invalid_file(self):
+        """Tests if files in other formats are rejected."""
+        filename = os.path.join(self.directory.name, 'schedule.json')
+        with open(filename, 'w') as json_file:
+            json_file.write('{"01.01.2025": []}')
+
+        with self.assertRaises(ValueError):
+            BinaryScheduleReader(filename)
@@ -0,0 +1,92 @@
+import os
+import datetime as dt
+from unittest import TestCase
+
+from mvc.club import Club
+from mvc.model import Model
+from utils.epoch import EpochMinutes
+
+
+class TestClub(TestCase):
+    def setUp(self) -> None:
+        self.club = Club(database='tennis_club_TEST.db')
+        self.court_1 = self.club.court(court_number=1)
+        self.court_2 = self.club.court(court_number=2)
+
+    def tearDown(self) -> None:
+        self.court_1.connection.close()
+        self.court_2.connection.close()
+        self.club.pool.close()
+        os.remove('tennis_club_TEST.db')
+        if os.path.exists('tennis_court_TEST.db'):
+            os.remove('tennis_court_TEST.db')
+
+    def test_courts_separated(self):
+        """Tests if reservations of one court do not affect the other one."""
+        res_start = dt.datetime(2025, 1, 1, 19, 0)
+        self.court_1.create_reservation(name='John Doe', res_start=res_start, res_end=dt.datetime(2025, 1, 1, 20, 30))
+
+        self.assertEqual(self.court_1.check_possible_reservations(datetime_=res_start), [])
+        self.assertEqual(self.court_2.check_possible_reservations(datetime_=res_start), [30, 60, 90])
+        self.assertEqual(self.club.courts(), [1, 2])
+
+    def test_find_any_free_court(self):
+        """Tests if the first court free for the whole duration is found."""
+        self.court_1.create_reservation(
+            name='John Doe', res_start=dt.datetime(2025, 1, 1, 18, 0), res_end=dt.datetime(2025, 1, 1, 19, 30)
+        )
+        self.court_2.create_reservation(
+            name='Jane Doe', res_start=dt.datetime(2025, 1, 1, 19, 0), res_end=dt.datetime(2025, 1, 1, 20, 0)
+        )
+
+        self.assertEqual(self.club.find_any_free_court(datetime_=dt.datetime(2025, 1, 1, 18, 0), duration=60), 2)
+        self.assertEqual(self.club.find_any_free_court(datetime_=dt.datetime(2025, 1, 1, 18, 30), duration=60), None)
+        self.assertEqual(self.club.find_any_free_court(datetime_=dt.datetime(2025, 1, 1, 19, 30), duration=30), 1)
+
+    def test_get_schedule_data(self):
+        """Tests if schedule of every court is returned."""
+        res_start = dt.datetime(2025, 1, 2, 9, 0)
+        res_end = dt.datetime(2025, 1, 2, 10, 0)
+        self.court_2.create_reservation(name='Jane Doe', res_start=res_start, res_end=res_end)
+
+        schedule = self.club.get_schedule_data(date_from=dt.date(2025, 1, 1), date_to=dt.date(2025, 1, 2))
+
+        self.assertEqual(schedule, {
+            1: {dt.date(2025, 1, 1): [], dt.date(2025, 1, 2): []},
+            2: {dt.date(2025, 1, 1): [], dt.date(2025, 1, 2): [('Jane Doe', res_start, res_end)]},
+        })
+
+    def test_imported_changes_logged_per_court(self):
+        """Tests if reservations imported into one court are logged only for it, after those made before."""
+        res_start = dt.datetime(2025, 1, 1, 9, 0)
+        self.court_1.create_reservation(name='John Doe', res_start=res_start, res_end=dt.datetime(2025, 1, 1, 10, 0))
+        self.court_2.create_reservation(name='Jane Doe', res_start=res_start, res_end=dt.datetime(2025, 1, 1, 10, 0))
+
+        self.court_1.import_reservations(reservations=[
+            ('Jane Doe', dt.datetime(2025, 1, 2, 9, 0), dt.datetime(2025, 1, 2, 10, 0)),
+            ('Jim Doe', dt.datetime(2025, 1, 3, 9, 0), dt.datetime(2025, 1, 3, 10, 0)),
+        ])
+
+        changes = self.court_1.change_log.changes_between(after=0, until=self.court_1.change_log.last_change())
+        self.assertEqual([(kind, name) for kind, name, _, _ in changes], [
+            ('insert', 'John Doe'), ('insert', 'Jane Doe'), ('insert', 'Jim Doe')
+        ])
+        changes = self.court_2.change_log.changes_between(after=0, until=self.court_2.change_log.last_change())
+        self.assertEqual([(kind, name) for kind, name, _, _ in changes], [('insert', 'Jane Doe')])
+
+    def test_import_court_file(self):
+        """Tests if reservations kept in a per-court file are copied into the club database."""
+        court_file = Model(court_number='TEST')
+        res_start = dt.datetime(2025, 1, 1, 19, 0)
+        court_file.create_reservation(name='John Doe', res_start=res_start, res_end=dt.datetime(2025, 1, 1, 20, 30))
+        court_file.connection.close()
+
+        error, _ = self.club.import_court_file(court_number=3, filename='tennis_court_TEST.db')
+        court_3 = self.club.court(court_number=3)
+
+        self.assertEqual(error, Club.OK)
+        self.assertEqual(court_3.check_possible_reservations(datetime_=res_start), [])
+        minute = EpochMinutes.from_datetime(res_start)
+        self.assertEqual(court_3.quota.count(user=court_3.users.find(name='John Doe'), period='week', minute=minute), 1)
+        self.assertEqual(self.club.import_court_file(court_number=3, filename='tennis_court_TEST.db')[0], Club.ERROR)
+        court_3.connection.close()
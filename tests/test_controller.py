@@ -0,0 +1,56 @@
+import contextlib
+import io
+import os
+import sys
+from unittest import TestCase, mock
+
+from mvc.controller import Controller
+from mvc.model import Model
+from mvc.view import View
+
+
+class TestController(TestCase):
+    def setUp(self) -> None:
+        self.model = Model(court_number='TEST')
+        self.view = View()
+        self.controller = Controller(model=self.model, view=self.view)
+
+    def tearDown(self) -> None:
+        self.model.connection.close()
+        if os.path.exists('tennis_court_TEST.db'):
+            os.remove('tennis_court_TEST.db')
+
+    def _start(self, answers: list) -> list:
+        """Runs the REPL with provided answers, returns stack depths seen by every prompt."""
+        answers = iter(answers)
+        depths = []
+
+        def scripted_input(prompt: str = '') -> str:
+            depth, frame = 0, sys._getframe()
+            while frame is not None:
+                depth, frame = depth + 1, frame.f_back
+            depths.append(depth)
+            return next(answers)
+
+        with mock.patch('builtins.input', scripted_input), mock.patch.object(View, 'clear_screen'), \
+                contextlib.redirect_stdout(io.StringIO()):
+            self.controller.start()
+        return depths
+
+    def test_long_session_stack_flat(self):
+        """Tests if finishing operations does not deepen the stack, more of them than the recursion limit allows."""
+        operations = sys.getrecursionlimit()
+        # Looks up an empty day and continues, then exits from the Main Menu:
+        answers = ['4', '01.01.2030', '01.01.2030', '1', '1', '1'] * operations + ['6', '1']
+
+        depths = self._start(answers=answers)
+
+        self.assertEqual(len(depths), len(answers))
+        self.assertEqual(len(set(depths[::6])), 1)
+
+    def test_exit_declined(self):
+        """Tests if declining the exit returns to the Main Menu, and confirming it ends the session."""
+        depths = self._start(answers=['6', '2', '6', '1'])
+
+        self.assertEqual(len(depths), 4)
+        self.assertEqual(depths[0], depths[2])
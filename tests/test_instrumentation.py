@@ -0,0 +1,91 @@
+import json
+import os
+import tempfile
+import datetime as dt
+from unittest import TestCase
+from mvc.instrumentation import Instrumentation, LatencyHistogram
+from mvc.model import Model
+
+
+class TestInstrumentation(TestCase):
+    def setUp(self) -> None:
+        self.instrumentation = Instrumentation()
+        self.model = Model(court_number='TEST', instrumentation=self.instrumentation)
+
+    def tearDown(self) -> None:
+        self.model.connection.close()
+        os.remove('tennis_court_TEST.db')
+
+    def test_method_latencies(self):
+        """Tests if calls of public methods are counted."""
+        res_start = dt.datetime(2025, 1, 1, 15, 0)
+        for _ in range(3):
+            self.model.check_possible_reservations(datetime_=res_start)
+        self.model.create_reservation(name='John Doe', res_start=res_start, res_end=res_start + dt.timedelta(hours=1))
+
+        methods = self.instrumentation.snapshot()['methods']
+        self.assertEqual(methods['check_possible_reservations']['calls'], 3)
+        self.assertEqual(methods['create_reservation']['calls'], 1)
+        self.assertEqual(sum(methods['create_reservation']['histogram'].values()), 1)
+
+    def test_statements_grouped_with_plan(self):
+        """Tests if statements differing in literals only are grouped, and their plan is sampled."""
+        for hour in (15, 17):
+            res_start = dt.datetime(2025, 1, 1, hour, 0)
+            res_end = res_start + dt.timedelta(hours=1)
+            self.model.create_reservation(name='Jane Doe', res_start=res_start, res_end=res_end)
+
+        snapshot = self.instrumentation.snapshot()
+        inserts = [
+            summary for summary in snapshot['statements'] if summary['sql'].startswith('INSERT INTO reservation(')
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(inserts[0]['executions'], 2)
+        self.assertIsNotNone(inserts[0]['plan'])
+
+    def test_full_scan_flagged(self):
+        """Tests if a statement reading a whole table is reported as a full scan."""
+        self.model.cursor.execute("SELECT * FROM reservation WHERE datetime_to - datetime_from > 60").fetchall()
+        self.model.check_possible_reservations(datetime_=dt.datetime(2025, 1, 1, 15, 0))
+
+        full_scans = self.instrumentation.snapshot()['full_scans']
+        self.assertIn('SELECT * FROM reservation WHERE datetime_to - datetime_from > ?', full_scans)
+        self.assertEqual(len(full_scans), 1)
+
+    def test_subquery_scan_not_flagged(self):
+        """Tests if reading rows of a subquery, whose own plan searches an index, is not a full scan."""
+        res_start = dt.datetime(2025, 1, 1, 15, 0)
+        self.model.create_reservation(name='John Doe', res_start=res_start, res_end=dt.datetime(2025, 1, 1, 16, 0))
+        self.model.get_free_slots(datetime_from=res_start.replace(hour=0), datetime_to=res_start.replace(hour=23))
+        self.model.delete_reservation(name='John Doe', datetime_=res_start)
+
+        self.assertFalse(Instrumentation.is_full_scan('SCAN (subquery-1)'))
+        self.assertTrue(Instrumentation.is_full_scan('SCAN reservation'))
+        self.assertEqual(self.instrumentation.snapshot()['full_scans'], [])
+
+    def test_dump(self):
+        """Tests if the snapshot is saved as json."""
+        self.model.check_possible_reservations(datetime_=dt.datetime(2025, 1, 1, 15, 0))
+        with tempfile.TemporaryDirectory() as directory:
+            self.instrumentation.filename = os.path.join(directory, 'stats.json')
+            self.instrumentation.dump()
+            with open(self.instrumentation.filename) as stats_file:
+                stats = json.load(stats_file)
+        self.assertEqual(stats['methods']['check_possible_reservations']['calls'], 1)
+
+    def test_not_instrumented(self):
+        """Tests if a Model without instrumentation keeps its methods untouched."""
+        model = Model(court_number='TEST')
+        self.assertIsNone(model.instrumentation)
+        self.assertNotIn('check_possible_reservations', vars(model))
+        model.connection.close()
+
+    def test_histogram_percentiles(self):
+        """Tests if percentiles are upper bounds of power of two buckets."""
+        histogram = LatencyHistogram()
+        for microseconds in [3] * 98 + [100, 5000]:
+            histogram.add(microseconds=microseconds)
+
+        self.assertEqual(histogram.percentile(0.5), 4)
+        self.assertEqual(histogram.percentile(0.99), 128)
+        self.assertEqual(histogram.max, 5000)
@@ -1,7 +1,13 @@
+import json
 import os
+import sqlite3
+import tempfile
 import datetime as dt
-from unittest import TestCase
+from unittest import TestCase, mock
 from mvc.model import Model
+from mvc.quota import Quota
+from mvc.schema import Schema
+from utils.epoch import EpochMinutes
 
 
 class TestModel(TestCase):
@@ -45,6 +51,65 @@ class TestModel(TestCase):
         ).fetchone()
         self.assertIsNone(record)
 
+    def test_name_with_apostrophe(self):
+        """Tests if names are stored and matched verbatim, including quotes."""
+        name = "John O'Neil"
+        res_start = dt.datetime.strptime('2025-01-01 19:00', '%Y-%m-%d %H:%M')
+        res_end = dt.datetime.strptime('2025-01-01 20:30', '%Y-%m-%d %H:%M')
+
+        err_create, _ = self.model.create_reservation(name=name, res_start=res_start, res_end=res_end)
+        eligible = self.model.check_if_eligible(name=name, datetime_=res_start)
+        err_delete, _ = self.model.delete_reservation(name=name, datetime_=res_start)
+
+        self.assertEqual((err_create, eligible, err_delete), (Model.OK, True, Model.OK))
+
+    def test_book_reservation_rechecks_collision(self):
+        """Tests if booking is refused when another instance took the time in the meantime."""
+        res_start = dt.datetime(2025, 1, 1, 19, 0)
+        self.assertEqual(self.model.check_possible_reservations(datetime_=res_start), [30, 60, 90])
+
+        other_model = Model(court_number='TEST')
+        other_model.create_reservation(name='Jane Doe', res_start=res_start, res_end=dt.datetime(2025, 1, 1, 19, 30))
+        other_model.connection.close()
+
+        error, _ = self.model.book_reservation(
+            name='John Doe', res_start=dt.datetime(2025, 1, 1, 18, 30), res_end=dt.datetime(2025, 1, 1, 19, 30)
+        )
+        self.assertEqual(error, Model.ERROR)
+        error, _ = self.model.book_reservation(
+            name='John Doe', res_start=dt.datetime(2025, 1, 1, 19, 30), res_end=dt.datetime(2025, 1, 1, 20, 0)
+        )
+        self.assertEqual(error, Model.OK)
+
+    def test_book_reservation_rechecks_quota(self):
+        """Tests if booking is refused once name reached the weekly limit."""
+        for day in (6, 7, 8):
+            error, _ = self.model.book_reservation(
+                name='John Doe', res_start=dt.datetime(2025, 1, day, 19, 0), res_end=dt.datetime(2025, 1, day, 20, 0)
+            )
+            self.assertEqual(error, Model.OK)
+
+        error, message = self.model.book_reservation(
+            name='John Doe', res_start=dt.datetime(2025, 1, 9, 19, 0), res_end=dt.datetime(2025, 1, 9, 20, 0)
+        )
+        self.assertEqual(error, Model.ERROR)
+        self.assertEqual(message, 'You have already reached the reservation limit for this period!')
+
+    def test_database_opened_on_first_use(self):
+        """Tests if creating a Model does not touch the database until it is needed."""
+        model = Model(court_number='LAZY')
+        self.assertFalse(os.path.exists('tennis_court_LAZY.db'))
+
+        self.assertEqual(model.check_possible_reservations(datetime_=dt.datetime(2025, 1, 1, 15, 0)), [30, 60, 90])
+        self.assertTrue(os.path.exists('tennis_court_LAZY.db'))
+        model.connection.close()
+        os.remove('tennis_court_LAZY.db')
+
+    def test_database_in_wal_mode(self):
+        """Tests if database file is switched to write-ahead log, so readers do not block writers."""
+        journal_mode = self.model.connection.execute('PRAGMA journal_mode').fetchone()[0]
+        self.assertEqual(journal_mode, 'wal')
+
     def test_delete_reservation_FAIL(self):
         """Tests if error message is returned when trying to remove non-existing reservation."""
         name = 'John Doe'
@@ -58,6 +123,31 @@ class TestModel(TestCase):
         err, message = self.model.delete_reservation(name=name, datetime_=res_end)
         self.assertNotEqual(0, err)
 
+    def test_check_if_eligible(self):
+        """Tests if weekly limit counts every reservation of the week, including Sunday evening."""
+        name = 'John Doe'
+        for day, hour in ((6, 9), (8, 9), (12, 19)):
+            res_start = dt.datetime(2025, 1, day, hour, 0)
+            self.model.create_reservation(name=name, res_start=res_start, res_end=res_start + dt.timedelta(hours=1))
+
+        self.assertFalse(self.model.check_if_eligible(name=name, datetime_=dt.datetime(2025, 1, 10, 9, 0)))
+        self.assertTrue(self.model.check_if_eligible(name=name, datetime_=dt.datetime(2025, 1, 13, 9, 0)))
+        self.assertTrue(self.model.check_if_eligible(name='Jane Doe', datetime_=dt.datetime(2025, 1, 10, 9, 0)))
+
+        self.model.delete_reservation(name=name, datetime_=dt.datetime(2025, 1, 12, 19, 0))
+        self.assertTrue(self.model.check_if_eligible(name=name, datetime_=dt.datetime(2025, 1, 10, 9, 0)))
+
+    def test_check_if_eligible_monthly_limit(self):
+        """Tests if limits can be configured per month."""
+        self.model.QUOTA_LIMITS = {'week': 3, 'month': 2}
+        name = 'John Doe'
+        for day in (6, 20):
+            res_start = dt.datetime(2025, 1, day, 9, 0)
+            self.model.create_reservation(name=name, res_start=res_start, res_end=res_start + dt.timedelta(hours=1))
+
+        self.assertFalse(self.model.check_if_eligible(name=name, datetime_=dt.datetime(2025, 1, 31, 9, 0)))
+        self.assertTrue(self.model.check_if_eligible(name=name, datetime_=dt.datetime(2025, 2, 1, 9, 0)))
+
     def test_get_schedule_data(self):
         """Tests if date dict is created and returned properly."""
         res_start_1 = dt.datetime.strptime('2025-01-01 19:00', '%Y-%m-%d %H:%M')
@@ -79,6 +169,74 @@ class TestModel(TestCase):
         self.assertEqual(dict_2, 2)
         self.assertEqual(dict_3, 1)
 
+    def test_get_schedule_data_datetimes(self):
+        """Tests if reservations are bucketed by start day, with ends on later days kept exact."""
+        reservations = [
+            ('John Doe', dt.datetime(2025, 1, 1, 0, 0), dt.datetime(2025, 1, 1, 1, 30)),
+            ('Jane Doe', dt.datetime(2025, 1, 1, 23, 30), dt.datetime(2025, 1, 2, 0, 30)),
+            ('John D', dt.datetime(2025, 1, 2, 8, 0), dt.datetime(2025, 1, 5, 8, 0)),
+        ]
+        for name, res_start, res_end in reservations:
+            self.model.create_reservation(name=name, res_start=res_start, res_end=res_end)
+
+        schedule = self.model.get_schedule_data(date_from=dt.date(2025, 1, 1), date_to=dt.date(2025, 1, 3))
+        self.assertEqual(schedule, {
+            dt.date(2025, 1, 1): reservations[:2],
+            dt.date(2025, 1, 2): reservations[2:],
+            dt.date(2025, 1, 3): [],
+        })
+
+    def test_iter_schedule_pages(self):
+        """Tests if schedule is split into pages of days, optionally without the empty ones."""
+        for day in (1, 2, 9):
+            self.model.create_reservation(
+                name='John Doe', res_start=dt.datetime(2025, 1, day, 19, 0), res_end=dt.datetime(2025, 1, day, 20, 0)
+            )
+
+        pages = list(self.model.iter_schedule_pages(date_from=dt.date(2025, 1, 1), date_to=dt.date(2025, 1, 10)))
+        pages_skip_empty = list(self.model.iter_schedule_pages(
+            date_from=dt.date(2025, 1, 1), date_to=dt.date(2025, 1, 10), page_days=2, skip_empty=True
+        ))
+
+        self.assertEqual([len(page) for page in pages], [7, 3])
+        self.assertEqual(
+            [[date_.day for date_, _ in page] for page in pages_skip_empty], [[1, 2], [9]]
+        )
+
+    def test_create_recurring_reservation(self):
+        """Tests if every free occurrence is booked at once, and conflicting ones are reported."""
+        self.model.create_reservation(
+            name='Jane Doe', res_start=dt.datetime(2025, 1, 14, 18, 30), res_end=dt.datetime(2025, 1, 14, 19, 0)
+        )
+
+        error, message, rejected = self.model.create_recurring_reservation(
+            name='League', res_start=dt.datetime(2025, 1, 7, 18, 0), length=90, rule='FREQ=WEEKLY;UNTIL=20250131'
+        )
+        schedule = self.model.get_schedule_data(date_from=dt.date(2025, 1, 1), date_to=dt.date(2025, 1, 31))
+        league_days = [
+            date_.day for date_, reservations in schedule.items() for name, _, _ in reservations if name == 'League'
+        ]
+        rule = self.model.cursor.execute('SELECT rule FROM recurrence').fetchone()[0]
+
+        self.assertEqual((error, message), (Model.OK, 'Booked 3 of 4 occurrences.'))
+        self.assertEqual(rejected, [(dt.datetime(2025, 1, 14, 18, 0), 'Collides with existing reservation.')])
+        self.assertEqual(league_days, [7, 21, 28])
+        self.assertIn('RRULE:FREQ=WEEKLY;UNTIL=20250131', rule)
+
+    def test_create_recurring_reservation_FAIL(self):
+        """Tests if invalid, unbounded and fully conflicting rules book nothing and leave no rule behind."""
+        res_start = dt.datetime(2025, 1, 7, 18, 0)
+        self.model.create_reservation(name='Jane Doe', res_start=res_start, res_end=dt.datetime(2025, 1, 7, 19, 0))
+
+        results = [
+            self.model.create_recurring_reservation(name='League', res_start=res_start, length=60, rule=rule)
+            for rule in ('FREQ=SOMETIMES', 'FREQ=DAILY', 'FREQ=WEEKLY;COUNT=1')
+        ]
+
+        self.assertEqual([error for error, _, _ in results], [Model.ERROR] * 3)
+        self.assertEqual(results[2][2], [(res_start, 'Collides with existing reservation.')])
+        self.assertIsNone(self.model.cursor.execute('SELECT * FROM recurrence').fetchone())
+
     def test_check_possible_reservations(self):
         """Tests if available reservation choices count is correct."""
         name = 'John Doe'
@@ -107,3 +265,473 @@ class TestModel(TestCase):
         self.assertEqual(possible_reservations_2, 1)
         self.assertEqual(possible_reservations_3, 2)
         self.assertEqual(possible_reservations_4, 3)
+
+    def test_check_possible_reservations_inside_reservation(self):
+        """Tests if no reservation lengths are available during and right up to existing reservation."""
+        res_start = dt.datetime.strptime('2025-01-01 19:00', '%Y-%m-%d %H:%M')
+        res_end = dt.datetime.strptime('2025-01-01 20:30', '%Y-%m-%d %H:%M')
+        self.model.create_reservation(name='John Doe', res_start=res_start, res_end=res_end)
+
+        self.assertEqual(self.model.check_possible_reservations(datetime_=res_start), [])
+        self.assertEqual(self.model.check_possible_reservations(datetime_=res_start + dt.timedelta(minutes=89)), [])
+        self.assertEqual(self.model.check_possible_reservations(datetime_=res_end), [30, 60, 90])
+
+    def test_get_free_slots(self):
+        """Tests if free slots are returned for the gaps between reservations in given window."""
+        self.model.create_reservation(
+            name='John Doe', res_start=dt.datetime(2025, 1, 1, 9, 0), res_end=dt.datetime(2025, 1, 1, 10, 30)
+        )
+        self.model.create_reservation(
+            name='Jane Doe', res_start=dt.datetime(2025, 1, 1, 11, 0), res_end=dt.datetime(2025, 1, 1, 11, 30)
+        )
+        self.model.create_reservation(
+            name='John D', res_start=dt.datetime(2025, 1, 1, 11, 45), res_end=dt.datetime(2025, 1, 1, 13, 0)
+        )
+
+        free_slots = self.model.get_free_slots(
+            datetime_from=dt.datetime(2025, 1, 1, 10, 0), datetime_to=dt.datetime(2025, 1, 1, 14, 0)
+        )
+
+        self.assertEqual(free_slots, [
+            (dt.datetime(2025, 1, 1, 10, 30), dt.datetime(2025, 1, 1, 11, 0)),
+            (dt.datetime(2025, 1, 1, 13, 0), dt.datetime(2025, 1, 1, 14, 0)),
+        ])
+
+    def test_busy_slots(self):
+        """Tests if day bitmaps follow created and deleted reservations, keeping slots shared by two of them busy."""
+        self.model.create_reservation(
+            name='John Doe', res_start=dt.datetime(2025, 1, 1, 9, 0), res_end=dt.datetime(2025, 1, 1, 10, 15)
+        )
+        self.model.create_reservation(
+            name='Jane Doe', res_start=dt.datetime(2025, 1, 1, 10, 15), res_end=dt.datetime(2025, 1, 1, 11, 0)
+        )
+        self.model.create_reservation(
+            name='Jane Doe', res_start=dt.datetime(2025, 1, 1, 23, 30), res_end=dt.datetime(2025, 1, 2, 0, 30)
+        )
+        busy_slots = self.model.get_busy_slots(date_from=dt.date(2025, 1, 1), date_to=dt.date(2025, 1, 3))
+        self.assertEqual(busy_slots, {
+            dt.date(2025, 1, 1): 0b1111 << 18 | 1 << 47,
+            dt.date(2025, 1, 2): 0b1,
+            dt.date(2025, 1, 3): 0,
+        })
+
+        self.model.delete_reservation(name='Jane Doe', datetime_=dt.datetime(2025, 1, 1, 10, 15))
+        self.model.delete_reservation(name='Jane Doe', datetime_=dt.datetime(2025, 1, 1, 23, 30))
+        busy_slots = self.model.get_busy_slots(date_from=dt.date(2025, 1, 1), date_to=dt.date(2025, 1, 2))
+        self.assertEqual(busy_slots, {dt.date(2025, 1, 1): 0b111 << 18, dt.date(2025, 1, 2): 0})
+
+    def test_recommend_other_date(self):
+        """Tests if the first gap long enough after requested date is recommended."""
+        self.model.create_reservation(
+            name='John Doe', res_start=dt.datetime(2025, 1, 1, 9, 0), res_end=dt.datetime(2025, 1, 1, 10, 30)
+        )
+        self.model.create_reservation(
+            name='Jane Doe', res_start=dt.datetime(2025, 1, 1, 10, 45), res_end=dt.datetime(2025, 1, 1, 11, 30)
+        )
+
+        recommended_1 = self.model.recommend_other_date(datetime_=dt.datetime(2025, 1, 1, 9, 30))
+        recommended_2 = self.model.recommend_other_date(datetime_=dt.datetime(2025, 1, 1, 9, 30), length=90)
+        recommended_3 = self.model.recommend_other_date(
+            datetime_=dt.datetime(2025, 1, 1, 9, 30),
+            opening_hours=(dt.time(8, 0), dt.time(11, 0)),
+        )
+
+        self.assertEqual(recommended_1, dt.datetime(2025, 1, 1, 11, 30))
+        self.assertEqual(recommended_2, dt.datetime(2025, 1, 1, 11, 30))
+        self.assertEqual(recommended_3, dt.datetime(2025, 1, 2, 8, 0))
+
+    def test_recommend_other_date_empty_schedule(self):
+        """Tests if requested date is returned when there are no reservations at all."""
+        datetime_ = dt.datetime(2025, 1, 1, 9, 30)
+        self.assertEqual(self.model.recommend_other_date(datetime_=datetime_), datetime_)
+
+    def test_recommend_other_dates(self):
+        """Tests if alternatives closest to requested date are recommended on both sides of it."""
+        self.model.create_reservation(
+            name='John Doe', res_start=dt.datetime(2025, 1, 1, 9, 0), res_end=dt.datetime(2025, 1, 1, 10, 30)
+        )
+
+        recommended = self.model.recommend_other_dates(datetime_=dt.datetime(2025, 1, 1, 10, 0), count=3)
+        recommended_not_before = self.model.recommend_other_dates(
+            datetime_=dt.datetime(2025, 1, 1, 10, 0), count=2, not_before=dt.datetime(2025, 1, 1, 9, 0)
+        )
+
+        self.assertEqual(recommended, [
+            dt.datetime(2025, 1, 1, 10, 30), dt.datetime(2025, 1, 1, 11, 0), dt.datetime(2025, 1, 1, 8, 30)
+        ])
+        self.assertEqual(recommended_not_before, [
+            dt.datetime(2025, 1, 1, 10, 30), dt.datetime(2025, 1, 1, 11, 0)
+        ])
+
+    def test_export_schedule_data(self):
+        """Tests if streamed exports match the whole schedule serialized at once."""
+        self.model.create_reservation(
+            name='John Doe', res_start=dt.datetime(2025, 1, 1, 9, 0), res_end=dt.datetime(2025, 1, 1, 10, 30)
+        )
+        self.model.create_reservation(
+            name='Jane "JD" Doe', res_start=dt.datetime(2025, 1, 3, 23, 30), res_end=dt.datetime(2025, 1, 4, 0, 30)
+        )
+        date_from, date_to = dt.date(2025, 1, 1), dt.date(2025, 1, 4)
+        expected_json = json.dumps({
+            '01.01.2025': [{'name': 'John Doe', 'start_time': '09:00', 'end_time': '10:30'}],
+            '02.01.2025': [],
+            '03.01.2025': [{'name': 'Jane "JD" Doe', 'start_time': '23:30', 'end_time': '00:30'}],
+            '04.01.2025': [],
+        })
+        expected_csv = (
+            'name,start,end\r\n'
+            'John Doe,01.01.2025 09:00,01.01.2025 10:30\r\n'
+            '"Jane ""JD"" Doe",03.01.2025 23:30,04.01.2025 00:30\r\n'
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            self.model.EXPORTS_DIRECTORY = directory
+            for file_format in ('json', 'csv'):
+                error, _ = self.model.export_schedule_data(
+                    date_from=date_from, date_to=date_to, file_format=file_format, filename='schedule'
+                )
+                self.assertEqual(error, Model.OK)
+            with open(os.path.join(directory, 'schedule.json')) as json_file:
+                self.assertEqual(json_file.read(), expected_json)
+            with open(os.path.join(directory, 'schedule.csv'), newline='') as csv_file:
+                self.assertEqual(csv_file.read(), expected_csv)
+
+    def test_export_schedule_changes(self):
+        """Tests if delta exports hold only reservations created or deleted since the last export to the target."""
+        self.model.create_reservation(
+            name='John Doe', res_start=dt.datetime(2025, 1, 1, 9, 0), res_end=dt.datetime(2025, 1, 1, 10, 30)
+        )
+        self.model.create_reservation(
+            name='Jane Doe', res_start=dt.datetime(2025, 1, 3, 23, 30), res_end=dt.datetime(2025, 1, 4, 0, 30)
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            self.model.EXPORTS_DIRECTORY = directory
+            error, message = self.model.export_schedule_changes(file_format='csv', filename='changes')
+            self.assertEqual((error, message[:18]), (Model.OK, 'Exported 2 changes'))
+
+            self.model.delete_reservation(name='John Doe', datetime_=dt.datetime(2025, 1, 1, 9, 0))
+            self.model.create_reservation(
+                name='John Doe', res_start=dt.datetime(2025, 1, 2, 9, 0), res_end=dt.datetime(2025, 1, 2, 10, 0)
+            )
+            # Created and deleted between exports, comes only as deleted:
+            self.model.create_reservation(
+                name='Jane Doe', res_start=dt.datetime(2025, 1, 2, 12, 0), res_end=dt.datetime(2025, 1, 2, 13, 0)
+            )
+            self.model.delete_reservation(name='Jane Doe', datetime_=dt.datetime(2025, 1, 2, 12, 0))
+            self.model.export_schedule_changes(file_format='csv', filename='changes')
+            with open(os.path.join(directory, 'changes.csv'), newline='') as csv_file:
+                self.assertEqual(csv_file.read(), (
+                    'name,start,end,deleted\r\n'
+                    'John Doe,01.01.2025 09:00,01.01.2025 10:30,1\r\n'
+                    'John Doe,02.01.2025 09:00,02.01.2025 10:00,0\r\n'
+                    'Jane Doe,02.01.2025 12:00,02.01.2025 13:00,1\r\n'
+                ))
+            error, message = self.model.export_schedule_changes(file_format='csv', filename='changes')
+            self.assertEqual((error, message[:18]), (Model.OK, 'Exported 0 changes'))
+
+            # The first export to another target holds every change:
+            self.model.export_schedule_changes(file_format='json', filename='changes', target='other')
+            with open(os.path.join(directory, 'changes.json')) as json_file:
+                self.assertEqual(json_file.read(), json.dumps({
+                    '01.01.2025': [{'name': 'John Doe', 'start_time': '09:00', 'end_time': '10:30', 'deleted': True}],
+                    '02.01.2025': [
+                        {'name': 'John Doe', 'start_time': '09:00', 'end_time': '10:00'},
+                        {'name': 'Jane Doe', 'start_time': '12:00', 'end_time': '13:00', 'deleted': True},
+                    ],
+                    '03.01.2025': [{'name': 'Jane Doe', 'start_time': '23:30', 'end_time': '00:30'}],
+                }))
+
+    def test_changes_rolled_back_with_reservations(self):
+        """Tests if changes of a rolled back transaction are not logged."""
+        with self.assertRaises(RuntimeError):
+            with self.model.transaction():
+                self.model.create_reservation(
+                    name='John Doe', res_start=dt.datetime(2025, 1, 1, 9, 0), res_end=dt.datetime(2025, 1, 1, 10, 0)
+                )
+                raise RuntimeError
+
+        self.assertEqual(self.model.change_log.last_change(), 0)
+
+    def test_user_ids_forgotten_on_rollback(self):
+        """Tests if an id of a rolled back user is not used for its name, once it is given to another one."""
+        res_start = dt.datetime(2025, 1, 1, 9, 0)
+        with self.assertRaises(RuntimeError):
+            with self.model.transaction():
+                self.model.create_reservation(
+                    name='John Doe', res_start=res_start, res_end=dt.datetime(2025, 1, 1, 10, 0)
+                )
+                raise RuntimeError
+
+        self.model.create_reservation(name='Jane Doe', res_start=res_start, res_end=dt.datetime(2025, 1, 1, 10, 0))
+        self.model.create_reservation(
+            name='John Doe', res_start=dt.datetime(2025, 1, 1, 11, 0), res_end=dt.datetime(2025, 1, 1, 12, 0)
+        )
+
+        schedule = self.model.get_schedule_data(date_from=res_start.date(), date_to=res_start.date())
+        self.assertEqual([name for name, _, _ in schedule[res_start.date()]], ['Jane Doe', 'John Doe'])
+
+    def test_first_time_name_added_by_another_connection(self):
+        """Tests if a name added by another connection after it was looked up is reused, not inserted twice."""
+        other_model = Model(court_number='TEST')
+        find = other_model.users.find
+
+        def find_then_other_creates(name: str):
+            user = find(name=name)
+            self.model.create_reservation(
+                name=name, res_start=dt.datetime(2025, 1, 1, 9, 0), res_end=dt.datetime(2025, 1, 1, 10, 0)
+            )
+            return user
+
+        with mock.patch.object(other_model.users, 'find', find_then_other_creates):
+            error, _ = other_model.create_reservation(
+                name='John Doe', res_start=dt.datetime(2025, 1, 1, 11, 0), res_end=dt.datetime(2025, 1, 1, 12, 0)
+            )
+        other_model.connection.close()
+
+        self.assertEqual(error, Model.OK)
+        self.assertEqual(self.model.cursor.execute('SELECT COUNT(*) FROM user').fetchone()[0], 1)
+        week_start = Quota.period_start('week', EpochMinutes.from_date(dt.date(2025, 1, 1)))
+        self.assertEqual(
+            self.model.quota.counts_between(period='week', range_start=week_start, range_end=week_start),
+            {('John Doe', week_start): 2}
+        )
+
+    def test_reservation_canceled_once(self):
+        """Tests if a reservation canceled by two instances at once is deleted, counted and logged once."""
+        res_start = dt.datetime(2025, 1, 1, 9, 0)
+        self.model.create_reservation(name='John Doe', res_start=res_start, res_end=dt.datetime(2025, 1, 1, 10, 0))
+        other_model = Model(court_number='TEST')
+        find = other_model.users.find
+        # The other desk cancels while this one holds the write lock, and does not wait for it:
+        self.model.BOOKING_ATTEMPTS = 1
+        self.model.connection.execute('PRAGMA busy_timeout = 0')
+
+        def find_then_other_cancels(name: str):
+            user = find(name=name)
+            self.assertEqual(
+                self.model.delete_reservation(name=name, datetime_=res_start),
+                (Model.ERROR, 'Database is busy, please try again.')
+            )
+            return user
+
+        with mock.patch.object(other_model.users, 'find', find_then_other_cancels):
+            error, _ = other_model.delete_reservation(name='John Doe', datetime_=res_start)
+        other_model.connection.close()
+
+        self.assertEqual(error, Model.OK)
+        self.assertEqual(self.model.delete_reservation(name='John Doe', datetime_=res_start)[0], Model.ERROR)
+        counts = self.model.cursor.execute('SELECT period, reservation_count FROM reservation_quota').fetchall()
+        self.assertEqual(sorted(counts), [('month', 0), ('week', 0)])
+        changes = self.model.change_log.changes_between(after=0, until=self.model.change_log.last_change())
+        self.assertEqual([kind for kind, _, _, _ in changes], ['delete'])
+
+    def test_import_round_trip(self):
+        """Tests if exported schedule imports back into an empty database."""
+        self.model.create_reservation(
+            name='John Doe', res_start=dt.datetime(2025, 1, 1, 9, 0), res_end=dt.datetime(2025, 1, 1, 10, 30)
+        )
+        self.model.create_reservation(
+            name='Jane Doe', res_start=dt.datetime(2025, 1, 3, 23, 30), res_end=dt.datetime(2025, 1, 4, 0, 30)
+        )
+        schedule = self.model.get_schedule_data(date_from=dt.date(2025, 1, 1), date_to=dt.date(2025, 1, 4))
+
+        with tempfile.TemporaryDirectory() as directory:
+            self.model.EXPORTS_DIRECTORY = directory
+            for file_format in ('csv', 'json'):
+                self.model.export_schedule_data(
+                    date_from=dt.date(2025, 1, 1), date_to=dt.date(2025, 1, 4), file_format=file_format, filename='s'
+                )
+                for reservations in schedule.values():
+                    for name, res_start, _ in reservations:
+                        self.model.delete_reservation(name=name, datetime_=res_start)
+
+                error, _, rejected = self.model.import_schedule_data(
+                    filename=os.path.join(directory, f's.{file_format}')
+                )
+                self.assertEqual((error, rejected), (Model.OK, []))
+                self.assertEqual(
+                    self.model.get_schedule_data(date_from=dt.date(2025, 1, 1), date_to=dt.date(2025, 1, 4)), schedule
+                )
+
+    def test_import_reservations_rejected(self):
+        """Tests if colliding, over the limit and invalid reservations are reported and not imported."""
+        self.model.create_reservation(
+            name='John Doe', res_start=dt.datetime(2025, 1, 6, 9, 0), res_end=dt.datetime(2025, 1, 6, 10, 0)
+        )
+        error, message, rejected = self.model.import_reservations(reservations=[
+            ('Jane Doe', dt.datetime(2025, 1, 6, 9, 30), dt.datetime(2025, 1, 6, 10, 30)),
+            ('John Doe', dt.datetime(2025, 1, 7, 9, 0), dt.datetime(2025, 1, 7, 10, 0)),
+            ('Jane Doe', dt.datetime(2025, 1, 7, 9, 30), dt.datetime(2025, 1, 7, 10, 30)),
+            ('John Doe', dt.datetime(2025, 1, 8, 9, 0), dt.datetime(2025, 1, 8, 10, 0)),
+            ('John Doe', dt.datetime(2025, 1, 12, 19, 0), dt.datetime(2025, 1, 12, 20, 0)),
+            ('John Doe', dt.datetime(2025, 1, 13, 9, 0), dt.datetime(2025, 1, 13, 10, 0)),
+            ('John Doe', None, None),
+        ])
+
+        self.assertEqual(error, Model.OK)
+        self.assertEqual(message, 'Imported 3 of 7 reservations.')
+        self.assertEqual(rejected, [
+            (1, 'Collides with existing reservation.'),
+            (3, 'Collides with imported reservation.'),
+            (5, 'Weekly reservation limit exceeded.'),
+            (7, 'Invalid date.'),
+        ])
+
+    def test_import_quota_counters(self):
+        """Tests if imported reservations are counted in the periods of Quota.period_start, added to existing counts."""
+        self.model.create_reservation(
+            name='John Doe', res_start=dt.datetime(2025, 1, 30, 9, 0), res_end=dt.datetime(2025, 1, 30, 10, 0)
+        )
+        self.model.import_reservations(reservations=[
+            ('John Doe', dt.datetime(2025, 1, 31, 23, 0), dt.datetime(2025, 2, 1, 0, 0)),
+            ('John Doe', dt.datetime(2025, 2, 1, 9, 0), dt.datetime(2025, 2, 1, 10, 0)),
+            ('John Doe', dt.datetime(2025, 2, 3, 0, 0), dt.datetime(2025, 2, 3, 1, 0)),
+        ])
+
+        john = self.model.users.find(name='John Doe')
+        counts = {
+            (period, day): self.model.quota.count(
+                user=john, period=period, minute=EpochMinutes.from_datetime(dt.datetime(2025, *day))
+            )
+            for period, day in (('week', (1, 27)), ('week', (2, 3)), ('month', (1, 1)), ('month', (2, 1)))
+        }
+        self.assertEqual(counts, {
+            ('week', (1, 27)): 3, ('week', (2, 3)): 1, ('month', (1, 1)): 2, ('month', (2, 1)): 2
+        })
+
+    def test_import_unreadable_file_FAIL(self):
+        """Tests if a missing file and an invalid row leave no transaction open for the next booking."""
+        error, _, _ = self.model.import_schedule_data(filename='missing.csv')
+        self.assertEqual(error, Model.ERROR)
+        self.assertFalse(self.model.connection.in_transaction)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'schedule.json')
+            with open(filename, 'w') as json_file:
+                json.dump({'06.01.2025': [
+                    {'name': 5, 'start_time': '09:00', 'end_time': '10:00'},
+                    {'name': None, 'start_time': '11:00', 'end_time': '12:00'},
+                ]}, json_file)
+            error, _, rejected = self.model.import_schedule_data(filename=filename)
+
+        self.assertEqual((error, rejected), (Model.ERROR, [(1, 'Invalid name.'), (2, 'Invalid name.')]))
+        error, _ = self.model.book_reservation(
+            name='John Doe', res_start=dt.datetime(2025, 1, 6, 9, 0), res_end=dt.datetime(2025, 1, 6, 10, 0)
+        )
+        self.assertEqual(error, Model.OK)
+
+    def test_import_rolled_back_on_error(self):
+        """Tests if the import transaction is rolled back when reading reservations fails midway."""
+        def reservations():
+            yield 'John Doe', dt.datetime(2025, 1, 6, 9, 0), dt.datetime(2025, 1, 6, 10, 0)
+            raise ValueError('Broken row')
+
+        with self.assertRaises(ValueError):
+            self.model.import_reservations(reservations=reservations())
+
+        self.assertFalse(self.model.connection.in_transaction)
+        self.assertEqual(self.model.cursor.execute('SELECT COUNT(*) FROM reservation').fetchone()[0], 0)
+
+
+class TestModelCached(TestModel):
+    """Runs Model tests with lookups answered by the in-memory cache."""
+    def setUp(self) -> None:
+        self.model = Model(court_number='TEST', use_cache=True)
+
+    def test_cache_reloaded_after_external_write(self):
+        """Tests if cache picks up reservations committed by another connection."""
+        datetime_ = dt.datetime(2025, 1, 1, 19, 0)
+        self.assertEqual(self.model.check_possible_reservations(datetime_=datetime_), [30, 60, 90])
+
+        other_model = Model(court_number='TEST')
+        other_model.create_reservation(name='Jane Doe', res_start=datetime_, res_end=dt.datetime(2025, 1, 1, 20, 0))
+        other_model.connection.close()
+
+        self.assertEqual(self.model.check_possible_reservations(datetime_=datetime_), [])
+        schedule = self.model.get_schedule_data(date_from=datetime_.date(), date_to=datetime_.date())
+        self.assertEqual(schedule[datetime_.date()][0][0], 'Jane Doe')
+
+    def test_schedule_read_from_cache_in_chunks(self):
+        """Tests if a range is read from the cache in chunks, which do not shift when reservations change."""
+        self.model.cache.CHUNK_SIZE = 2
+        for hour in range(9, 14):
+            self.model.create_reservation(
+                name=f'Player {hour}', res_start=dt.datetime(2025, 1, 1, hour, 0),
+                res_end=dt.datetime(2025, 1, 1, hour, 30)
+            )
+        range_start = EpochMinutes.from_date(dt.date(2025, 1, 1))
+        rows = self.model.cache.reservations_starting_between(
+            range_start=range_start, range_end=range_start + EpochMinutes.MINUTES_PER_DAY
+        )
+
+        names = [next(rows)[0], next(rows)[0]]
+        self.model.delete_reservation(name='Player 9', datetime_=dt.datetime(2025, 1, 1, 9, 0))
+        names.extend(name for name, _, _ in rows)
+
+        self.assertEqual(names, [f'Player {hour}' for hour in range(9, 14)])
+
+
+class TestModelMigration(TestCase):
+    def setUp(self) -> None:
+        connection = sqlite3.connect('tennis_court_TEST.db')
+        connection.execute('CREATE TABLE reservation(full_name varchar, datetime_from time, datetime_to time)')
+        connection.executemany('INSERT INTO reservation VALUES (?, ?, ?)', [
+            ('John Doe', '2025-01-01 19:00', '2025-01-01 20:30'),
+            ('Jane Doe', '2025-01-02 08:30', '2025-01-02 09:00'),
+        ])
+        connection.commit()
+        connection.close()
+        self.model = Model(court_number='TEST')
+
+    def tearDown(self) -> None:
+        self.model.connection.close()
+        os.remove('tennis_court_TEST.db')
+
+    def test_legacy_rows_migrated(self):
+        """Tests if legacy text rows are preserved when the database is upgraded."""
+        schedule = self.model.get_schedule_data(date_from=dt.date(2025, 1, 1), date_to=dt.date(2025, 1, 2))
+
+        self.assertEqual(schedule[dt.date(2025, 1, 1)], [
+            ('John Doe', dt.datetime(2025, 1, 1, 19, 0), dt.datetime(2025, 1, 1, 20, 30))
+        ])
+        self.assertEqual(schedule[dt.date(2025, 1, 2)], [
+            ('Jane Doe', dt.datetime(2025, 1, 2, 8, 30), dt.datetime(2025, 1, 2, 9, 0))
+        ])
+
+    def test_quota_counters_filled(self):
+        """Tests if reservation counters are filled from legacy rows."""
+        jane, john = self.model.users.find(name='Jane Doe'), self.model.users.find(name='John Doe')
+        self.assertEqual(self.model.quota.count(
+            user=jane, period='month', minute=EpochMinutes.from_datetime(dt.datetime(2025, 1, 31))
+        ), 1)
+        self.assertEqual(self.model.quota.count(
+            user=john, period='week', minute=EpochMinutes.from_datetime(dt.datetime(2024, 12, 30))
+        ), 1)
+
+    def test_day_bitmaps_filled(self):
+        """Tests if busy slots bitmaps are filled from legacy rows."""
+        busy_slots = self.model.get_busy_slots(date_from=dt.date(2025, 1, 1), date_to=dt.date(2025, 1, 2))
+        self.assertEqual(busy_slots, {dt.date(2025, 1, 1): 0b111 << 38, dt.date(2025, 1, 2): 1 << 17})
+
+    def test_changes_logged(self):
+        """Tests if legacy rows are logged as created, so the first delta export holds them."""
+        changes = self.model.change_log.changes_between(after=0, until=self.model.change_log.last_change())
+        self.assertEqual([(kind, name) for kind, name, _, _ in changes], [
+            ('insert', 'John Doe'), ('insert', 'Jane Doe')
+        ])
+
+    def test_names_stored_once(self):
+        """Tests if legacy names are moved to the user table and referenced by id."""
+        users = self.model.cursor.execute('SELECT full_name FROM user ORDER BY id').fetchall()
+        references = self.model.cursor.execute(
+            'SELECT COUNT(*) FROM reservation JOIN user ON user.id = reservation.user_id'
+        ).fetchone()[0]
+
+        self.assertEqual(sorted(users), [('Jane Doe',), ('John Doe',)])
+        self.assertEqual(references, 2)
+
+    def test_schema_version_set(self):
+        """Tests if the schema version is recorded, so migration runs only once."""
+        version = self.model.cursor.execute('PRAGMA user_version').fetchone()[0]
+        self.assertEqual(version, Schema.VERSION)
@@ -0,0 +1,99 @@
+import datetime as dt
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from mvc.model import Model
+from mvc.parallel_export import ParallelExport
+
+
+class TestParallelExport(TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.database = os.path.join(self.directory.name, 'tennis_club.db')
+        self.date_from, self.date_to = dt.date(2025, 1, 1), dt.date(2025, 1, 20)
+        for court, hour in ((1, 9), (2, 18)):
+            model = Model(court_number=court, database=self.database)
+            for day in (1, 7, 8, 15, 20):
+                res_start = dt.datetime(2025, 1, day, hour, 0)
+                model.create_reservation(
+                    name=f'Player {court}', res_start=res_start, res_end=res_start + dt.timedelta(minutes=90)
+                )
+            model.connection.close()
+        self.exporter = ParallelExport(courts=[1, 2], database=self.database, workers=2)
+        # Five shards of four days for each court:
+        self.exporter.SHARDS_PER_WORKER = 5
+        self.exporter.EXPORTS_DIRECTORY = self.directory.name
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def _read(self, filename: str) -> str:
+        with open(os.path.join(self.directory.name, filename), newline='') as exported_file:
+            return exported_file.read()
+
+    def _export_court(self, court: int, file_format: str) -> str:
+        """Returns export of one court made by Model in a single pass."""
+        model = Model(court_number=court, database=self.database)
+        model.EXPORTS_DIRECTORY = self.directory.name
+        model.export_schedule_data(
+            date_from=self.date_from, date_to=self.date_to, file_format=file_format, filename='sequential'
+        )
+        model.connection.close()
+        return self._read(f'sequential.{file_format}')
+
+    def test_per_court_files_match_sequential_export(self):
+        """Tests if files merged from shards are the same as exports of whole courts."""
+        for file_format in ParallelExport.FILE_FORMATS:
+            error, _ = self.exporter.export(
+                date_from=self.date_from, date_to=self.date_to, file_format=file_format, filename='report',
+                per_court=True
+            )
+
+            self.assertEqual(error, ParallelExport.OK)
+            for court in (1, 2):
+                self.assertEqual(
+                    self._read(f'report_{court}.{file_format}'),
+                    self._export_court(court=court, file_format=file_format)
+                )
+
+    def test_merged_file(self):
+        """Tests if courts are merged into one file in court and date order."""
+        self.exporter.export(date_from=self.date_from, date_to=self.date_to, file_format='csv', filename='report')
+        self.exporter.export(date_from=self.date_from, date_to=self.date_to, file_format='json', filename='report')
+
+        rows = self._read('report.csv').splitlines()
+        self.assertEqual(rows[0], 'court,name,start,end')
+        self.assertEqual(rows[1], '1,Player 1,01.01.2025 09:00,01.01.2025 10:30')
+        self.assertEqual(rows[6], '2,Player 2,01.01.2025 18:00,01.01.2025 19:30')
+        self.assertEqual(len(rows), 11)
+
+        schedule = json.loads(self._read('report.json'))
+        self.assertEqual(list(schedule), ['1', '2'])
+        self.assertEqual(schedule['2'], json.loads(self._export_court(court=2, file_format='json')))
+
+    def test_workers_do_not_write(self):
+        """Tests if shards are exported without changing the databases, archive included."""
+        model = Model(court_number=1, database=self.database)
+        model.archive_reservations(before=dt.date(2025, 1, 10))
+        model.connection.close()
+        modified = {
+            filename: os.stat(os.path.join(self.directory.name, filename)).st_mtime_ns
+            for filename in os.listdir(self.directory.name)
+        }
+
+        error, _ = self.exporter.export(
+            date_from=self.date_from, date_to=self.date_to, file_format='csv', filename='report'
+        )
+
+        self.assertEqual(error, ParallelExport.OK)
+        self.assertEqual(len(self._read('report.csv').splitlines()), 11)
+        for filename, mtime in modified.items():
+            self.assertEqual(os.stat(os.path.join(self.directory.name, filename)).st_mtime_ns, mtime, filename)
+
+    def test_unsupported_format(self):
+        error, _ = self.exporter.export(
+            date_from=self.date_from, date_to=self.date_to, file_format='bin', filename='report'
+        )
+        self.assertEqual(error, ParallelExport.ERROR)
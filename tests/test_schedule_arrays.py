@@ -0,0 +1,39 @@
+import datetime as dt
+import importlib.util
+from unittest import TestCase, skipIf
+
+from mvc.schedule_arrays import ScheduleArrays
+from utils.epoch import EpochMinutes
+
+
+@skipIf(importlib.util.find_spec('numpy') is None, 'numpy is not installed')
+class TestScheduleArrays(TestCase):
+    """Tests numpy schedule representation against the dict of lists one."""
+    schedule = {
+        dt.date(2025, 1, 1): [
+            ('John Doe', dt.datetime(2025, 1, 1, 9, 0), dt.datetime(2025, 1, 1, 10, 30)),
+            ('Jane Doe', dt.datetime(2025, 1, 1, 23, 30), dt.datetime(2025, 1, 2, 0, 30)),
+        ],
+        dt.date(2025, 1, 2): [],
+        dt.date(2025, 1, 3): [
+            ('John Doe', dt.datetime(2025, 1, 3, 8, 0), dt.datetime(2025, 1, 3, 8, 30)),
+        ],
+    }
+
+    def setUp(self) -> None:
+        rows = [
+            (name, EpochMinutes.from_datetime(res_start), EpochMinutes.from_datetime(res_end))
+            for reservations in self.schedule.values() for name, res_start, res_end in reservations
+        ]
+        self.arrays = ScheduleArrays.from_rows(date_from=dt.date(2025, 1, 1), date_to=dt.date(2025, 1, 3), rows=rows)
+
+    def test_to_schedule_data(self):
+        """Tests if arrays convert back to the dict of lists."""
+        self.assertEqual(self.arrays.to_schedule_data(), self.schedule)
+
+    def test_grouped_by_day(self):
+        """Tests if day offsets group reservations by their start day."""
+        self.assertEqual(len(self.arrays), 3)
+        self.assertEqual(self.arrays.counts_per_day.tolist(), [2, 0, 1])
+        self.assertEqual(self.arrays.durations.tolist(), [90, 60, 30])
+        self.assertEqual(str(self.arrays.starts[0]), '2025-01-01T09:00')
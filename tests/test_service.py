@@ -0,0 +1,105 @@
+import asyncio
+import datetime as dt
+import http.client
+import json
+import os
+import threading
+from unittest import TestCase
+
+from mvc.service import Service
+
+
+class TestService(TestCase):
+    def setUp(self) -> None:
+        self.service = Service(database='tennis_club_TEST.db', port=0)
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(self.service.start())
+        self.thread = threading.Thread(target=self.loop.run_forever)
+        self.thread.start()
+        self.client = http.client.HTTPConnection(*self.server.sockets[0].getsockname()[:2])
+        self.res_start = dt.datetime.combine(dt.date.today() + dt.timedelta(days=7), dt.time(19, 0))
+
+    def tearDown(self) -> None:
+        self.client.close()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.server.close()
+        self.loop.run_until_complete(self.server.wait_closed())
+        self.loop.close()
+        self.service.close()
+        if os.path.exists('tennis_club_TEST.db'):
+            os.remove('tennis_club_TEST.db')
+
+    def request(self, method: str, path: str, data: dict = None) -> tuple:
+        body = json.dumps(data) if data is not None else None
+        self.client.request(method, path, body=body)
+        response = self.client.getresponse()
+        return response.status, json.loads(response.read())
+
+    def reservation(self, minutes: int = 60) -> dict:
+        return {
+            'name': 'John Doe',
+            'start': self.res_start.strftime(Service.DATETIME_FORMAT),
+            'end': (self.res_start + dt.timedelta(minutes=minutes)).strftime(Service.DATETIME_FORMAT)
+        }
+
+    def test_create_reservation(self):
+        """Tests if reservation is created once, and the taken time is reported as unavailable."""
+        status, _ = self.request('POST', '/courts/1/reservations', self.reservation())
+        self.assertEqual(status, 201)
+        status, payload = self.request('POST', '/courts/1/reservations', self.reservation(minutes=30))
+        self.assertEqual((status, payload['error']), (409, 'Selected time is no longer available!'))
+
+        query = self.res_start.strftime(Service.DATETIME_FORMAT).replace(' ', '%20')
+        _, payload = self.request('GET', f'/courts/1/availability?datetime={query}')
+        self.assertEqual(payload['lengths'], [])
+        _, payload = self.request('GET', f'/courts/2/availability?datetime={query}')
+        self.assertEqual(payload['lengths'], [30, 60, 90])
+
+    def test_schedule_and_delete(self):
+        """Tests if created reservation is listed in the schedule until it is cancelled."""
+        self.request('POST', '/courts/1/reservations', self.reservation())
+        date_ = self.res_start.strftime(Service.DATE_FORMAT)
+
+        _, payload = self.request('GET', f'/courts/1/schedule?from={date_}&to={date_}')
+        self.assertEqual([reservation['name'] for reservation in payload[date_]], ['John Doe'])
+
+        status, _ = self.request('DELETE', '/courts/1/reservations', self.reservation())
+        self.assertEqual(status, 200)
+        status, _ = self.request('DELETE', '/courts/1/reservations', self.reservation())
+        self.assertEqual(status, 404)
+        _, payload = self.request('GET', f'/courts/1/schedule?from={date_}&to={date_}')
+        self.assertEqual(payload[date_], [])
+
+    def test_create_recurring_reservation(self):
+        """Tests if daily occurrences are booked, with the taken one reported."""
+        self.request('POST', '/courts/1/reservations', self.reservation())
+        first_start = self.res_start - dt.timedelta(days=1)
+        status, payload = self.request('POST', '/courts/1/recurring-reservations', {
+            'name': 'League',
+            'start': first_start.strftime(Service.DATETIME_FORMAT),
+            'length': 90,
+            'rule': 'FREQ=DAILY;COUNT=3'
+        })
+
+        self.assertEqual((status, payload['message']), (201, 'Booked 2 of 3 occurrences.'))
+        self.assertEqual(payload['rejected'], [
+            {'start': self.res_start.strftime(Service.DATETIME_FORMAT), 'reason': 'Collides with existing reservation.'}
+        ])
+
+    def test_busy_slots(self):
+        """Tests if busy slots of each day and their longest free run are reported."""
+        self.request('POST', '/courts/1/reservations', self.reservation())
+        date_ = self.res_start.strftime(Service.DATE_FORMAT)
+
+        _, payload = self.request('GET', f'/courts/1/busy-slots?from={date_}&to={date_}')
+        self.assertEqual(payload[date_]['slots'], '0' * 38 + '11' + '0' * 8)
+        self.assertEqual(payload[date_]['longest_free_minutes'], 38 * 30)
+
+    def test_invalid_requests(self):
+        """Tests if malformed requests and unknown routes are answered with an error, not a dropped connection."""
+        self.assertEqual(self.request('GET', '/courts/1/availability?datetime=tomorrow')[0], 400)
+        self.assertEqual(self.request('POST', '/courts/1/reservations', {'name': 'John Doe'})[0], 400)
+        self.assertEqual(self.request('POST', '/courts/1/reservations', self.reservation(minutes=120))[0], 400)
+        self.assertEqual(self.request('GET', '/courts/..%2Fother/availability')[0], 404)
+        self.assertEqual(self.request('GET', '/players')[0], 404)
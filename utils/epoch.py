@@ -0,0 +1,32 @@
+import datetime as dt
+
+
+class EpochMinutes:
+    """Converts between datetime objects and minutes since the Unix epoch, the unit stored in the database."""
+    EPOCH = dt.datetime(1970, 1, 1)
+    MINUTES_PER_DAY = 1440
+    MINUTE = dt.timedelta(minutes=1)
+    # Minutes after a midnight within two days, so datetimes of one day are built with a single addition:
+    OFFSETS = tuple(dt.timedelta(minutes=minute) for minute in range(2 * MINUTES_PER_DAY))
+
+    @classmethod
+    def from_datetime(cls, datetime_: dt.datetime) -> int:
+        """Returns minutes since the epoch for provided datetime, seconds are truncated."""
+        return (datetime_ - cls.EPOCH) // cls.MINUTE
+
+    @classmethod
+    def from_date(cls, date_: dt.date) -> int:
+        """Returns minutes since the epoch for the midnight of provided date."""
+        return (date_.toordinal() - cls.EPOCH.toordinal()) * cls.MINUTES_PER_DAY
+
+    @classmethod
+    def to_datetime(cls, minutes: int) -> dt.datetime:
+        """Returns datetime object for provided minutes since the epoch."""
+        return cls.EPOCH + dt.timedelta(minutes=minutes)
+
+    @classmethod
+    def week_start(cls, minutes: int) -> int:
+        """Returns minutes since the epoch for the Monday midnight starting the week of provided minute."""
+        day = minutes // cls.MINUTES_PER_DAY
+        # The epoch was on Thursday:
+        return (day - (day + 3) % 7) * cls.MINUTES_PER_DAY